@@ -0,0 +1,351 @@
+"""
+Run the HTTP fetch backend against a local stand-in for the site.
+
+    python benchmarks/bench_http_backend.py [--latency-ms 50] [--filler-kb 400]
+
+Serves statement pages (company header, currency, a Livewire component with
+its `wire:initial-data`, then --filler-kb of markup), the revenue breakdown
+page and the Livewire message endpoint. The endpoint enforces the session
+CSRF token and the server memo checksum the way Laravel and Livewire do.
+Every request waits --latency-ms. The listings cover each probe outcome:
+data, 404, redirect away from the financials page, and a page without the
+component. Then checks:
+
+- cold download: listing search, every statement in every period, company
+  header, compared sheet by sheet with the payloads the server rendered
+- warm download: listing from the ticker cache, no probes
+- a cached listing that lost its statements is searched for again
+- rejected Livewire messages (HTTP 419) and an anti-bot wall (HTTP 403)
+  both return None, so the apps fall back to the browser; only the wall
+  pauses the backend, and neither records listings as missing
+- the revenue breakdown is read from the page's HTML
+- the streaming parse stops reading a page once it has the component
+
+and reports wall time, requests, connections and the peak Python memory
+of a download.
+"""
+import argparse
+import hashlib
+import hmac
+import html
+import json
+import re
+import secrets
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from synthetic import make_statement_payload
+
+from findata_core import FinancialDataExporter
+from ticker_cache import TickerCache
+from http_backend import HttpClient, PageParser, read_page, download_over_http, fetch_revenue_breakdown_http
+
+STATEMENTS = [
+    ('income-statement', 'Income Statement'),
+    ('balance-sheet', 'Balance Sheet'),
+    ('cash-flow-statement', 'Cash Flow Statement'),
+]
+PERIODS_CONFIG = {
+    'income-statement': ['Annual', 'Quarterly', 'TTM'],
+    'balance-sheet': ['Annual', 'Quarterly'],
+    'cash-flow-statement': ['Annual', 'Quarterly', 'TTM'],
+}
+# (exchange, slug) -> what its financials pages do
+LISTINGS = {
+    ('otc', 'exmf'): 'redirect',
+    ('nasdaq', 'exm'): 'not-found',
+    ('lon', 'exm'): 'no-component',
+    ('nyse', 'exm'): 'data',
+}
+ALTERNATIVES = [('exmf', 'otc'), ('exm', 'nasdaq'), ('exm', 'lon'), ('exm', 'nyse')]
+COMPONENT_NAME = 'security.financials.statement'
+
+PAGE = """<!DOCTYPE html>
+<html><head><title>EXM Financial Statements - Example Corp</title>
+<meta name="csrf-token" content="{token}"></head>
+<body><div class="security-header"><h1> Example <span>Corp</span> </h1><div class="meta">Currency: USD</div></div>
+{component}
+<div class="filler">{filler}</div>
+<script>window.livewire_token = '{token}';</script>
+</body></html>"""
+STATEMENT = '<div wire:id="{id}" wire:initial-data="{initial}" class="{key} statement"><table></table></div>'
+BREAKDOWN = """<!DOCTYPE html>
+<html><head><title>Revenue Breakdown</title><style>.hidden {{ display: none }}</style></head>
+<body><div class="security-header"><h1>Example Corp</h1></div>
+<section><h2>Breakdown by Geography</h2><div>Total Revenue: 120.5B USD</div>
+<ul><li>Americas: 60.2B USD</li><li>Europe: 35.3B USD</li><li class="hidden">Rest of World: 25B USD</li></ul>
+<button>Show More</button></section>
+<section><h2>Breakdown by Segments</h2><div>Total Revenue: 120.5B USD</div>
+<table><tr><td>Services:</td><td>70B USD</td></tr><tr><td>Products:</td><td>50.5B USD</td></tr></table></section>
+<section><h2>SEE ALSO</h2></section>
+</body></html>"""
+CHALLENGE = '<!DOCTYPE html><html><head><title>Just a moment...</title></head><body>Checking your browser</body></html>'
+NOT_FOUND = '<!DOCTYPE html><html><head><title>404 Page Not Found</title></head><body>Not found</body></html>'
+
+
+class StandInSite(ThreadingHTTPServer):
+    """The site's pages and Livewire endpoint, with request counters and failure switches."""
+    daemon_threads = True
+
+    def __init__(self, latency, filler_kb):
+        super().__init__(('127.0.0.1', 0), Handler)
+        self.latency = latency
+        paragraph = '<p>' + 'x' * 93 + '</p>'
+        self.filler = paragraph * (filler_kb * 1024 // len(paragraph))
+        self.secret = secrets.token_bytes(16)
+        self.blocked = False
+        self.reject_messages = False
+        self.listings = dict(LISTINGS)
+        self.counts = Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)  # Clients dropping pages they are done with is normal
+
+    def count(self, key):
+        with self._lock:
+            self.counts[key] += 1
+
+    def token(self, session):
+        return hmac.new(self.secret, session.encode(), hashlib.sha256).hexdigest()[:40]
+
+    def checksum(self, data):
+        return hmac.new(self.secret, json.dumps(data, sort_keys=True).encode(), hashlib.sha256).hexdigest()
+
+    def statement_page(self, session, exchange, slug, key, with_component=True):
+        component = ''
+        if with_component:
+            data = dict(make_statement_payload(key, 'Annual'), statementType=key, securityId=f"{exchange}:{slug}")
+            initial = {
+                'fingerprint': {'id': f"{key}-{slug}", 'name': COMPONENT_NAME, 'locale': 'en',
+                                'path': f"security/{exchange}/{slug}/financials/{key}", 'method': 'GET', 'v': 'acj'},
+                'effects': {'listeners': []},
+                'serverMemo': {'children': [], 'errors': [], 'htmlHash': 'deadbeef', 'data': data,
+                               'dataMeta': [], 'checksum': self.checksum(data)},
+            }
+            component = STATEMENT.format(id=f"{key}-{slug}", key=key, initial=html.escape(json.dumps(initial)))
+        return PAGE.format(token=self.token(session), component=component, filler=self.filler)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        self.server.count('connections')
+
+    def session(self):
+        match = re.search(r'laravel_session=([0-9a-f]+)', self.headers.get('Cookie', ''))
+        return (match.group(1), False) if match else (secrets.token_hex(16), True)
+
+    def send(self, status, body, content_type='text/html; charset=utf-8', headers=None):
+        payload = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # The client stopped reading once it had what it needed
+
+    def do_GET(self):
+        site = self.server
+        site.count('GET')
+        time.sleep(site.latency)
+        if site.blocked:
+            return self.send(403, CHALLENGE)
+        session, new_session = self.session()
+        headers = {'Set-Cookie': f"laravel_session={session}; path=/; httponly; samesite=lax"} if new_session else {}
+
+        match = re.match(r'^/security/([^/]+)/([^/]+)/(.+)$', self.path)
+        behaviour = site.listings.get(match.groups()[:2]) if match else None
+        if not match or behaviour in (None, 'not-found'):
+            return self.send(404, NOT_FOUND, headers=headers)
+        exchange, slug, page = match.groups()
+        if page == 'summary':
+            return self.send(200, '<html><head><title>Summary</title></head><body></body></html>', headers=headers)
+        if behaviour == 'redirect':
+            return self.send(302, '', headers=dict(headers, Location=f"/security/{exchange}/{slug}/summary"))
+        if page == 'financials/revenue-breakdown':
+            return self.send(200, BREAKDOWN, headers=headers)
+        key = page.split('/')[-1]
+        if page != f"financials/{key}" or key not in PERIODS_CONFIG:
+            return self.send(404, NOT_FOUND, headers=headers)
+        self.send(200, site.statement_page(session, exchange, slug, key, behaviour == 'data'), headers=headers)
+
+    def do_POST(self):
+        site = self.server
+        site.count('POST')
+        time.sleep(site.latency)
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if site.blocked:
+            return self.send(403, CHALLENGE)
+        session, _ = self.session()
+        if (site.reject_messages or self.headers.get('X-Livewire') != 'true'
+                or self.headers.get('X-CSRF-TOKEN') != site.token(session)):
+            return self.send(419, '<html><head><title>Page Expired</title></head></html>')
+        if not self.path.startswith(f"/livewire/message/{COMPONENT_NAME}"):
+            return self.send(404, NOT_FOUND)
+        try:
+            message = json.loads(body)
+            memo = message['serverMemo']
+            data = memo['data']
+        except (ValueError, KeyError):
+            return self.send(400, 'Bad request')
+        if memo.get('checksum') != site.checksum(data):
+            return self.send(500, 'CorruptComponentPayloadException')
+
+        dirty = {}
+        for update in message.get('updates', []):
+            if update['type'] == 'syncInput' and update['payload']['name'] == 'selectedPeriod':
+                dirty = make_statement_payload(data['statementType'], update['payload']['value'])
+        merged = dict(data, **dirty)
+        answer = {
+            'effects': {'html': f'<div wire:id="{message["fingerprint"]["id"]}">{site.filler[:20000]}</div>',
+                        'dirty': sorted(dirty)},
+            # Like Livewire, only the properties that changed
+            'serverMemo': {'data': dirty, 'checksum': site.checksum(merged), 'htmlHash': secrets.token_hex(4)},
+        }
+        self.send(200, json.dumps(answer), content_type='application/json')
+
+
+def expected_sheets():
+    exporter = FinancialDataExporter('exm', 'Example Corp')
+    all_data = {}
+    for key, name in STATEMENTS:
+        for period in PERIODS_CONFIG[key]:
+            payload = make_statement_payload(key, period)
+            exporter.add_statement(all_data, name, payload['dates'], payload['fieldsData'], payload['selectedPeriod'])
+    return all_data
+
+
+def check(label, ok, detail=''):
+    print(f"{'OK  ' if ok else 'FAIL'} {label}{f'  ({detail})' if detail else ''}")
+    return ok
+
+
+def download(site, client, cache, quiet=True):
+    exporter = FinancialDataExporter('EXM', 'Example Corp')
+    before = Counter(site.counts)
+    start = time.perf_counter()
+    stdout, sys.stdout = sys.stdout, (open('/dev/null', 'w') if quiet else sys.stdout)
+    try:
+        fetched = download_over_http(exporter, 'EXM', 'Example Corp', ALTERNATIVES, STATEMENTS, PERIODS_CONFIG,
+                                     client=client, cache=cache)
+    finally:
+        if quiet:
+            sys.stdout.close()
+        sys.stdout = stdout
+    elapsed = time.perf_counter() - start
+    used = site.counts - before
+    return fetched, elapsed, used
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency-ms', type=float, default=50.0)
+    parser.add_argument('--filler-kb', type=int, default=400)
+    args = parser.parse_args()
+
+    site = StandInSite(args.latency_ms / 1000, args.filler_kb)
+    threading.Thread(target=site.serve_forever, daemon=True).start()
+    cache_dir = tempfile.mkdtemp(prefix='findata-http-')
+    results = []
+    try:
+        client = HttpClient(site_url=site.url, block_cooldown=60)
+        cache = TickerCache(cache_dir)
+        expected = expected_sheets()
+
+        # Cold: search the listings, then every statement and period
+        tracemalloc.start()
+        fetched, elapsed, used = download(site, client, cache)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        page_size = len(site.statement_page('0' * 32, 'nyse', 'exm', 'income-statement').encode('utf-8'))
+        print(f"cold download   {elapsed * 1000:6.0f} ms  {used['GET']} GET, {used['POST']} POST over "
+              f"{used['connections']} connections, peak {peak / 1024:.0f} KiB Python memory")
+        ok = fetched is not None
+        results.append(check('cold download returns a result', ok))
+        if ok:
+            slug, exchange, base_url, company, all_data = fetched
+            results.append(check('resolved the listing with data', (slug, exchange) == ('exm', 'nyse'),
+                                 f"{slug}@{exchange}"))
+            results.append(check('company header and currency', company == ('Example Corp', 'USD'), str(company)))
+            same = sorted(all_data) == sorted(expected) and all(all_data[k].equals(expected[k]) for k in expected)
+            results.append(check('every statement in every period matches the server', same,
+                                 f"{len(all_data)} sheets"))
+            # What a script client is told must not hide listings from the browser fallback
+            recorded = set(cache._load()['missing'])
+            results.append(check('HTTP probe misses are not remembered', not recorded,
+                                 ', '.join(sorted(recorded))))
+            breakdown = fetch_revenue_breakdown_http(FinancialDataExporter('exm'), client, base_url)
+            results.append(check('revenue breakdown from the HTML', breakdown is not None and
+                                 [i['name'] for i in breakdown.get('Geography', {}).get('items', [])] ==
+                                 ['Americas', 'Europe', 'Rest of World'] and
+                                 breakdown.get('Segments', {}).get('total') == 120500.0, str(breakdown)))
+
+            # Streaming parse: the page is abandoned once the component (and the header) are in
+            parser = PageParser('income-statement', include_header=True)
+            status, _, read = read_page(client.session(), f"{base_url}/income-statement", parser)
+            results.append(check('streaming parse stops after the component', parser.done and read < page_size / 2,
+                                 f"read {read / 1024:.0f} of {page_size / 1024:.0f} KiB"))
+
+        # Warm: the listing comes from the ticker cache
+        fetched, elapsed, used = download(site, client, cache)
+        print(f"warm download   {elapsed * 1000:6.0f} ms  {used['GET']} GET, {used['POST']} POST over "
+              f"{used['connections']} connections")
+        results.append(check('warm download skips the listing search', fetched is not None and used['GET'] == 3,
+                             f"{used['GET']} GET"))
+
+        # A cached listing whose pages lost the component is searched for again
+        cache.store('EXM', 'Example Corp', 'exm', 'lon')
+        fetched, elapsed, used = download(site, client, cache)
+        results.append(check('stale cached listing is searched for again',
+                             fetched is not None and fetched[:2] == ('exm', 'nyse'),
+                             f"{fetched[:2] if fetched else None}, {used['GET']} GET"))
+
+        # Livewire messages rejected: fall back to the browser, the backend stays on
+        site.reject_messages = True
+        fetched, elapsed, used = download(site, client, cache)
+        site.reject_messages = False
+        results.append(check('rejected Livewire messages fall back to the browser',
+                             fetched is None and client.available(), f"{used['POST']} POST"))
+
+        # Anti-bot wall: fall back, pause the backend, remember nothing
+        site.blocked = True
+        cold_cache = TickerCache(tempfile.mkdtemp(dir=cache_dir))
+        fetched, elapsed, used = download(site, client, cold_cache)
+        results.append(check('an anti-bot wall falls back and pauses the backend',
+                             fetched is None and not client.available() and not cold_cache._load()['missing'],
+                             f"{used['GET']} GET, {elapsed * 1000:.0f} ms"))
+        fetched, elapsed, used = download(site, client, cold_cache)
+        results.append(check('while paused no requests are made', fetched is None and not used['GET'],
+                             f"{used['GET']} GET"))
+        site.blocked = False
+    finally:
+        site.shutdown()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print('OK' if all(results) else 'FAIL')
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == '__main__':
+    main()
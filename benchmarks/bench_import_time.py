@@ -0,0 +1,79 @@
+"""
+Check the cold import time of the web server module against a budget.
+
+    python benchmarks/bench_import_time.py [--module web_gui] [--budget-ms 400]
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter,
+reports the cumulative import time and the slowest top-level imports, and
+fails if the budget is exceeded or if a heavy dependency (selenium, pandas,
+tkinter, ...) is pulled in at import time instead of on first use.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only needed once a download or the universe load actually runs
+LAZY_MODULES = ('selenium', 'webdriver_manager', 'pandas', 'numpy', 'tkinter', 'PIL')
+
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def measure(module):
+    """Return [(cumulative_us, depth, name)] for one cold import of module."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        sys.exit(f"import {module} failed:\n{result.stderr}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            cumulative, indent, name = int(match.group(2)), match.group(3), match.group(4)
+            entries.append((cumulative, (len(indent) - 1) // 2, name))
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--module', default='web_gui')
+    parser.add_argument('--budget-ms', type=float, default=400.0)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.repeat)]
+    # Best of N: the first run may still be warming the OS page cache
+    best = min(runs, key=lambda entries: entries[-1][0])
+    total_ms = best[-1][0] / 1000
+
+    print(f"import {args.module}: {total_ms:.1f} ms (best of {args.repeat}, budget {args.budget_ms:.0f} ms)")
+    # Direct children of the module are the depth-1 entries since the previous top-level import
+    start = max((i for i, e in enumerate(best[:-1]) if e[1] == 0), default=-1) + 1
+    children = [e for e in best[start:-1] if e[1] == 1]
+    print(f"slowest imports under {args.module}:")
+    for cumulative, _, name in sorted(children, reverse=True)[:8]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    loaded = {name.split('.')[0] for _, _, name in best}
+    eager = [name for name in LAZY_MODULES if name in loaded]
+
+    failed = False
+    if eager:
+        print(f"FAIL: imported eagerly: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"FAIL: {total_ms:.1f} ms exceeds the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Time find_valid_ticker() against a simulated browser and check its verdicts.
+
+    python benchmarks/bench_listing_probe.py [--timeout 1.0]
+
+Each simulated listing page moves through PROBE_STATE_SCRIPT states on a
+timeline (e.g. 'loaded' at once, 'found' when its table renders 0.6 s
+later). The scenarios check that a higher-priority listing whose table is
+merely slow still wins over a faster lower-priority hit, that definite
+misses (HTTP 404, redirects) end their probe early, and that a page which
+never shows its table is only given up on at the timeout, as undecided.
+"""
+import argparse
+import itertools
+import time
+
+import synthetic  # noqa: F401  (puts the repository root on sys.path)
+
+from findata_core import PerformanceTimer, find_valid_ticker
+import findata_core
+
+
+class SwitchTo:
+    def __init__(self, browser):
+        self.browser = browser
+
+    def window(self, handle):
+        self.browser.current = handle
+
+
+class ProbeBrowser:
+    """window.open / switch_to / close and PROBE_STATE_SCRIPT over scripted page timelines."""
+
+    def __init__(self, timelines):
+        self.timelines = timelines  # ticker -> [(seconds after opening, state), ...]
+        self.tabs = {'main': None}
+        self.current = 'main'
+        self.ids = itertools.count()
+        self.switch_to = SwitchTo(self)
+
+    @property
+    def current_window_handle(self):
+        return self.current
+
+    @property
+    def window_handles(self):
+        return list(self.tabs)
+
+    def execute_script(self, script, *args):
+        if script.startswith('window.open'):
+            self.tabs[f"tab-{next(self.ids)}"] = (args[0].split('/')[5], time.monotonic())
+            return None
+        assert script is findata_core.PROBE_STATE_SCRIPT
+        ticker, opened = self.tabs[self.current]
+        elapsed = time.monotonic() - opened
+        states = [state for at, state in self.timelines.get(ticker, []) if at <= elapsed]
+        return states[-1] if states else 'pending'
+
+    def close(self):
+        del self.tabs[self.current]
+
+
+# (label, {ticker: timeline}, candidates in priority order, expected winner, expected misses)
+SCENARIOS = [
+    ('slow table keeps priority',
+     {'first': [(0.1, 'loaded'), (0.6, 'found')], 'second': [(0.1, 'found')]},
+     ['first', 'second'], 'first', []),
+    ('definite misses end early',
+     {'gone': [(0.1, 'HTTP 404')], 'moved': [(0.1, 'redirected to /search')], 'hit': [(0.2, 'found')]},
+     ['gone', 'moved', 'hit'], 'hit', [('gone', 'missing'), ('moved', 'missing')]),
+    ('no table waits for the timeout',
+     {'empty': [(0.1, 'loaded')], 'hit': [(0.1, 'found')]},
+     ['empty', 'hit'], 'hit', [('empty', 'timeout')]),
+]
+
+
+def run(label, timelines, candidates, timeout):
+    misses = []
+    timer = PerformanceTimer()
+    start = time.perf_counter()
+    result = find_valid_ticker(ProbeBrowser(timelines), [(ticker, 'nyse') for ticker in candidates],
+                               on_miss=lambda idx, ticker, exchange, outcome: misses.append((ticker, outcome)),
+                               timer=timer, timeout=timeout)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed * 1000:7.0f} ms  winner={result and result[0]}  misses={misses}")
+    return (result[0] if result else None), misses, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--timeout', type=float, default=1.0)
+    args = parser.parse_args()
+
+    failures = 0
+    for label, timelines, candidates, winner, expected_misses in SCENARIOS:
+        result, misses, elapsed = run(label, timelines, candidates, args.timeout)
+        if result != winner or misses != expected_misses:
+            print(f"  FAIL: expected winner={winner} misses={expected_misses}")
+            failures += 1
+        elif label == 'definite misses end early' and elapsed >= args.timeout:
+            print(f"  FAIL: definite misses took the full {args.timeout:.1f}s timeout")
+            failures += 1
+    print("OK" if not failures else f"{failures} scenario(s) FAILED")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""
+Benchmark /api/search-style typeahead queries.
+
+    python benchmarks/bench_search.py [--rows 50000] [--queries 500]
+
+Replays a mix of ticker prefixes, name fragments and misses (about a
+quarter of them filtered to one exchange) against the previous pandas
+mask path and SearchIndex.search(), reports p50 / p99 latency for each
+and checks that both return the same rows in the same order. Misspelled
+company names are then timed against SearchIndex.fuzzy_search(), which
+also reports how often the intended company is the first result or within
+the top 5 / top --limit, and checks a few hand-picked typos.
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from synthetic import make_universe
+
+from findata_core import normalize_company_name, normalize_company_names
+from search_index import SearchIndex
+from universe import add_exchange_columns
+
+
+def legacy_search(df, query, exchange, limit=50):
+    """The DataFrame masks /api/search ran per keystroke before SearchIndex."""
+    if exchange and exchange != 'ALL':
+        filtered = df[df['Exchange'] == exchange]
+    else:
+        filtered = df
+    exact = filtered[filtered['Symbol'].str.upper() == query]
+    starts = filtered[
+        (filtered['Symbol'].str.upper().str.startswith(query, na=False)) &
+        (filtered['Symbol'].str.upper() != query)
+    ]
+    name_match = filtered[
+        filtered['Name'].str.upper().str.contains(query, na=False, regex=False) &
+        ~filtered['Symbol'].str.upper().str.startswith(query, na=False)
+    ]
+    return pd.concat([exact, starts, name_match]).head(limit)
+
+
+def make_queries(df, count, seed=0):
+    """(query, exchange) pairs: typed prefixes of tickers and of name words, plus misses."""
+    rng = random.Random(seed)
+    symbols = df['Symbol'].tolist()
+    names = df['Name'].tolist()
+    exchanges = df['Exchange'].astype(object).unique().tolist()
+    queries = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.45:
+            symbol = rng.choice(symbols)
+            query = symbol[:rng.randint(1, len(symbol))]
+        elif kind < 0.9:
+            words = rng.choice(names).split() or ['X']
+            word = rng.choice(words)
+            query = word[:rng.randint(1, len(word))]
+        else:
+            query = ''.join(rng.choice('QXZJ') for _ in range(rng.randint(2, 5)))
+        exchange = rng.choice(exchanges) if rng.random() < 0.25 else 'ALL'
+        queries.append((query.upper().strip(), exchange))
+    return queries
+
+
+def misspell(text, rng):
+    """Swap, drop or double one character, the way fast typists do."""
+    if len(text) < 3:
+        return text
+    i = rng.randrange(len(text) - 1)
+    edit = rng.randrange(3)
+    if edit == 0:
+        return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+    if edit == 1:
+        return text[:i] + text[i + 1:]
+    return text[:i] + text[i] + text[i:]
+
+
+def make_fuzzy_queries(df, count, seed=0):
+    """((misspelled name, exchange), intended normalized name) pairs."""
+    rng = random.Random(seed)
+    names = [name for name in df['Name'].tolist() if len(name) >= 5]
+    queries = []
+    for _ in range(count):
+        name = rng.choice(names)
+        queries.append(((misspell(name.upper(), rng), 'ALL'), normalize_company_name(name)))
+    return queries
+
+
+def hit_rates(normalized_names, results, targets, cutoffs):
+    """Share of queries whose intended company is among the first k rows, per k."""
+    hits = dict.fromkeys(cutoffs, 0)
+    for rows, target in zip(results, targets):
+        names = normalized_names[rows].tolist()
+        for k in cutoffs:
+            hits[k] += target in names[:k]
+    return {k: hits[k] / max(len(results), 1) for k in cutoffs}
+
+
+# (query, name that must come first) among look-alike names
+RANKING_CASES = [('MICROSOFT', 'Microsoft Corporation'), ('MICROSFOT', 'Microsoft Corporation'),
+                 ('MICROSOFT CORP', 'Microsoft Corporation'), ('ALPHABET', 'Alphabet Inc.')]
+LOOKALIKES = ['Icrosoft', 'Microstar', 'Mosoft', 'Microsoft Corporation', 'Alpha Bet Group', 'Alphabet Inc.',
+              'Alphabeta Holdings', 'Micro Soft Tech Ltd']
+
+
+def check_ranking(df):
+    """Rank RANKING_CASES against the universe plus LOOKALIKES; returns [(query, expected, first name)]."""
+    extra = pd.DataFrame({'Symbol': [f"ZZ{i}" for i in range(len(LOOKALIKES))], 'Name': LOOKALIKES,
+                          'Exchange': df['Exchange'].iloc[0]})
+    combined = pd.concat([df[['Symbol', 'Name', 'Exchange']], extra], ignore_index=True)
+    index = SearchIndex(combined)
+    outcomes = []
+    for query, expected in RANKING_CASES:
+        rows = index.fuzzy_search(query, 'ALL', 10)
+        outcomes.append((query, expected, combined['Name'].iloc[rows[0]] if len(rows) else None))
+    return outcomes
+
+
+def latencies(search, queries):
+    timings = []
+    results = []
+    for query, exchange in queries:
+        start = time.perf_counter()
+        results.append(search(query, exchange))
+        timings.append(time.perf_counter() - start)
+    return np.array(timings) * 1000, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=50_000)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+
+    df = add_exchange_columns(make_universe(args.rows))
+    queries = [q for q in make_queries(df, args.queries) if q[0]]
+
+    start = time.perf_counter()
+    index = SearchIndex(df)
+    print(f"SearchIndex build         {args.rows:>8} rows: {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+    legacy_ms, legacy_results = latencies(
+        lambda q, ex: list(legacy_search(df, q, ex, args.limit).index), queries)
+    index_ms, index_results = latencies(
+        lambda q, ex: df.index[index.search(q, ex, args.limit)].tolist(), queries)
+
+    for label, ms in (('pandas masks', legacy_ms), ('SearchIndex', index_ms)):
+        print(f"{label:<25} {len(queries):>8} queries: p50 {np.percentile(ms, 50):7.3f} ms  "
+              f"p99 {np.percentile(ms, 99):7.3f} ms  max {ms.max():7.3f} ms")
+    identical = legacy_results == index_results
+    print(f"p50 speedup x{np.percentile(legacy_ms, 50) / np.percentile(index_ms, 50):.1f}, "
+          f"p99 speedup x{np.percentile(legacy_ms, 99) / np.percentile(index_ms, 99):.1f}, identical={identical}")
+
+    fuzzy_queries, targets = zip(*make_fuzzy_queries(df, args.queries))
+    fuzzy_ms, fuzzy_results = latencies(lambda q, ex: index.fuzzy_search(q, ex, args.limit), fuzzy_queries)
+    print(f"{'fuzzy (misspelled names)':<25} {len(fuzzy_queries):>8} queries: p50 {np.percentile(fuzzy_ms, 50):7.3f} ms  "
+          f"p99 {np.percentile(fuzzy_ms, 99):7.3f} ms  max {fuzzy_ms.max():7.3f} ms")
+    normalized_names = np.asarray(normalize_company_names(df['Name'].fillna('')), dtype=object)
+    rates = hit_rates(normalized_names, fuzzy_results, targets, (1, 5, args.limit))
+    print("intended company in " + ", ".join(f"top {k}: {rate:.1%}" for k, rate in rates.items()))
+
+    failures = 0
+    for query, expected, first in check_ranking(df):
+        ok = first == expected
+        failures += not ok
+        print(f"  {'ok  ' if ok else 'FAIL'} {query!r:<18} first: {first!r} (expected {expected!r})")
+    print("OK" if not failures else f"{failures} ranking check(s) FAILED")
+
+
+if __name__ == '__main__':
+    main()
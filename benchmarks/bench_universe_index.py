@@ -0,0 +1,79 @@
+"""
+Benchmark universe index construction (company_tickers / ticker_to_company).
+
+    python benchmarks/bench_universe_index.py [--rows 500000] [--legacy-rows 50000]
+
+Times UniverseIndex.from_dataframe() at the requested size and the previous
+iterrows() loop on a smaller universe, and checks both expose identical
+mappings.
+"""
+import argparse
+import time
+from collections import defaultdict
+
+from synthetic import make_universe
+
+from findata_core import normalize_company_name
+from universe import UniverseIndex, add_exchange_columns
+
+
+def legacy_build_ticker_index(df):
+    """The per-row loop the loaders used before UniverseIndex."""
+    company_tickers = defaultdict(list)
+    ticker_to_company = {}
+    for _, row in df.iterrows():
+        symbol = row['Symbol']
+        name = row['Name']
+        exchange = row['AlphaSpreadExchange']
+        normalized_name = normalize_company_name(name)
+        if normalized_name:
+            company_tickers[normalized_name].append({
+                'symbol': symbol,
+                'exchange': exchange,
+                'original_name': name
+            })
+        ticker_to_company[symbol.upper()] = {
+            'name': name,
+            'normalized_name': normalized_name,
+            'exchange': exchange
+        }
+    return company_tickers, ticker_to_company
+
+
+def time_build(build, df, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = build(df)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=500_000)
+    parser.add_argument('--legacy-rows', type=int, default=50_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    df = add_exchange_columns(make_universe(args.rows))
+    elapsed, index = time_build(UniverseIndex, df, args.repeat)
+    print(f"UniverseIndex             {args.rows:>8} rows: {elapsed * 1000:8.1f} ms "
+          f"({len(index.company_tickers)} groups, {len(index.ticker_to_company)} symbols)")
+
+    if args.legacy_rows:
+        small = add_exchange_columns(make_universe(args.legacy_rows))
+        legacy_elapsed, (company_tickers, ticker_to_company) = time_build(legacy_build_ticker_index, small, 1)
+        columnar_elapsed, index = time_build(UniverseIndex, small, args.repeat)
+        identical = (
+            dict(company_tickers) == dict(index.company_tickers.items())
+            and ticker_to_company == dict(index.ticker_to_company.items())
+        )
+        print(f"legacy iterrows loop      {args.legacy_rows:>8} rows: {legacy_elapsed * 1000:8.1f} ms")
+        print(f"UniverseIndex             {args.legacy_rows:>8} rows: {columnar_elapsed * 1000:8.1f} ms "
+              f"(speedup x{legacy_elapsed / columnar_elapsed:.1f}, identical={identical})")
+
+
+if __name__ == '__main__':
+    main()
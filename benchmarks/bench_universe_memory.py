@@ -0,0 +1,85 @@
+"""
+Measure resident size of the loaded universe with tracemalloc.
+
+    python benchmarks/bench_universe_memory.py [--rows 50000]
+
+Compares the previous layout (object-dtype DataFrame plus dict-of-dicts
+company_tickers / ticker_to_company) against the compact UniverseIndex
+(categorical exchanges, shared name strings, integer row references), as
+the Tk app builds it and as the web server does, with the typeahead
+structures built up front.
+"""
+import argparse
+import gc
+import io
+import tracemalloc
+
+import pandas as pd
+
+from synthetic import make_universe
+from bench_universe_index import legacy_build_ticker_index
+
+from findata_core import EXCHANGE_MAPPING, normalize_company_name
+from universe import UniverseIndex, parse_universe_csv
+
+
+def legacy_load(csv_bytes):
+    """Parse and index the CSV the way the loaders did before the compact store."""
+    df = pd.read_csv(io.BytesIO(csv_bytes))
+    df = df.rename(columns={'symbol': 'Symbol', 'name': 'Name', 'Exchange': 'ExchangeCode', 'Exchange Name': 'ExchangeName'})
+    df['Symbol'] = df['Symbol'].astype(str).str.strip()
+    df['Name'] = df['Name'].fillna('')
+    df['Exchange'] = df['ExchangeCode'].fillna('')
+    df['AlphaSpreadExchange'] = df['ExchangeCode'].map(lambda x: EXCHANGE_MAPPING.get(x, x.lower() if x else 'nyse'))
+    company_tickers, ticker_to_company = legacy_build_ticker_index(df)
+    # The memoized normalizer is not part of the legacy layout
+    normalize_company_name.cache_clear()
+    return df, company_tickers, ticker_to_company
+
+
+def compact_load(csv_bytes):
+    return UniverseIndex.from_dataframe(parse_universe_csv(csv_bytes))
+
+
+def searchable_load(csv_bytes):
+    return UniverseIndex.searchable_from_dataframe(parse_universe_csv(csv_bytes))
+
+
+def measure(load, csv_bytes):
+    """Return (retained bytes, peak bytes) for the object graph built by load()."""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    result = load(csv_bytes)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return retained - baseline, peak - baseline
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=50_000)
+    args = parser.parse_args()
+
+    df = make_universe(args.rows).rename(columns={
+        'Symbol': 'symbol', 'Name': 'name', 'ExchangeCode': 'Exchange', 'ExchangeName': 'Exchange Name'
+    })
+    csv_bytes = df.to_csv(index=False).encode('utf-8')
+    del df
+
+    before, before_peak = measure(legacy_load, csv_bytes)
+    after, after_peak = measure(compact_load, csv_bytes)
+    web, web_peak = measure(searchable_load, csv_bytes)
+
+    mb = 1024 * 1024
+    print(f"{args.rows} listings")
+    print(f"  before (dict-of-dicts): {before / mb:8.1f} MB retained, {before_peak / mb:8.1f} MB peak")
+    print(f"  after  (UniverseIndex): {after / mb:8.1f} MB retained, {after_peak / mb:8.1f} MB peak")
+    print(f"  saved: {(before - after) / mb:.1f} MB ({1 - after / before:.0%})")
+    print(f"  web server (searchable): {web / mb:7.1f} MB retained, {web_peak / mb:8.1f} MB peak")
+
+
+if __name__ == '__main__':
+    main()
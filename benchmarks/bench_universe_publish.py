@@ -0,0 +1,76 @@
+"""
+Time publishing a universe and check that publishes are ordered by download.
+
+    python benchmarks/bench_universe_publish.py [--rows 50000]
+
+The cached universe and its background refresh are built on different
+threads and may finish in either order. Publishes a freshly downloaded
+universe and then the older cached one, through UniverseLoader (web
+server) and SimpleFinanceGUI.apply_companies (Tk app), and checks that
+the fresher one stays in place both times; an in-order refresh must still
+replace the cached copy.
+"""
+import argparse
+import time
+from types import SimpleNamespace
+
+from synthetic import make_universe
+
+from search_index import SearchIndex
+from universe import UniverseLoader, stamp_universe
+
+
+def make_pair(rows):
+    """(cached, refreshed) universes downloaded an hour apart, told apart by row count."""
+    now = time.time()
+    return (stamp_universe(make_universe(rows, seed=1), now - 3600),
+            stamp_universe(make_universe(rows + 1, seed=2), now))
+
+
+def check_loader(cached, refreshed):
+    """Rows of the published universe after each order of publishes."""
+    outcomes = {}
+    for label, order in (('in order', (cached, refreshed)), ('out of order', (refreshed, cached))):
+        loader = UniverseLoader()
+        start = time.perf_counter()
+        for df in order:
+            loader.publish(df.copy())
+        elapsed = time.perf_counter() - start
+        outcomes[label] = len(loader.current)
+        print(f"UniverseLoader {label:<14} {elapsed * 1000:8.1f} ms  published {len(loader.current)} rows "
+              f"(version {loader.version})")
+    return outcomes
+
+
+def check_tk(cached, refreshed):
+    """Rows shown by the Tk app after each order of apply_companies() calls."""
+    from financial_data_gui import SimpleFinanceGUI
+
+    outcomes = {}
+    for label, order in (('in order', (cached, refreshed)), ('out of order', (refreshed, cached))):
+        app = SimpleNamespace(universe_fetched_at=0.0, companies_df=None,
+                              refresh_exchange_choices=lambda: None, on_search=lambda: None,
+                              list_hint_label=SimpleNamespace(config=lambda **kwargs: None))
+        for df in order:
+            display_df = stamp_universe(df[['Symbol', 'Name']].assign(Exchange=df['ExchangeCode']),
+                                        df.attrs['fetched_at'])
+            SimpleFinanceGUI.apply_companies(app, display_df, SearchIndex(display_df))
+        outcomes[label] = len(app.companies_df)
+        print(f"Tk app         {label:<14}            shows {len(app.companies_df)} rows")
+    return outcomes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=50_000)
+    args = parser.parse_args()
+
+    cached, refreshed = make_pair(args.rows)
+    expected = {'in order': len(refreshed), 'out of order': len(refreshed)}
+    results = {'UniverseLoader': check_loader(cached, refreshed), 'Tk app': check_tk(cached, refreshed)}
+    failed = [name for name, outcomes in results.items() if outcomes != expected]
+    print("OK" if not failed else f"FAILED: {', '.join(failed)} kept the older universe")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,298 @@
+"""
+Count the WebDriver commands one download's statement extraction issues.
+
+    python benchmarks/bench_webdriver_commands.py [--round-trip-ms 300] [--command-ms 5]
+
+Runs the extraction step (company header, currency, every statement in
+every period, three statement tabs) against a simulated browser whose
+Livewire components answer a period switch after --round-trip-ms, and
+counts every command sent to the driver or to an element:
+
+- dropdown waves: per-tab extraction, then one wave per period clicking
+  the period dropdown (period_switch='dom')
+- component waves: the same waves switching periods through the Livewire
+  component (period_switch='livewire')
+- batched: fetch_statements(), one script per tab gathering everything
+- network: fetch_statements() reading the periods from the Livewire XHR
+  responses in the performance log (extraction='network')
+- network, no ids: the same, with one tab's requests missing the fingerprint
+  id (tied to the tab through the log entry's webview) and requests from
+  another component and an unknown tab mixed in; both network runs must
+  capture every switch without falling back to reading the page
+
+--command-ms adds a fixed cost per command to show its effect on wall time.
+"""
+import argparse
+import json
+import time
+from collections import Counter
+
+from selenium.common.exceptions import NoSuchElementException
+
+from synthetic import make_statement_payload
+
+import findata_core
+from findata_core import FinancialDataExporter
+
+STATEMENTS = [
+    ('income-statement', 'Income Statement'),
+    ('balance-sheet', 'Balance Sheet'),
+    ('cash-flow-statement', 'Cash Flow Statement'),
+]
+PERIODS_CONFIG = {
+    'income-statement': ['Annual', 'Quarterly', 'TTM'],
+    'balance-sheet': ['Annual', 'Quarterly'],
+    'cash-flow-statement': ['Annual', 'Quarterly', 'TTM'],
+}
+
+
+class Tab:
+    """One statement page: a Livewire component that switches periods after a round trip."""
+
+    def __init__(self, key, round_trip):
+        self.key = key
+        self.round_trip = round_trip
+        self.selected = 'Annual'
+        self.switch = None  # (period, ready_at)
+        self.menu_open = False
+
+    def settle(self):
+        if self.switch and time.monotonic() >= self.switch[1]:
+            self.selected = self.switch[0]
+            self.switch = None
+
+    def state(self):
+        self.settle()
+        return make_statement_payload(self.key, self.selected)
+
+    def set_period(self, period):
+        self.switch = (period, time.monotonic() + self.round_trip)
+
+    def wait(self):
+        if self.switch:
+            time.sleep(max(0.0, self.switch[1] - time.monotonic()))
+        self.settle()
+
+
+class Element:
+    def __init__(self, browser, kind, text=''):
+        self.browser = browser
+        self.kind = kind
+        self._text = text
+
+    @property
+    def text(self):
+        self.browser.count('element.text')
+        return self._text
+
+    def get_attribute(self, name):
+        self.browser.count('element.get_attribute')
+        tab = self.browser.tab
+        if name == 'wire:id':
+            return tab.key
+        if name == 'wire:initial-data':
+            return json.dumps({'serverMemo': {'data': tab.state()}})
+        return None
+
+    def is_displayed(self):
+        self.browser.count('element.is_displayed')
+        return self.kind != 'menu' or self.browser.tab.menu_open
+
+    def find_element(self, by, selector):
+        self.browser.count('element.find_element')
+        return Element(self.browser, 'item')
+
+    def find_elements(self, by, selector):
+        self.browser.count('element.find_elements')
+        return [Element(self.browser, 'item', period) for period in ('Annual', 'Quarterly', 'TTM')]
+
+
+class SwitchTo:
+    def __init__(self, browser):
+        self.browser = browser
+
+    def window(self, handle):
+        self.browser.count('switch_to.window')
+        self.browser.current = handle
+
+
+class SimulatedBrowser:
+    """Just enough of selenium's WebDriver for the extraction paths, counting every command."""
+
+    def __init__(self, round_trip, command_cost, fingerprintless=(), noise=False):
+        self.tabs = {key: Tab(key, round_trip) for key, _ in STATEMENTS}
+        self.fingerprintless = set(fingerprintless)
+        self.noise = noise
+        self.current = STATEMENTS[0][0]
+        self.command_cost = command_cost
+        self.commands = Counter()
+        self.switch_to = SwitchTo(self)
+        self.bodies = {}
+
+    def count(self, command):
+        self.commands[command] += 1
+        if self.command_cost:
+            time.sleep(self.command_cost)
+
+    @property
+    def tab(self):
+        return self.tabs[self.current]
+
+    def find_element(self, by, selector):
+        self.count('find_element')
+        if 'Currency' in selector:
+            return Element(self, 'text', 'Currency: USD')
+        if selector.endswith('.menu'):
+            if not self.tab.menu_open:
+                raise NoSuchElementException(selector)
+            return Element(self, 'menu')
+        if 'h1' in selector:
+            return Element(self, 'text', 'Example Corp')
+        return Element(self, 'statement')
+
+    def execute_script(self, script, *args):
+        self.count('execute_script')
+        tab = self.tab
+        if script is findata_core.BATCH_START_SCRIPT:
+            # The page switches through the periods on its own, one round trip each
+            current = tab.state()
+            switches = [period for period in args[1] if period != current['selectedPeriod']]
+            payloads = [current] + [make_statement_payload(tab.key, period) for period in switches]
+            now = time.monotonic()
+            tab.batch = (payloads, args[2], now + len(switches) * tab.round_trip)
+            tab.responses = [(now + (i + 1) * tab.round_trip, payload) for i, payload in enumerate(payloads[1:])]
+            header = {'header': 'Example Corp', 'currency': 'Currency: USD'} if args[2] else {}
+            return dict(header, id=tab.key, initial=current, switches=len(switches))
+        if script is findata_core.PERIOD_SET_SCRIPT:
+            tab.set_period(args[1])
+            return True
+        if script is findata_core.LIVEWIRE_WATCH_SCRIPT:
+            return {'id': tab.key, 'selected': tab.state()['selectedPeriod']}
+        if script is findata_core.LIVEWIRE_UPDATED_SCRIPT:
+            tab.settle()
+            return tab.switch is None
+        if 'Livewire.find' in script:
+            return json.dumps(tab.state())
+        if script.startswith('arguments[0].click') and args[0].kind == 'statement':
+            tab.menu_open = True
+        elif script.startswith('arguments[0].click') and args[0].kind == 'item':
+            tab.menu_open = False
+            tab.set_period(args[0]._text)
+        return None
+
+    @staticmethod
+    def target_id(key):
+        """DevTools target id of a tab (deliberately not its window handle)."""
+        return f"TARGET-{key.upper()}"
+
+    def livewire_request(self, request_id, target, fingerprint):
+        """Performance log entries, as ChromeDriver shapes them, for one Livewire message round trip."""
+        post = json.dumps({'fingerprint': fingerprint, 'updates': []})
+        return [{'message': json.dumps({'webview': target, 'message': {'method': method, 'params': params}})}
+                for method, params in (
+                    ('Network.requestWillBeSent', {'requestId': request_id, 'request': {
+                        'url': f'https://example.test/livewire/message/{fingerprint.get("name", "x")}',
+                        'postData': post}}),
+                    ('Network.loadingFinished', {'requestId': request_id}))]
+
+    def get_log(self, log_type):
+        """Performance log: a Livewire message request/response pair per completed switch."""
+        self.count('get_log')
+        entries = []
+        now = time.monotonic()
+        for tab in self.tabs.values():
+            while getattr(tab, 'responses', None) and tab.responses[0][0] <= now:
+                _, payload = tab.responses.pop(0)
+                request_id = f"{tab.key}-{len(self.bodies)}"
+                self.bodies[request_id] = (tab.key, payload)
+                fingerprint = {'name': tab.key} if tab.key in self.fingerprintless else {'id': tab.key, 'name': tab.key}
+                if self.noise:
+                    # The page's search box, and a tab that is not one of ours
+                    entries += self.livewire_request(f"search-{request_id}", self.target_id(tab.key),
+                                                     {'id': 'search-box', 'name': 'search'})
+                    entries += self.livewire_request(f"other-{request_id}", 'TARGET-OTHER', {'name': 'watchlist'})
+                entries += self.livewire_request(request_id, self.target_id(tab.key), fingerprint)
+        return entries
+
+    def execute_cdp_cmd(self, command, params):
+        self.count('execute_cdp_cmd')
+        if command == 'Target.getTargetInfo':
+            return {'targetInfo': {'targetId': self.target_id(self.current), 'type': 'page'}}
+        key, payload = self.bodies[params['requestId']]
+        if key != self.current:
+            raise RuntimeError('No resource with given identifier found')
+        return {'body': json.dumps({'effects': {}, 'serverMemo': {'data': payload}}), 'base64Encoded': False}
+
+    def execute_async_script(self, script, *args):
+        self.count('execute_async_script')
+        tab = self.tab
+        if script is findata_core.PERIOD_AWAIT_SCRIPT:
+            tab.wait()
+            return json.dumps(tab.state())
+        if script is findata_core.BATCH_AWAIT_SCRIPT:
+            payloads, include_header, done_at = tab.batch
+            time.sleep(max(0.0, done_at - time.monotonic()))
+            tab.selected = payloads[-1]['selectedPeriod']
+            header = {'header': 'Example Corp', 'currency': 'Currency: USD'} if include_header else {}
+            return json.dumps(dict(header, payloads=payloads, error=None))
+        return None
+
+
+def waves(exporter, driver, handles):
+    """The extraction sequence both apps ran before fetch_statements()."""
+    driver.switch_to.window(handles[0])
+    company = exporter.extract_company_info(driver)
+    all_data = {}
+    for idx, (key, name) in enumerate(STATEMENTS):
+        driver.switch_to.window(handles[idx])
+        exporter.collect_statement(driver, key, name, all_data)
+    for period in ('Annual', 'Quarterly', 'TTM'):
+        exporter.fetch_period_wave(driver, period, STATEMENTS, handles, PERIODS_CONFIG, all_data)
+    return company, all_data
+
+
+def batched(exporter, driver, handles):
+    return exporter.fetch_statements(driver, STATEMENTS, handles, PERIODS_CONFIG)
+
+
+def run(label, extract, period_switch, args, extraction='page', **browser):
+    driver = SimulatedBrowser(args.round_trip_ms / 1000, args.command_ms / 1000, **browser)
+    exporter = FinancialDataExporter('EXM', 'Example Corp')
+    exporter.period_switch = period_switch
+    exporter.extraction = extraction
+    handles = [key for key, _ in STATEMENTS]
+    start = time.perf_counter()
+    company, all_data = extract(exporter, driver, handles)
+    elapsed = time.perf_counter() - start
+    total = sum(driver.commands.values())
+    print(f"{label:<16} {total:5d} commands  {elapsed * 1000:7.0f} ms  "
+          f"{len(all_data)} sheets  company={company}")
+    for command, count in driver.commands.most_common():
+        print(f"    {count:5d}  {command}")
+    return total, sorted(all_data), driver.commands
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--round-trip-ms', type=float, default=300.0)
+    parser.add_argument('--command-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    results = [
+        run('dropdown waves', waves, 'dom', args),
+        run('component waves', waves, 'livewire', args),
+        run('batched', batched, 'livewire', args),
+        run('network', batched, 'livewire', args, extraction='network'),
+        run('network, no ids', batched, 'livewire', args, extraction='network',
+            fingerprintless=('balance-sheet',), noise=True),
+    ]
+    sheets = {tuple(keys) for _, keys, _ in results}
+    print(f"batched vs dropdown waves: {results[0][0]} -> {results[2][0]} commands "
+          f"(x{results[0][0] / results[2][0]:.1f} fewer), same sheets={len(sheets) == 1}")
+    # A network run that missed a response reads that tab's page with the async batch script
+    fallbacks = [commands['execute_async_script'] for _, _, commands in results[3:]]
+    print("OK" if len(sheets) == 1 and not any(fallbacks) else f"FAILED (page fallbacks: {fallbacks})")
+
+
+if __name__ == '__main__':
+    main()
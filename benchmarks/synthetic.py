@@ -0,0 +1,89 @@
+"""
+Synthetic exchange universes and statement payloads for the benchmarks.
+
+Produces DataFrames shaped like universe.parse_universe_csv() output, with
+company names repeated across exchanges the way cross-listings are, and
+Livewire statement payloads (dates / fieldsData / selectedPeriod) shaped
+like the ones FinancialDataExporter.parse_data() reads.
+"""
+import os
+import sys
+import random
+
+import pandas as pd
+
+# Allow running benchmarks from the repository root or this folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+EXCHANGES = [
+    ('OTC', 'US OTC'), ('FRA', 'Frankfurt Stock Exchange'), ('BOM', 'Bombay Stock Exchange'),
+    ('TYO', 'Tokyo Stock Exchange'), ('LON', 'London Stock Exchange'), ('NASDAQ', 'Nasdaq'),
+    ('SHE', 'Shenzhen Stock Exchange'), ('HKG', 'Hong Kong Stock Exchange'), ('NYSE', 'New York Stock Exchange'),
+    ('ASX', 'Australian Securities Exchange'), ('TSX', 'Toronto Stock Exchange'), ('XETR', 'Xetra'),
+]
+WORDS = [
+    'apple', 'micro', 'soft', 'alpha', 'beta', 'global', 'energy', 'bank', 'sands', 'pacific',
+    'united', 'tech', 'pharma', 'systems', 'capital', 'mining', 'gold', 'oil', 'nasa', 'saab',
+    'agri', 'sea', 'motors', 'foods', 'retail', 'steel', 'power', 'health', 'media', 'semi',
+]
+SUFFIXES = ['Inc.', 'Corp', 'Corporation', 'Ltd', 'Limited', 'PLC', 'S.A.', 'AG', 'SE', 'N.V.',
+            'Holdings', 'Group', 'Co.', '& Co', '']
+
+
+def make_universe(rows=50_000, listings_per_company=1.7, seed=0):
+    """Build a synthetic universe DataFrame with Symbol/Name/ExchangeCode/ExchangeName columns."""
+    rng = random.Random(seed)
+    companies = []
+    for _ in range(max(1, int(rows / listings_per_company))):
+        words = ' '.join(rng.choice(WORDS).capitalize() for _ in range(rng.randint(1, 3)))
+        companies.append(f"{words} {rng.choice(SUFFIXES)}".strip())
+
+    letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    symbols, names, codes, exchange_names = [], [], [], []
+    for _ in range(rows):
+        if rng.random() < 0.15:
+            symbols.append(f"{rng.randint(1, 9999):04d}")
+        else:
+            symbols.append(''.join(rng.choice(letters) for _ in range(rng.randint(1, 5))))
+        names.append(rng.choice(companies) if rng.random() > 0.01 else '')
+        code, exchange_name = rng.choice(EXCHANGES)
+        codes.append(code)
+        exchange_names.append(exchange_name)
+
+    return pd.DataFrame({
+        'Symbol': symbols,
+        'Name': names,
+        'ExchangeCode': codes,
+        'ExchangeName': exchange_names,
+    })
+
+
+STATEMENT_FIELDS = {
+    'income-statement': ['Revenue', 'Cost of Revenue', 'Gross Profit', 'Operating Income', 'Net Income', 'EPS Diluted'],
+    'balance-sheet': ['Cash & Equivalents', 'Total Current Assets', 'Total Assets', 'Total Liabilities', 'Total Equity'],
+    'cash-flow-statement': ['Operating Cash Flow', 'Capital Expenditures', 'Free Cash Flow', 'Dividends Paid'],
+}
+
+
+def make_statement_payload(statement_type, period, columns=10, seed=0):
+    """Livewire data for one statement in one period: {'dates', 'fieldsData', 'selectedPeriod'}."""
+    rng = random.Random(f"{seed}/{statement_type}/{period}")
+    if period == 'Annual':
+        dates = [f"{2024 - i}-12-31" for i in range(columns)]
+    else:
+        dates = [f"{2024 - i // 4}-{12 - (i % 4) * 3:02d}-{30 if (i % 4) in (1, 2) else 31}" for i in range(columns)]
+    fields = []
+    for name in STATEMENT_FIELDS[statement_type]:
+        per_share = 'EPS' in name
+        fields.append({
+            'name': name,
+            'ingroupType': '',
+            'unit': 'usd_per_share' if per_share else 'usd',
+            'values': [{'value': round(rng.uniform(0.5, 9), 2) if per_share else rng.randint(10**8, 10**11)}
+                       for _ in dates],
+        })
+    return {
+        'dates': [{'date': f"{d}T00:00:00.000000Z"} for d in dates],
+        'fieldsData': {'main': fields},
+        'selectedPeriod': period,
+    }
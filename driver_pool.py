@@ -0,0 +1,327 @@
+"""
+Pool of pre-launched headless Chrome drivers shared by downloads.
+
+Launching Chrome (and resolving chromedriver) takes several seconds, so
+both apps check a warm driver out of this pool instead of starting one per
+download. Drivers are health-checked on checkout, cleaned up (extra tabs
+closed, blank page, cookies cleared) on checkin, and recycled after a
+number of jobs. selenium is imported on first launch only.
+
+Pool size comes from FINDATA_DRIVER_POOL_SIZE (default 1: each app runs one
+download at a time).
+
+The chromedriver path resolved by webdriver-manager is cached on disk
+together with the Chrome version it was resolved for, and reused without
+any network access until the installed Chrome changes, or until Chrome
+refuses to start with it. FINDATA_CHROMEDRIVER points at a pre-provisioned
+driver and skips resolution entirely.
+"""
+import os
+import json
+import time
+import atexit
+import threading
+
+from findata_core import EXTRACTION_BACKEND
+from universe import cache_path, _write_atomic
+
+
+POOL_SIZE = int(os.environ.get('FINDATA_DRIVER_POOL_SIZE') or 1)
+# Restart a driver after this many jobs so a long-running app doesn't accumulate browser state
+MAX_USES = int(os.environ.get('FINDATA_DRIVER_MAX_USES') or 25)
+
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+
+# Pre-provisioned chromedriver (air-gapped hosts, pinned installs)
+CHROMEDRIVER_OVERRIDE = os.environ.get('FINDATA_CHROMEDRIVER')
+CHROMEDRIVER_META_FILENAME = 'chromedriver.json'
+
+_chromedriver_lock = threading.Lock()
+_chromedriver_path = None
+
+
+def chrome_options():
+    """Headless Chrome options tuned for scraping (no images, CSS or notifications)."""
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument('--headless=new')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--window-size=1920,1080')
+    options.add_argument(f'--user-agent={USER_AGENT}')
+    # Performance optimizations
+    options.add_argument('--disable-gpu')
+    options.add_argument('--disable-extensions')
+    options.add_argument('--disable-infobars')
+    options.add_argument('--disable-logging')
+    options.add_argument('--log-level=3')
+    options.add_argument('--blink-settings=imagesEnabled=false')  # Disable images
+    options.add_experimental_option('excludeSwitches', ['enable-logging'])
+    options.page_load_strategy = 'eager'  # Don't wait for all resources
+    prefs = {
+        'profile.managed_default_content_settings.images': 2,  # Block images
+        'profile.managed_default_content_settings.stylesheets': 2,  # Block CSS
+        'profile.default_content_setting_values.notifications': 2,
+        'disk-cache-size': 4096
+    }
+    options.add_experimental_option('prefs', prefs)
+    if EXTRACTION_BACKEND == 'network':
+        # Network.* events (Livewire XHRs) for FinancialDataExporter.capture_livewire_responses
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    return options
+
+
+def installed_chrome_version():
+    """
+    Version of the locally installed Chrome (read from the OS, no network), or None.
+    Also None with webdriver-manager 3.x, which has no core.os_manager.
+    """
+    try:
+        from webdriver_manager.core.os_manager import OperationSystemManager, ChromeType
+
+        return OperationSystemManager().get_browser_version_from_os(ChromeType.GOOGLE)
+    except Exception:
+        return None
+
+
+def read_chromedriver_meta(cache_dir=None):
+    """Read the cached resolution (driver_path, chrome_version, resolved_at)."""
+    try:
+        with open(cache_path(CHROMEDRIVER_META_FILENAME, cache_dir), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def resolve_chromedriver(cache_dir=None, override=CHROMEDRIVER_OVERRIDE):
+    """
+    Path of a chromedriver matching the installed Chrome.
+
+    Order: the explicit override, the in-process result, the on-disk cache
+    when it was resolved for the same Chrome version (or the version cannot
+    be read), and only then webdriver-manager, which may hit the network.
+    If that fails, a cached driver for another Chrome version is still
+    better than none.
+    """
+    global _chromedriver_path
+    if override:
+        if not os.path.isfile(override):
+            raise FileNotFoundError(f"FINDATA_CHROMEDRIVER does not exist: {override}")
+        return override
+
+    with _chromedriver_lock:
+        if _chromedriver_path and os.path.isfile(_chromedriver_path):
+            return _chromedriver_path
+
+        meta = read_chromedriver_meta(cache_dir)
+        cached_path = meta.get('driver_path')
+        has_cached = bool(cached_path) and os.path.isfile(cached_path)
+        chrome_version = installed_chrome_version()
+        if has_cached and (chrome_version is None or chrome_version == meta.get('chrome_version')):
+            _chromedriver_path = cached_path
+            return cached_path
+
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        try:
+            driver_path = ChromeDriverManager().install()
+        except Exception as e:
+            if not has_cached:
+                raise
+            print(f"Could not resolve chromedriver for Chrome {chrome_version}, using cached driver: {e}")
+            _chromedriver_path = cached_path
+            return cached_path
+
+        meta = {'driver_path': driver_path, 'chrome_version': chrome_version, 'resolved_at': time.time()}
+        try:
+            _write_atomic(cache_path(CHROMEDRIVER_META_FILENAME, cache_dir),
+                          json.dumps(meta, indent=2).encode('utf-8'))
+        except OSError as e:
+            print(f"Could not cache chromedriver location: {e}")
+        _chromedriver_path = driver_path
+        return driver_path
+
+
+def forget_chromedriver(cache_dir=None):
+    """Drop the in-process and on-disk chromedriver resolution so the next one starts over."""
+    global _chromedriver_path
+    with _chromedriver_lock:
+        _chromedriver_path = None
+        try:
+            os.remove(cache_path(CHROMEDRIVER_META_FILENAME, cache_dir))
+        except OSError:
+            pass
+
+
+def launch_driver():
+    """
+    Start a new headless Chrome. If Chrome refuses the resolved chromedriver
+    (typically after Chrome updated itself and the version could not be
+    read to notice), the resolution is forgotten and redone once.
+    """
+    from selenium import webdriver
+    from selenium.common.exceptions import SessionNotCreatedException
+    from selenium.webdriver.chrome.service import Service
+
+    try:
+        return webdriver.Chrome(service=Service(resolve_chromedriver()), options=chrome_options())
+    except SessionNotCreatedException as e:
+        if CHROMEDRIVER_OVERRIDE:
+            raise
+        print(f"Chrome refused the cached chromedriver, resolving it again: {e.msg}")
+        forget_chromedriver()
+        return webdriver.Chrome(service=Service(resolve_chromedriver()), options=chrome_options())
+
+
+def quit_driver(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+def is_healthy(driver):
+    """True if the browser still answers commands."""
+    try:
+        return driver.execute_script('return 1') == 1
+    except Exception:
+        return False
+
+
+def reset_driver(driver):
+    """Close every tab but one, clear cookies and park it on a blank page."""
+    handles = driver.window_handles
+    for handle in handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(handles[0])
+    driver.delete_all_cookies()
+    driver.get('about:blank')
+    if EXTRACTION_BACKEND == 'network':
+        driver.get_log('performance')  # Don't let the next job wade through this one's traffic
+
+
+class DriverPool:
+    """
+    Fixed-size pool of Chrome drivers with checkout/checkin.
+
+    `checkout()` hands out an idle driver (after a health check), launches
+    one if the pool is not full yet, or waits for a checkin. `checkin()`
+    cleans the driver for the next job; drivers that fail cleanup or hit
+    MAX_USES are quit and replaced in the background.
+    """
+
+    def __init__(self, size=POOL_SIZE, launch=launch_driver, max_uses=MAX_USES):
+        self.size = size
+        self.launch = launch
+        self.max_uses = max_uses
+        self._idle = []
+        self._uses = {}
+        self._count = 0  # Drivers alive or being launched
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def _launch(self):
+        """Launch one driver, keeping the count right if Chrome fails to start."""
+        try:
+            driver = self.launch()
+        except Exception:
+            with self._cond:
+                self._count -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._uses[id(driver)] = 0
+        return driver
+
+    def _discard(self, driver):
+        quit_driver(driver)
+        with self._cond:
+            self._uses.pop(id(driver), None)
+            self._count -= 1
+            self._cond.notify()
+
+    def warm(self, count=None):
+        """Launch drivers on a background thread until `count` (default: pool size) are alive."""
+        def worker():
+            while True:
+                with self._cond:
+                    if self._closed or self._count >= min(count or self.size, self.size):
+                        return
+                    self._count += 1
+                try:
+                    driver = self._launch()
+                except Exception as e:
+                    print(f"Could not pre-launch Chrome: {e}")
+                    return
+                self._release(driver)
+
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        return thread
+
+    def _release(self, driver):
+        with self._cond:
+            if self._closed:
+                quit_driver(driver)
+                self._count -= 1
+                return
+            self._idle.append(driver)
+            self._cond.notify()
+
+    def checkout(self, timeout=None):
+        """Get a ready driver (warm if one is idle). Raises TimeoutError if none frees up in time."""
+        while True:
+            with self._cond:
+                while not self._idle and self._count >= self.size:
+                    if not self._cond.wait(timeout):
+                        raise TimeoutError("No browser became available")
+                if self._idle:
+                    driver = self._idle.pop()
+                else:
+                    driver = None
+                    self._count += 1
+
+            if driver is None:
+                driver = self._launch()
+            elif not is_healthy(driver):
+                print("Discarding unresponsive browser from the pool")
+                self._discard(driver)
+                continue
+
+            with self._cond:
+                self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+            return driver
+
+    def checkin(self, driver):
+        """Return a driver after a job: clean it for reuse, or replace it if it is worn out or broken."""
+        if driver is None:
+            return
+        with self._cond:
+            worn_out = self._uses.get(id(driver), 0) >= self.max_uses
+        if not worn_out:
+            try:
+                reset_driver(driver)
+            except Exception as e:
+                print(f"Browser cleanup failed, replacing it: {e}")
+                worn_out = True
+        if worn_out:
+            self._discard(driver)
+            self.warm()
+            return
+        self._release(driver)
+
+    def close(self):
+        """Quit every idle driver; drivers checked out are quit when checked in."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._count -= len(idle)
+        for driver in idle:
+            quit_driver(driver)
+
+
+# Shared by the web server and the Tk app
+driver_pool = DriverPool()
+atexit.register(driver_pool.close)
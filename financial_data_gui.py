@@ -4,10 +4,6 @@ import pandas as pd
 import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
-import re
-import json
-import time
-from datetime import datetime as dt
 import random
 from collections import defaultdict
 
@@ -18,323 +14,23 @@ try:
 except ImportError:
     HAS_PIL = False
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+# Mappings, normalization, parsing and the Excel writer live in the GUI-free core
+# (re-exported here for existing imports)
+from findata_core import (
+    EXCHANGE_MAPPING, EXCHANGE_DISPLAY_NAMES, EXCHANGE_SORT_ORDER, CURRENCY_SYMBOLS,
+    COMPANY_NAME_SUFFIXES, INCOME_STATEMENT_FORMULAS, BALANCE_SHEET_FORMULAS, CASH_FLOW_FORMULAS,
+    SHEET_ORDER, get_currency_symbol, normalize_ticker_for_alphaspread, normalize_company_name,
+    normalize_company_names, get_column_letter, PerformanceTimer, open_statement_tabs,
+    FinancialDataExporter
+)
+from search_index import SearchIndex
+from search_cache import SearchContext
+from driver_pool import driver_pool
+from ticker_cache import ticker_cache, resolve_listing
+from http_backend import FETCH_BACKEND, http_client, download_over_http, fetch_revenue_breakdown_http
 
 
-# Exchange mapping for AlphaSpread URLs
-EXCHANGE_MAPPING = {
-    'NYSE': 'nyse',
-    'NASDAQ': 'nasdaq',
-    'OTC': 'otc',
-    'US OTC': 'otc',
-    'FRA': 'xetra',  # Frankfurt uses xetra on AlphaSpread
-    'Frankfurt Stock Exchange': 'xetra',
-    'TYO': 'tse',  # Tokyo Stock Exchange
-    'Tokyo Stock Exchange': 'tse',
-    'HKEX': 'hkex',
-    'Hong Kong Stock Exchange': 'hkex',
-    'BOM': 'bse',  # Bombay Stock Exchange
-    'Bombay Stock Exchange': 'bse',
-    'LSE': 'lse',  # London Stock Exchange
-    'London Stock Exchange': 'lse',
-    'TSX': 'tsx',  # Toronto Stock Exchange
-    'ASX': 'asx',  # Australian Stock Exchange
-}
-
-# Exchange code to full name mapping (sorted by number of listings)
-EXCHANGE_DISPLAY_NAMES = {
-    'OTC': 'OTC - US OTC Markets',
-    'US OTC': 'OTC - US OTC Markets',
-    'FRA': 'FRA - Frankfurt Stock Exchange',
-    'Frankfurt Stock Exchange': 'FRA - Frankfurt Stock Exchange',
-    'BOM': 'BOM - Bombay Stock Exchange',
-    'Bombay Stock Exchange': 'BOM - Bombay Stock Exchange',
-    'TYO': 'TYO - Tokyo Stock Exchange',
-    'Tokyo Stock Exchange': 'TYO - Tokyo Stock Exchange',
-    'LON': 'LON - London Stock Exchange',
-    'LSE': 'LON - London Stock Exchange',
-    'London Stock Exchange': 'LON - London Stock Exchange',
-    'NASDAQ': 'NASDAQ - Nasdaq Stock Market',
-    'SHE': 'SHE - Shenzhen Stock Exchange',
-    'NSE': 'NSE - National Stock Exchange of India',
-    'HKG': 'HKG - Hong Kong Stock Exchange',
-    'HKEX': 'HKG - Hong Kong Stock Exchange',
-    'Hong Kong Stock Exchange': 'HKG - Hong Kong Stock Exchange',
-    'SHA': 'SHA - Shanghai Stock Exchange',
-    'NYSE': 'NYSE - New York Stock Exchange',
-    'ASX': 'ASX - Australian Securities Exchange',
-    'KOSDAQ': 'KOSDAQ - KOSDAQ',
-    'TSXV': 'TSXV - TSX Venture Exchange',
-    'TPEX': 'TPEX - Taipei Exchange',
-    'BIT': 'BIT - Borsa Italiana',
-    'BKK': 'BKK - Stock Exchange of Thailand',
-    'TPE': 'TPE - Taiwan Stock Exchange',
-    'KLSE': 'KLSE - Bursa Malaysia',
-    'ETR': 'ETR - Deutsche Börse Xetra',
-    'BVMF': 'BVMF - Brazil Stock Exchange',
-    'KRX': 'KRX - Korea Stock Exchange',
-    'IDX': 'IDX - Indonesia Stock Exchange',
-    'VIE': 'VIE - Vienna Stock Exchange',
-    'STO': 'STO - Nasdaq Stockholm',
-    'EPA': 'EPA - Euronext Paris',
-    'WSE': 'WSE - Warsaw Stock Exchange',
-    'TSX': 'TSX - Toronto Stock Exchange',
-    'BMV': 'BMV - Mexican Stock Exchange',
-    'CSE': 'CSE - Canadian Securities Exchange',
-    'AIM': 'AIM - London Stock Exchange AIM',
-    'IST': 'IST - Istanbul Stock Exchange',
-    'TLV': 'TLV - Tel Aviv Stock Exchange',
-    'PSX': 'PSX - Pakistan Stock Exchange',
-    'SGX': 'SGX - Singapore Exchange',
-    'HOSE': 'HOSE - Ho Chi Minh Stock Exchange',
-    'TADAWUL': 'TADAWUL - Saudi Stock Exchange',
-    'DSE': 'DSE - Dhaka Stock Exchange',
-    'COSE': 'COSE - Colombo Stock Exchange',
-    'OSL': 'OSL - Oslo Børs',
-    'HNX': 'HNX - Hanoi Stock Exchange',
-    'PSE': 'PSE - Philippine Stock Exchange',
-    'JSE': 'JSE - Johannesburg Stock Exchange',
-    'SWX': 'SWX - SIX Swiss Exchange',
-    'BME': 'BME - Madrid Stock Exchange',
-    'AMEX': 'AMEX - NYSE American',
-    'EGX': 'EGX - Egyptian Stock Exchange',
-    'SNSE': 'SNSE - Santiago Stock Exchange',
-    'BVL': 'BVL - Lima Stock Exchange',
-    'BCBA': 'BCBA - Buenos Aires Stock Exchange',
-    'HEL': 'HEL - Nasdaq Helsinki',
-    'BVB': 'BVB - Bucharest Stock Exchange',
-    'MOEX': 'MOEX - Moscow Stock Exchange',
-    'SGXC': 'SGXC - Singapore Exchange Catalist',
-    'CPH': 'CPH - Copenhagen Stock Exchange',
-    'ATH': 'ATH - Athens Stock Exchange',
-    'ASE': 'ASE - Amman Stock Exchange',
-    'NGX': 'NGX - Nigerian Stock Exchange',
-    'KWSE': 'KWSE - Kuwait Stock Exchange',
-    'EBR': 'EBR - Euronext Brussels',
-    'MUN': 'MUN - Munich Stock Exchange',
-    'NEO': 'NEO - Cboe Canada',
-    'NZE': 'NZE - New Zealand Stock Exchange',
-    'AMS': 'AMS - Euronext Amsterdam',
-    'XKON': 'XKON - Korea New Exchange',
-    'BUL': 'BUL - Bulgarian Stock Exchange',
-    'BST': 'BST - Stuttgart Stock Exchange',
-    'NGM': 'NGM - Nordic Growth Market',
-    'MSM': 'MSM - Muscat Securities Market',
-    'JMSE': 'JMSE - Jamaica Stock Exchange',
-    'ADX': 'ADX - Abu Dhabi Securities Exchange',
-    'LUX': 'LUX - Luxembourg Stock Exchange',
-    'MUSE': 'MUSE - Mauritius Stock Exchange',
-    'BVC': 'BVC - Colombia Stock Exchange',
-    'HAM': 'HAM - Hamburg Stock Exchange',
-    'CBSE': 'CBSE - Casablanca Stock Exchange',
-    'BVMT': 'BVMT - Tunis Stock Exchange',
-    'AQU': 'AQU - Aquis Exchange',
-    'BUD': 'BUD - Budapest Stock Exchange',
-    'DFM': 'DFM - Dubai Financial Market',
-    'PRA': 'PRA - Prague Stock Exchange',
-    'NASE': 'NASE - Nairobi Stock Exchange',
-    'XNGO': 'XNGO - Nagoya Stock Exchange',
-    'ZSE': 'ZSE - Zagreb Stock Exchange',
-    'QSE': 'QSE - Qatar Stock Exchange',
-    'BRVM': 'BRVM - Ivory Coast Stock Exchange',
-    'ELI': 'ELI - Euronext Lisbon',
-    'CYS': 'CYS - Cyprus Stock Exchange',
-    'DUSE': 'DUSE - Dusseldorf Stock Exchange',
-    'PEX': 'PEX - Palestine Stock Exchange',
-    'XSAT': 'XSAT - Spotlight Stock Market',
-    'ZMSE': 'ZMSE - Zimbabwe Stock Exchange',
-    'BAX': 'BAX - Bahrain Stock Exchange',
-    'NMSE': 'NMSE - Namibian Stock Exchange',
-    'ICE': 'ICE - Nasdaq Iceland',
-    'MSE': 'MSE - Malta Stock Exchange',
-    'TAL': 'TAL - Nasdaq Tallinn',
-    'GHSE': 'GHSE - Ghana Stock Exchange',
-    'DAR': 'DAR - Tanzania Stock Exchange',
-    'VSE': 'VSE - Nasdaq Vilnius',
-    'FKSE': 'FKSE - Fukuoka Stock Exchange',
-    'CCSE': 'CCSE - Caracas Stock Exchange',
-    'ISE': 'ISE - Euronext Dublin',
-    'BELEX': 'BELEX - Belgrade Stock Exchange',
-    'KASE': 'KASE - Kazakhstan Stock Exchange',
-    'LUSE': 'LUSE - Lusaka Stock Exchange',
-    'BSM': 'BSM - Botswana Stock Exchange',
-    'SPSE': 'SPSE - Sapporo Stock Exchange',
-    'UGSE': 'UGSE - Uganda Securities Exchange',
-    'LJSE': 'LJSE - Ljubljana Stock Exchange',
-    'MAL': 'MAL - Malawi Stock Exchange',
-    'RSE': 'RSE - Nasdaq Riga',
-    'BDB': 'BDB - Beirut Stock Exchange',
-    'CHIX': 'CHIX - CBOE Europe',
-    'BSSE': 'BSSE - Bratislava Stock Exchange',
-    'UKR': 'UKR - PFTS Stock Exchange',
-}
-
-# Sorted exchange order (by number of listings, descending)
-EXCHANGE_SORT_ORDER = [
-    'OTC', 'US OTC', 'FRA', 'Frankfurt Stock Exchange', 'BOM', 'Bombay Stock Exchange',
-    'TYO', 'Tokyo Stock Exchange', 'LON', 'LSE', 'London Stock Exchange', 'NASDAQ',
-    'SHE', 'NSE', 'HKG', 'HKEX', 'Hong Kong Stock Exchange', 'SHA', 'NYSE', 'ASX',
-    'KOSDAQ', 'TSXV', 'TPEX', 'BIT', 'BKK', 'TPE', 'KLSE', 'ETR', 'BVMF', 'KRX',
-    'IDX', 'VIE', 'STO', 'EPA', 'WSE', 'TSX', 'BMV', 'CSE', 'AIM', 'IST', 'TLV',
-    'PSX', 'SGX', 'HOSE', 'TADAWUL', 'DSE', 'COSE', 'OSL', 'HNX', 'PSE', 'JSE',
-    'SWX', 'BME', 'AMEX', 'EGX', 'SNSE', 'BVL', 'BCBA', 'HEL', 'BVB', 'MOEX',
-    'SGXC', 'CPH', 'ATH', 'ASE', 'NGX', 'KWSE', 'EBR', 'MUN', 'NEO', 'NZE', 'AMS',
-    'XKON', 'BUL', 'BST', 'NGM', 'MSM', 'JMSE', 'ADX', 'LUX', 'MUSE', 'BVC', 'HAM',
-    'CBSE', 'BVMT', 'AQU', 'BUD', 'DFM', 'PRA', 'NASE', 'XNGO', 'ZSE', 'QSE',
-    'BRVM', 'ELI', 'CYS', 'DUSE', 'PEX', 'XSAT', 'ZMSE', 'BAX', 'NMSE', 'ICE',
-    'MSE', 'TAL', 'GHSE', 'DAR', 'VSE', 'FKSE', 'CCSE', 'ISE', 'BELEX', 'KASE',
-    'LUSE', 'BSM', 'SPSE', 'UGSE', 'LJSE', 'MAL', 'RSE', 'BDB', 'CHIX', 'BSSE', 'UKR'
-]
-
-# Currency code to symbol mapping
-CURRENCY_SYMBOLS = {
-    'USD': '$',
-    'EUR': '€',
-    'GBP': '£',
-    'JPY': '¥',
-    'CNY': '¥',
-    'CNH': '¥',
-    'RMB': '¥',
-    'HKD': 'HK$',
-    'CHF': 'CHF ',
-    'CAD': 'C$',
-    'AUD': 'A$',
-    'INR': '₹',
-    'KRW': '₩',
-    'SGD': 'S$',
-    'TWD': 'NT$',
-    'BRL': 'R$',
-    'MXN': 'MX$',
-    'SEK': 'kr ',
-    'NOK': 'kr ',
-    'DKK': 'kr ',
-    'PLN': 'zł ',
-    'THB': '฿',
-    'IDR': 'Rp ',
-    'MYR': 'RM ',
-    'PHP': '₱',
-    'ZAR': 'R ',
-    'RUB': '₽',
-    'TRY': '₺',
-    'ILS': '₪',
-    'AED': 'AED ',
-    'SAR': 'SAR ',
-}
-
-
-def get_currency_symbol(currency_code):
-    """Get currency symbol from currency code."""
-    if not currency_code:
-        return '$'
-    code = currency_code.upper().strip()
-    return CURRENCY_SYMBOLS.get(code, f'{code} ')
-
-
-def normalize_ticker_for_alphaspread(ticker, exchange):
-    """
-    Normalize ticker for AlphaSpread URL.
-    - Strip leading zeros for Hong Kong tickers (0700 -> 700)
-    - Handle other exchange-specific quirks
-    """
-    ticker = str(ticker).strip()
-    
-    # Hong Kong Exchange: strip leading zeros
-    if exchange and exchange.lower() in ['hkex', 'hong kong']:
-        ticker = ticker.lstrip('0') or '0'  # Keep at least one digit
-    
-    return ticker.lower()
-
-
-def normalize_company_name(name):
-    """Normalize company name for matching."""
-    if not name:
-        return ''
-    name = str(name).lower().strip()
-    # Remove common suffixes
-    suffixes = [
-        'inc.', 'inc', 'corp.', 'corp', 'corporation', 'company', 'co.',
-        'ltd.', 'ltd', 'limited', 'plc', 'llc', 's.a.', 'sa', 'ag', 'se',
-        'n.v.', 'nv', 'holdings', 'holding', 'group', 'the', '&'
-    ]
-    for suffix in suffixes:
-        name = name.replace(suffix, ' ')
-    # Remove special characters and extra spaces
-    name = re.sub(r'[^a-z0-9\s]', '', name)
-    name = ' '.join(name.split())
-    return name
-
-
-class PerformanceTimer:
-    """Track timing for different operations."""
-    def __init__(self):
-        self.timings = defaultdict(list)
-        self.start_times = {}
-    
-    def start(self, operation):
-        self.start_times[operation] = time.perf_counter()
-    
-    def stop(self, operation):
-        if operation in self.start_times:
-            elapsed = time.perf_counter() - self.start_times[operation]
-            self.timings[operation].append(elapsed)
-            del self.start_times[operation]
-            return elapsed
-        return 0
-    
-    def get_summary(self):
-        summary = []
-        total = 0
-        for op, times in self.timings.items():
-            op_total = sum(times)
-            total += op_total
-            summary.append(f"  {op}: {op_total:.2f}s ({len(times)} calls)")
-        summary.insert(0, f"Total time: {total:.2f}s")
-        return "\n".join(summary)
-
-
-# Formula definitions for calculated fields
-INCOME_STATEMENT_FORMULAS = {
-    'Gross Profit': {'sources': ['Revenue', 'Cost of Revenue'], 'signs': ['+', '+']},
-    'Operating Income': {'sources': ['Gross Profit', 'Operating Expenses'], 'signs': ['+', '+']},
-    'Pre-Tax Income': {'sources': ['Operating Income', 'Interest Income Expense', 'Non-Reccuring Items', 'Total Other Income'], 'signs': ['+', '+', '+', '+']},
-    'Income from Continuing Operations': {'sources': ['Pre-Tax Income', 'Tax Provision'], 'signs': ['+', '+']},
-    'Net Income (Common)': {'sources': ['Income from Continuing Operations', 'Income to Minority Interest', 'Equity Earnings Affiliates'], 'signs': ['+', '+', '+']},
-}
-
-BALANCE_SHEET_FORMULAS = {
-    'Total Current Assets': {'sources': ['Cash & Cash Equivalents', 'Short-Term Investments', 'Total Receivables', 'Inventory', 'Other Current Assets'], 'signs': ['+', '+', '+', '+', '+']},
-    'Total Assets': {'sources': ['Total Current Assets', 'PP&E Net', 'Intangible Assets', 'Goodwill', 'Long-Term Investments', 'Other Long-Term Assets'], 'signs': ['+', '+', '+', '+', '+', '+']},
-    'Total Current Liabilities': {'sources': ['Accounts Payable', 'Accrued Liabilities', 'Short-Term Debt', 'Current Portion of Long-Term Debt', 'Other Current Liabilities'], 'signs': ['+', '+', '+', '+', '+']},
-    'Total Liabilities': {'sources': ['Total Current Liabilities', 'Long-Term Debt', 'Deferred Income Tax', 'Minority Interest', 'Other Liabilities'], 'signs': ['+', '+', '+', '+', '+']},
-    'Total Equity': {'sources': ['Common Stock', 'Retained Earnings', 'Additional Paid In Capital', 'Unrealized Security Profit/Loss', 'Treasury Stock', 'Other Equity'], 'signs': ['+', '+', '+', '+', '+', '+']},
-    'Total Liabilities & Equity': {'sources': ['Total Liabilities', 'Total Equity'], 'signs': ['+', '+']},
-}
-
-CASH_FLOW_FORMULAS = {
-    'Cash from Operating Activities': {'sources': ['Net Income', 'Depreciation & Amortization', 'Change in Deffered Taxes', 'Other Non-Cash Items', 'Change in Working Capital'], 'signs': ['+', '+', '+', '+', '+']},
-    'Cash from Investing Activities': {'sources': ['Capital Expenditures', 'Other Items'], 'signs': ['+', '+']},
-    'Cash from Financing Activities': {'sources': ['Net Issuance of Common Stock', 'Net Issuance of Debt', 'Cash Paid for Dividends', 'Other'], 'signs': ['+', '+', '+', '+']},
-    'Net Change in Cash': {'sources': ['Cash from Operating Activities', 'Cash from Investing Activities', 'Cash from Financing Activities', 'Effect of Foreign Exchange Rates'], 'signs': ['+', '+', '+', '+']},
-    'Free Cash Flow': {'sources': ['Cash from Operating Activities', 'Capital Expenditures'], 'signs': ['+', '+']},
-}
-
-
-def get_column_letter(col_num):
-    """Convert column number to Excel letter (0=A, 1=B, etc.)"""
-    result = ""
-    while col_num >= 0:
-        result = chr(col_num % 26 + ord('A')) + result
-        col_num = col_num // 26 - 1
-    return result
-
-
-class SimpleFinanceGUI:
+class SimpleFinanceGUI(FinancialDataExporter):
     def __init__(self, root):
         self.root = root
         self.root.title("AlphaSpread Financial Data")
@@ -358,108 +54,120 @@ class SimpleFinanceGUI:
         # Configure root background
         self.root.configure(bg=self.colors['bg_dark'])
         
-        # Load companies from GitHub (combined NYSE + NASDAQ list)
-        self.companies_df = self.load_companies_from_github()
+        # Companies load in the background; start with an empty list so the window opens at once
+        self.companies_df = pd.DataFrame(columns=['Symbol', 'Name', 'Exchange'])
+        self.search_index = SearchIndex(self.companies_df)
+        self.search_context = SearchContext()
+        self.company_tickers = defaultdict(list)
+        self.ticker_to_company = {}
+        self.universe_fetched_at = 0.0  # universe_fetched_at() of the list shown
         
-        self.selected_ticker = None
+        FinancialDataExporter.__init__(self)
         self.selected_exchange = None
-        self.output_file = None
         self.bg_image = None
         self.bg_photo = None
         self.create_ui()
+        self.start_loading_companies()
+        # Pre-launch Chrome while the user picks a company (the HTTP backend launches it on
+        # its first fallback instead)
+        if FETCH_BACKEND == 'browser':
+            driver_pool.warm()
+    
+    def start_loading_companies(self):
+        """Load the company universe on a background thread."""
+        self.list_hint_label.config(text="Loading company list...")
+        
+        def worker():
+            display_df, index = self.load_companies_from_github()
+            search_index = SearchIndex(display_df)
+            self.root.after(0, lambda: self.apply_companies(display_df, search_index, index))
+        
+        thread = threading.Thread(target=worker)
+        thread.daemon = True
+        thread.start()
     
-    def load_companies_from_github(self):
-        """Load company data from GitHub CSV with all exchanges."""
-        import urllib.request
-        import io
+    def apply_companies(self, display_df, search_index, index=None):
+        """
+        Swap in a loaded company list (and the UniverseIndex it came from) and
+        refresh the dropdown and results (Tk thread). The initial load and a
+        background refresh may finish in either order; a list downloaded
+        before the one shown is dropped.
+        """
+        from universe import universe_fetched_at
         
-        url = "https://raw.githubusercontent.com/gosho-st/exchanges/refs/heads/main/all_exchanges_stocks_20251204_201504.csv"
+        fetched_at = universe_fetched_at(display_df)
+        if fetched_at < self.universe_fetched_at:
+            print("Ignoring a company list older than the one already shown")
+            return
+        self.universe_fetched_at = fetched_at
+        if index is not None:
+            self.company_tickers = index.company_tickers
+            self.ticker_to_company = index.ticker_to_company
+        self.companies_df = display_df
+        self.search_index = search_index
+        self.search_context = SearchContext()
+        self.refresh_exchange_choices()
+        self.list_hint_label.config(text="Results (showing 10 random samples)")
+        self.on_search()
+    
+    def load_companies_from_github(self):
+        """
+        Load company data with all exchanges (disk cache first, GitHub refresh in
+        background). Returns (display DataFrame, UniverseIndex or None).
+        """
+        from universe import load_universe
         
         try:
-            # Fetch CSV from GitHub
-            req = urllib.request.Request(
-                url, 
-                headers={'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36'}
-            )
-            with urllib.request.urlopen(req, timeout=30) as response:
-                csv_data = response.read().decode('utf-8')
-            
-            # Parse CSV - columns: symbol, name, Exchange, Exchange Name
-            df = pd.read_csv(io.StringIO(csv_data))
-            
-            # Rename columns for consistency
-            df = df.rename(columns={
-                'symbol': 'Symbol',
-                'name': 'Name',
-                'Exchange': 'ExchangeCode',
-                'Exchange Name': 'ExchangeName'
-            })
-            
-            # Clean up - ensure Symbol is a string
-            df['Symbol'] = df['Symbol'].astype(str).str.strip()
-            df['Name'] = df['Name'].fillna('')
-            
-            # Keep original exchange code for display, map to AlphaSpread format separately
-            df['Exchange'] = df['ExchangeCode'].fillna('')  # Use original code for display
-            df['AlphaSpreadExchange'] = df['ExchangeCode'].map(lambda x: EXCHANGE_MAPPING.get(x, x.lower() if x else 'nyse'))
-            
-            # Build alternative ticker mapping by normalized company name
-            self.company_tickers = defaultdict(list)
-            self.ticker_to_company = {}
-            
-            for _, row in df.iterrows():
-                symbol = row['Symbol']
-                name = row['Name']
-                exchange = row['Exchange']  # Original code for display
-                alphaspread_exchange = row['AlphaSpreadExchange']  # For URL building
-                normalized_name = normalize_company_name(name)
-                
-                # Store ticker info (use AlphaSpread format for URL building)
-                ticker_info = {
-                    'symbol': symbol,
-                    'exchange': alphaspread_exchange,
-                    'original_name': name
-                }
-                
-                # Group by normalized company name
-                if normalized_name:
-                    self.company_tickers[normalized_name].append(ticker_info)
-                
-                # Also allow lookup by ticker
-                self.ticker_to_company[symbol.upper()] = {
-                    'name': name,
-                    'normalized_name': normalized_name,
-                    'exchange': alphaspread_exchange
-                }
-            
-            # Create display DataFrame - prefer major exchanges
-            # Priority: NYSE > NASDAQ > LSE > HKEX > TSE > other OTC
-            exchange_priority = {'NYSE': 1, 'NASDAQ': 2, 'LON': 3, 'HKG': 4, 'TYO': 5, 'FRA': 6, 'ASX': 7, 'TSX': 8, 'OTC': 99}
-            df['ExchangePriority'] = df['Exchange'].map(lambda x: exchange_priority.get(x, 50))
-            
-            # Sort by priority and drop duplicates by name (keep best exchange)
-            df = df.sort_values('ExchangePriority')
-            display_df = df.drop_duplicates(subset='Name', keep='first')
-            
-            # Also keep unique symbols that might be missed
-            all_symbols = df.drop_duplicates(subset='Symbol', keep='first')
-            
-            # Combine - prefer by name, but also include unique symbols
-            display_df = pd.concat([display_df, all_symbols]).drop_duplicates(subset='Symbol', keep='first')
-            
-            print(f"Loaded {len(df)} total listings, {len(display_df)} unique companies")
-            print(f"Built alternative ticker mappings for {len(self.company_tickers)} company groups")
-            
-            return display_df[['Symbol', 'Name', 'Exchange']]
+            df = load_universe(on_refresh=self.on_universe_refresh)
+            if df is None:
+                raise Exception("no cached universe and the download failed")
+            return self.build_company_index(df)
             
         except Exception as e:
             print(f"Failed to load from GitHub: {e}")
             import traceback
             traceback.print_exc()
-            print("Falling back to local files...")
+            print("WARNING: Falling back to local NASDAQ/NYSE files - other exchanges will be missing")
             self.company_tickers = defaultdict(list)
             self.ticker_to_company = {}
-            return self.load_companies_from_local_files()
+            return self.load_companies_from_local_files(), None
+    
+    def build_company_index(self, df):
+        """
+        Build alternative ticker mappings and the display DataFrame from the
+        universe. Returns (display DataFrame, UniverseIndex) for apply_companies().
+        """
+        from universe import UniverseIndex, stamp_universe, universe_fetched_at
+        
+        # Keep original exchange code for display, map to AlphaSpread format separately,
+        # and build alternative ticker mapping by normalized company name
+        index = UniverseIndex.from_dataframe(df)
+        
+        # Create display DataFrame - prefer major exchanges
+        # Priority: NYSE > NASDAQ > LSE > HKEX > TSE > other OTC
+        exchange_priority = {'NYSE': 1, 'NASDAQ': 2, 'LON': 3, 'HKG': 4, 'TYO': 5, 'FRA': 6, 'ASX': 7, 'TSX': 8, 'OTC': 99}
+        df['ExchangePriority'] = df['Exchange'].astype(object).map(lambda x: exchange_priority.get(x, 50))
+        
+        # Sort by priority and drop duplicates by name (keep best exchange)
+        df = df.sort_values('ExchangePriority')
+        display_df = df.drop_duplicates(subset='Name', keep='first')
+        
+        # Also keep unique symbols that might be missed
+        all_symbols = df.drop_duplicates(subset='Symbol', keep='first')
+        
+        # Combine - prefer by name, but also include unique symbols
+        display_df = pd.concat([display_df, all_symbols]).drop_duplicates(subset='Symbol', keep='first')
+        
+        print(f"Loaded {len(df)} total listings, {len(display_df)} unique companies")
+        print(f"Built alternative ticker mappings for {len(index.company_tickers)} company groups")
+        
+        return stamp_universe(display_df[['Symbol', 'Name', 'Exchange']], universe_fetched_at(df)), index
+    
+    def on_universe_refresh(self, df):
+        """Apply a universe refreshed by the background revalidation (runs off the Tk thread)."""
+        display_df, index = self.build_company_index(df)
+        search_index = SearchIndex(display_df)
+        self.root.after(0, lambda: self.apply_companies(display_df, search_index, index))
     
     def load_companies_from_local_files(self):
         """Fallback: Load from local CSV files."""
@@ -490,30 +198,7 @@ class SimpleFinanceGUI:
     def create_ui(self):
         """Create a beautiful modern UI with globe background."""
         
-        # Get unique exchanges from the data and sort by listing count order
-        raw_exchanges = self.companies_df['Exchange'].dropna().unique().tolist()
-        
-        # Sort exchanges by EXCHANGE_SORT_ORDER (most listings first)
-        def sort_key(ex):
-            try:
-                return EXCHANGE_SORT_ORDER.index(ex)
-            except ValueError:
-                return len(EXCHANGE_SORT_ORDER)
-        
-        sorted_exchanges = sorted(raw_exchanges, key=sort_key)
-        
-        # Build display names list with "CODE - Full Name" format
-        self.exchange_code_map = {}
-        display_names = ['All Exchanges']
-        for ex in sorted_exchanges:
-            if ex in EXCHANGE_DISPLAY_NAMES:
-                display_name = EXCHANGE_DISPLAY_NAMES[ex]
-            else:
-                display_name = ex
-            display_names.append(display_name)
-            self.exchange_code_map[display_name] = ex
-        
-        self.available_exchanges = display_names
+        self.refresh_exchange_choices()
         
         # Create main canvas for background
         self.canvas = tk.Canvas(self.root, highlightthickness=0, bg='#dce4ec')
@@ -611,6 +296,17 @@ class SimpleFinanceGUI:
         self.search_entry.pack(fill=tk.X, pady=(2, 0), ipady=4)
         self.search_entry.bind('<KeyRelease>', self.on_search)
         
+        self.fuzzy_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(search_frame,
+                       text="Tolerate typos (rank by similarity)",
+                       variable=self.fuzzy_var,
+                       command=self.on_search,
+                       font=('Helvetica Neue', 9),
+                       fg='#6c757d',
+                       bg='#ffffff',
+                       activebackground='#ffffff',
+                       highlightthickness=0).pack(anchor='w', pady=(2, 0))
+        
         # Results list
         list_label = tk.Label(inner_panel,
                               text="Results (showing 10 random samples)",
@@ -745,6 +441,19 @@ class SimpleFinanceGUI:
         # Keep reference to selected_label for compatibility
         self.selected_label = self.selected_ticker_label
     
+    def refresh_exchange_choices(self):
+        """Rebuild the exchange dropdown choices from the loaded companies."""
+        # Same precomputed (code, "CODE - Full Name") list /api/exchanges serves, most listings first
+        self.exchange_code_map = {}
+        display_names = ['All Exchanges']
+        for ex, display_name in self.search_index.exchange_choices:
+            display_names.append(display_name)
+            self.exchange_code_map[display_name] = ex
+        
+        self.available_exchanges = display_names
+        if hasattr(self, 'exchange_dropdown'):
+            self.exchange_dropdown.config(values=self.available_exchanges)
+    
     def setup_background(self):
         """Load and display the globe background image or create gradient."""
         if not HAS_PIL:
@@ -903,26 +612,26 @@ class SimpleFinanceGUI:
         # Convert display name to actual exchange code
         if selected_display and selected_display != 'All Exchanges':
             selected_exchange = self.exchange_code_map.get(selected_display, selected_display)
-            exchange_filtered = self.companies_df[self.companies_df['Exchange'] == selected_exchange]
         else:
-            exchange_filtered = self.companies_df
-        
-        if search:
-            # When searching, show all matches (up to 100)
-            exact = exchange_filtered[exchange_filtered['Symbol'].str.upper() == search]
-            starts = exchange_filtered[(exchange_filtered['Symbol'].str.upper().str.startswith(search, na=False)) & (exchange_filtered['Symbol'].str.upper() != search)]
-            name_match = exchange_filtered[exchange_filtered['Name'].str.upper().str.contains(search, na=False) & ~exchange_filtered['Symbol'].str.upper().str.startswith(search, na=False)]
-            filtered = pd.concat([exact, starts, name_match]).head(100)
+            selected_exchange = 'ALL'
+        
+        if search and self.fuzzy_var.get():
+            # Typo-tolerant: exact ticker, then names ranked by trigram similarity (up to 100)
+            rows = self.search_index.fuzzy_search(search, selected_exchange, limit=100)
+        elif search:
+            # When searching, show all matches (up to 100): exact ticker, ticker prefix, then name
+            # (typing more characters only re-checks the previous keystroke's matches)
+            rows = self.search_index.search_incremental(search, selected_exchange, self.search_context, limit=100)
         else:
-            # When not searching, show 10 random samples from the selected exchange
-            if len(exchange_filtered) > 10:
-                filtered = exchange_filtered.sample(n=10, random_state=None)  # Random each time
-            else:
-                filtered = exchange_filtered
+            # When not searching, show 10 random samples from the selected exchange (random each time)
+            rows = self.search_index.sample(selected_exchange, 10)
         
-        for _, row in filtered.iterrows():
-            name = str(row['Name'])[:50] if pd.notna(row['Name']) else ''
-            self.listbox.insert(tk.END, f"{row['Symbol']} - {name}")
+        # Read the row positions straight from the columns (no per-row Series)
+        symbols = self.companies_df['Symbol'].to_numpy()[rows]
+        names = self.companies_df['Name'].to_numpy()[rows]
+        for symbol, name in zip(symbols, names):
+            name = str(name)[:50] if pd.notna(name) else ''
+            self.listbox.insert(tk.END, f"{symbol} - {name}")
     
     def on_select(self, event=None):
         sel = self.listbox.curselection()
@@ -1020,72 +729,12 @@ class SimpleFinanceGUI:
         driver = None
         timer = PerformanceTimer()
         timer.start('total')
-        timer.start('browser_init')
         try:
-            options = Options()
-            options.add_argument('--headless=new')
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            options.add_argument('--window-size=1920,1080')
-            options.add_argument('--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36')
-            # Performance optimizations
-            options.add_argument('--disable-gpu')
-            options.add_argument('--disable-extensions')
-            options.add_argument('--disable-infobars')
-            options.add_argument('--disable-logging')
-            options.add_argument('--log-level=3')
-            options.add_argument('--blink-settings=imagesEnabled=false')  # Disable images
-            options.add_experimental_option('excludeSwitches', ['enable-logging'])
-            options.page_load_strategy = 'eager'  # Don't wait for all resources
-            prefs = {
-                'profile.managed_default_content_settings.images': 2,  # Block images
-                'profile.managed_default_content_settings.stylesheets': 2,  # Block CSS
-                'profile.default_content_setting_values.notifications': 2,
-                'disk-cache-size': 4096
-            }
-            options.add_experimental_option('prefs', prefs)
-            
-            driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-            timer.stop('browser_init')
-            
-            all_data = {}
-            
             # Get all alternative tickers to try
             alternatives = self.get_alternative_tickers(ticker, company_name)
             
-            # Try each alternative until we find one that works
-            timer.start('find_valid_ticker')
-            found_ticker = None
-            found_exchange = None
-            
-            self.status(f"Searching across {len(alternatives)} exchange listings...", 6)
-            
-            for idx, (alt_ticker, alt_exchange) in enumerate(alternatives[:10]):  # Limit to first 10 alternatives
-                base_url = f"https://www.alphaspread.com/security/{alt_exchange}/{alt_ticker}/financials"
-                self.status(f"Trying {alt_ticker.upper()} on {alt_exchange.upper()}... ({idx+1}/{min(len(alternatives), 10)})", 6 + idx)
-                
-                try:
-                    driver.get(f"{base_url}/income-statement")
-                    WebDriverWait(driver, 3).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, '.income-statement.statement'))
-                    )
-                    # Found it!
-                    found_ticker = alt_ticker
-                    found_exchange = alt_exchange
-                    print(f"Found data for {ticker} as {alt_ticker} on {alt_exchange}")
-                    break
-                except:
-                    continue
-            
-            timer.stop('find_valid_ticker')
-            
-            if not found_ticker:
-                raise Exception(f"Could not find financial data for {ticker} ({company_name}) on any exchange. Tried: {[f'{t}@{e}' for t, e in alternatives[:10]]}")
-            
-            # Update base_url with the found ticker/exchange
-            base_url = f"https://www.alphaspread.com/security/{found_exchange}/{found_ticker}/financials"
-            self.status(f"Found on {found_exchange.upper()} as {found_ticker.upper()}", 15)
-            timer.start('initial_page_load')
+            def on_probe(idx, count, alt_ticker, alt_exchange):
+                self.status(f"Trying {alt_ticker.upper()} on {alt_exchange.upper()}... ({idx+1}/{count})", 6 + idx)
             
             # Define all the URLs we need to fetch
             statements = [
@@ -1094,144 +743,103 @@ class SimpleFinanceGUI:
                 ('cash-flow-statement', 'Cash Flow Statement')
             ]
             
-            # Open multiple tabs for parallel fetching (3 tabs for 3 statements)
-            self.status("Opening parallel tabs...", 8)
-            timer.start('open_tabs')
-            tab_handles = []
-            original_window = driver.current_window_handle
-            
-            # Open tabs for each statement type
-            for idx, (key, name) in enumerate(statements):
-                if idx == 0:
-                    driver.get(f"{base_url}/{key}")
-                    tab_handles.append(driver.current_window_handle)
-                else:
-                    driver.execute_script("window.open('');")
-                    driver.switch_to.window(driver.window_handles[-1])
-                    driver.get(f"{base_url}/{key}")
-                    tab_handles.append(driver.current_window_handle)
-                time.sleep(0.2)  # Reduced delay
-            
-            # Wait for pages with dynamic check
-            for idx, (key, name) in enumerate(statements):
-                driver.switch_to.window(tab_handles[idx])
-                try:
-                    WebDriverWait(driver, 3).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, f'.{key}.statement'))
-                    )
-                except:
-                    pass  # Continue even if timeout
-            timer.stop('open_tabs')
-            
-            # Fetch default data from all tabs in parallel (round-robin)
-            self.status("Fetching default periods from all statements...", 15)
-            timer.start('extract_default_data')
-            
-            # Extract company info from first tab
-            driver.switch_to.window(tab_handles[0])
-            company_name, currency = self.extract_company_info(driver)
-            self.company_info = {'name': company_name, 'currency': currency}
-            
-            for idx, (key, name) in enumerate(statements):
-                driver.switch_to.window(tab_handles[idx])
-                dates, fields, selected = self.extract_data(driver, key)
-                if dates and fields:
-                    df = self.parse_data(dates, fields, selected)
-                    if df is not None:
-                        all_data[f"{name} ({selected})"] = df
-            timer.stop('extract_default_data')
-            
-            # Now fetch Annual, Quarterly, TTM for each - parallel across tabs
+            # Annual, Quarterly, TTM for each statement
             periods_config = {
                 'income-statement': ['Annual', 'Quarterly', 'TTM'],
                 'balance-sheet': ['Annual', 'Quarterly'],  # No TTM for balance sheet
                 'cash-flow-statement': ['Annual', 'Quarterly', 'TTM']
             }
             
-            # Fetch periods in waves - all Annual first, then all Quarterly, etc.
-            all_periods = ['Annual', 'Quarterly', 'TTM']
-            
-            for period_idx, period in enumerate(all_periods):
-                self.status(f"Fetching {period} data from all statements...", 25 + period_idx * 20)
-                timer.start(f'fetch_{period.lower()}')
+            # Plain HTTP first (pages and Livewire messages, no browser); None means use the browser
+            fetched = None
+            breakdown_data = None
+            if FETCH_BACKEND == 'http':
+                timer.start('http_fetch')
+                self.status(f"Searching across {len(alternatives)} exchange listings...", 6)
+                fetched = download_over_http(self, ticker, company_name, alternatives, statements, periods_config,
+                                             on_probe=on_probe, timer=timer)
+                timer.stop('http_fetch')
+            
+            if fetched:
+                found_ticker, found_exchange, base_url, (company_name, currency), all_data = fetched
+                self.company_info = {'name': company_name, 'currency': currency}
+                print(f"Collected {len(all_data)} sheets over HTTP: {list(all_data.keys())}")
                 
-                # Click period buttons on all applicable tabs
-                for idx, (key, name) in enumerate(statements):
-                    if period in periods_config[key]:
-                        sheet_key = f"{name} ({period})"
-                        if sheet_key not in all_data:
-                            driver.switch_to.window(tab_handles[idx])
-                            self.click_period_fast(driver, period, key)
+                self.status("Fetching Revenue Breakdown...", 75)
+                timer.start('revenue_breakdown')
+                breakdown_data = fetch_revenue_breakdown_http(self, http_client, base_url)
+                timer.stop('revenue_breakdown')
+            else:
+                timer.start('browser_init')
+                # Warm browser from the shared pool (launched in the background at startup)
+                driver = driver_pool.checkout()
+                timer.stop('browser_init')
                 
-                # Wait for Livewire updates - need enough time for data to load
-                time.sleep(2.0)  # Increased - Livewire needs time to fetch and render
+                # Listing from a previous download, or probe the alternatives
+                timer.start('find_valid_ticker')
+                self.status(f"Searching across {len(alternatives)} exchange listings...", 6)
                 
-                for idx, (key, name) in enumerate(statements):
-                    if period in periods_config[key]:
-                        sheet_key = f"{name} ({period})"
-                        if sheet_key not in all_data:
-                            driver.switch_to.window(tab_handles[idx])
-                            dates, fields, selected = self.extract_data_livewire(driver, key)
-                            if dates and fields:
-                                df = self.parse_data(dates, fields, selected)
-                                if df is not None:
-                                    actual_key = f"{name} ({selected})"
-                                    if actual_key not in all_data:
-                                        all_data[actual_key] = df
-                            else:
-                                # Fallback to extract_data
-                                dates, fields, selected = self.extract_data(driver, key)
-                                if dates and fields:
-                                    df = self.parse_data(dates, fields, selected)
-                                    if df is not None:
-                                        actual_key = f"{name} ({selected})"
-                                        if actual_key not in all_data:
-                                            all_data[actual_key] = df
-                timer.stop(f'fetch_{period.lower()}')
+                # Several listings are probed at once in separate tabs; the best-ranked hit wins
+                resolved = resolve_listing(driver, ticker, company_name, alternatives, on_probe=on_probe, timer=timer)
                 
-                # Log what we've collected so far
-                print(f"After {period}: {len(all_data)} sheets collected: {list(all_data.keys())}")
-            
-            # Fetch Revenue Breakdown (use first tab)
-            self.status("Fetching Revenue Breakdown...", 75)
-            timer.start('revenue_breakdown')
-            driver.switch_to.window(tab_handles[0])
-            breakdown_data = self.scrape_revenue_breakdown_fast(driver, base_url)
-            timer.stop('revenue_breakdown')
+                timer.stop('find_valid_ticker')
+                
+                if not resolved:
+                    raise Exception(f"Could not find financial data for {ticker} ({company_name}) on any exchange. Tried: {[f'{t}@{e}' for t, e in alternatives[:10]]}")
+                found_ticker, found_exchange, from_cache = resolved
+                print(f"Found data for {ticker} as {found_ticker} on {found_exchange}{' (cached)' if from_cache else ''}")
+                
+                # Update base_url with the found ticker/exchange
+                base_url = f"https://www.alphaspread.com/security/{found_exchange}/{found_ticker}/financials"
+                self.status(f"Found on {found_exchange.upper()} as {found_ticker.upper()}", 15)
+                timer.start('initial_page_load')
+                
+                # Open multiple tabs for parallel fetching (3 tabs for 3 statements)
+                self.status("Opening parallel tabs...", 8)
+                timer.start('open_tabs')
+                tab_handles, loaded = open_statement_tabs(driver, base_url, statements)
+                
+                if from_cache and statements[0][0] not in loaded:
+                    # The cached listing stopped serving data: forget it and search again
+                    print(f"Cached listing {found_ticker} on {found_exchange} no longer loads, searching again")
+                    ticker_cache.invalidate(ticker, company_name)
+                    resolved = resolve_listing(driver, ticker, company_name, alternatives, on_probe=on_probe,
+                                                use_cache=False, timer=timer)
+                    if not resolved:
+                        raise Exception(f"Could not find financial data for {ticker} ({company_name}) on any exchange.")
+                    found_ticker, found_exchange, _ = resolved
+                    base_url = f"https://www.alphaspread.com/security/{found_exchange}/{found_ticker}/financials"
+                    tab_handles, loaded = open_statement_tabs(driver, base_url, statements, tab_handles)
+                timer.stop('open_tabs')
+                
+                # One script per tab gathers the header, currency and every period, tabs working in parallel
+                # (falls back to per-period waves for anything it could not deliver)
+                self.status("Fetching all periods from all statements...", 15)
+                timer.start('extract_statements')
+                (company_name, currency), all_data = self.fetch_statements(driver, statements, tab_handles, periods_config)
+                self.company_info = {'name': company_name, 'currency': currency}
+                timer.stop('extract_statements')
+                print(f"Collected {len(all_data)} sheets: {list(all_data.keys())}")
+                
+                # Fetch Revenue Breakdown (use first tab)
+                self.status("Fetching Revenue Breakdown...", 75)
+                timer.start('revenue_breakdown')
+                driver.switch_to.window(tab_handles[0])
+                breakdown_data = self.scrape_revenue_breakdown_fast(driver, base_url)
+                timer.stop('revenue_breakdown')
+            
+            if breakdown_data is None:
+                # Not readable from the HTML (rendered by script): the browser gets it
+                timer.start('revenue_breakdown')
+                driver = driver_pool.checkout()
+                breakdown_data = self.scrape_revenue_breakdown_fast(driver, base_url)
+                timer.stop('revenue_breakdown')
             
             if all_data:
                 self.status("Saving with formatting...", 85)
                 timer.start('excel_save')
                 
-                # Pre-create format objects once for reuse
-                self._workbook = None
-                self._formats = {}
-                
-                with pd.ExcelWriter(self.output_file, engine='xlsxwriter') as writer:
-                    # Define the desired sheet order (Balance Sheet TTM not available)
-                    sheet_order = [
-                        'Income Statement (Annual)',
-                        'Balance Sheet (Annual)',
-                        'Cash Flow Statement (Annual)',
-                        'Income Statement (Quarterly)',
-                        'Balance Sheet (Quarterly)',
-                        'Cash Flow Statement (Quarterly)',
-                        'Income Statement (TTM)',
-                        'Cash Flow Statement (TTM)',
-                    ]
-                    
-                    # Write sheets in the specified order
-                    for sheet_name in sheet_order:
-                        if sheet_name in all_data:
-                            self.format_excel_sheet_optimized(writer, all_data[sheet_name], sheet_name[:31])
-                    
-                    # Write any remaining sheets that weren't in the order list
-                    for sheet_name, df in all_data.items():
-                        if sheet_name not in sheet_order:
-                            self.format_excel_sheet_optimized(writer, df, sheet_name[:31])
-                    
-                    if breakdown_data:
-                        self.format_revenue_breakdown_sheet(writer, breakdown_data)
+                self.save_workbook(all_data, breakdown_data)
                 
                 timer.stop('excel_save')
                 timer.stop('total')
@@ -1254,501 +862,10 @@ class SimpleFinanceGUI:
             import traceback
             traceback.print_exc()
         finally:
-            if driver:
-                driver.quit()
+            # Hand the browser back (tabs closed, blank page) for the next download
+            driver_pool.checkin(driver)
             self.root.after(0, lambda: self.fetch_btn.config(state=tk.NORMAL))
     
-    def extract_company_info(self, driver):
-        """Extract company name and currency from the page."""
-        company_name = self.selected_ticker.upper()
-        currency = 'USD'
-        
-        try:
-            # Try to get company name from the page header
-            header = driver.find_element(By.CSS_SELECTOR, '.security-header h1, .company-name, h1.title')
-            if header:
-                company_name = header.text.strip()
-        except:
-            pass
-        
-        try:
-            # Try to get currency from the page
-            currency_elem = driver.find_element(By.XPATH, "//*[contains(text(), 'Currency:')]") 
-            if currency_elem:
-                text = currency_elem.text
-                if 'USD' in text:
-                    currency = 'USD'
-                elif 'EUR' in text:
-                    currency = 'EUR'
-                elif 'GBP' in text:
-                    currency = 'GBP'
-                else:
-                    # Extract currency code
-                    import re
-                    match = re.search(r'Currency:\s*([A-Z]{3})', text)
-                    if match:
-                        currency = match.group(1)
-        except:
-            pass
-        
-        return company_name, currency
-    
-    def extract_data(self, driver, statement_type):
-        try:
-            elem = driver.find_element(By.CSS_SELECTOR, f'.{statement_type}.statement')
-            wire = elem.get_attribute('wire:initial-data')
-            if wire:
-                data = json.loads(wire).get('serverMemo', {}).get('data', {})
-                return data.get('dates', []), data.get('fieldsData', {}), data.get('selectedPeriod', 'Unknown')
-        except:
-            pass
-        return None, None, None
-    
-    def extract_data_livewire(self, driver, statement_type):
-        try:
-            elem = driver.find_element(By.CSS_SELECTOR, f'.{statement_type}.statement')
-            wire_id = elem.get_attribute('wire:id')
-            if wire_id:
-                script = f"""
-                    var component = window.Livewire.find('{wire_id}');
-                    if (component) {{
-                        return JSON.stringify({{
-                            dates: component.get('dates'),
-                            fieldsData: component.get('fieldsData'),
-                            selectedPeriod: component.get('selectedPeriod')
-                        }});
-                    }}
-                    return null;
-                """
-                result = driver.execute_script(script)
-                if result:
-                    data = json.loads(result)
-                    return data.get('dates', []), data.get('fieldsData', {}), data.get('selectedPeriod', 'Unknown')
-        except:
-            pass
-        return None, None, None
-    
-    def click_period_fast(self, driver, period, statement_type):
-        """Optimized version of click_period with minimal waits."""
-        try:
-            dropdown = driver.find_element(By.CSS_SELECTOR, f'.{statement_type}.statement .vperiod.dropdown')
-            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", dropdown)
-            driver.execute_script("arguments[0].click();", dropdown)
-            
-            # Use WebDriverWait instead of fixed sleep
-            try:
-                WebDriverWait(driver, 2).until(
-                    EC.visibility_of_element_located((By.CSS_SELECTOR, f'.{statement_type}.statement .vperiod.dropdown .menu'))
-                )
-            except:
-                time.sleep(0.5)  # Fallback
-            
-            menu = driver.find_element(By.CSS_SELECTOR, f'.{statement_type}.statement .vperiod.dropdown .menu')
-            items = menu.find_elements(By.CSS_SELECTOR, '.item')
-            
-            # Try exact match first, then partial match
-            for item in items:
-                item_text = item.text.strip().lower()
-                if period.lower() == item_text or period.lower() in item_text:
-                    driver.execute_script("arguments[0].click();", item)
-                    time.sleep(0.5)  # Brief wait after click for Livewire to start updating
-                    return True
-            
-            print(f"Available periods for {statement_type}: {[i.text for i in items]}")
-        except Exception as e:
-            print(f"Error clicking period {period} for {statement_type}: {e}")
-        return False
-    
-    def click_period(self, driver, period, statement_type):
-        """Original click_period kept for backward compatibility."""
-        return self.click_period_fast(driver, period, statement_type)
-    
-    def parse_data(self, dates, fields_data, period_type):
-        date_labels, date_keys = [], []
-        for d in dates:
-            date_str = d.get('date', d)[:10] if isinstance(d, dict) else str(d)[:10]
-            try:
-                parsed = dt.strptime(date_str, '%Y-%m-%d')
-                label = f"FY{parsed.year}" if period_type == 'Annual' else f"Q{(parsed.month-1)//3+1}/{parsed.year}"
-                date_labels.append(label)
-                date_keys.append(parsed)
-            except:
-                date_labels.append(date_str)
-                date_keys.append(None)
-        
-        rows = []
-        for group, items in fields_data.items():
-            for item in items:
-                row = {'Field': item.get('name', ''), '_Type': item.get('ingroupType', '')}
-                unit = item.get('unit', 'usd')
-                for i, val in enumerate(item.get('values', [])):
-                    if i < len(date_labels):
-                        v = val.get('value', 0)
-                        if v and unit != 'usd_per_share' and 'EPS' not in item.get('name', ''):
-                            v = v / 1_000_000
-                        row[date_labels[i]] = v or 0
-                rows.append(row)
-        
-        df = pd.DataFrame(rows)
-        fixed = ['Field', '_Type']
-        date_cols = [c for c in df.columns if c not in fixed]
-        col_map = {date_labels[i]: date_keys[i] for i in range(len(date_labels)) if date_keys[i]}
-        sorted_cols = sorted(date_cols, key=lambda x: col_map.get(x, dt.min))
-        return df[fixed + sorted_cols]
-    
-    def scrape_revenue_breakdown_fast(self, driver, base_url):
-        """Optimized Revenue Breakdown scraper with reduced waits."""
-        try:
-            driver.get(f"{base_url}/revenue-breakdown")
-            
-            # Use explicit wait instead of fixed sleep
-            try:
-                WebDriverWait(driver, 5).until(
-                    EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'Breakdown by')]"))
-                )
-            except:
-                time.sleep(2.5)  # Fallback - need enough time for page to load
-            
-            # Click Show More buttons - faster approach
-            for _ in range(3):  # Reduced iterations
-                try:
-                    buttons = driver.find_elements(By.XPATH, "//*[contains(text(), 'Show More')]")
-                    if not buttons:
-                        break
-                    for btn in buttons:
-                        try:
-                            if 'Show Less' not in btn.text:
-                                driver.execute_script("arguments[0].click();", btn)
-                        except:
-                            pass
-                    time.sleep(0.5)  # Allow content to expand
-                except:
-                    break
-            
-            page_text = driver.find_element(By.TAG_NAME, 'body').text
-            
-            breakdown_data = {}
-            lines = page_text.split('\n')
-            current_section = None
-            current_items = []
-            total_revenue = 0
-            
-            for line in lines:
-                line = line.strip()
-                
-                if 'Breakdown by Geography' in line:
-                    if current_section and current_items:
-                        breakdown_data[current_section] = {'total': total_revenue, 'items': current_items}
-                    current_section = 'Geography'
-                    current_items = []
-                    total_revenue = 0
-                elif 'Breakdown by Segments' in line:
-                    if current_section and current_items:
-                        breakdown_data[current_section] = {'total': total_revenue, 'items': current_items}
-                    current_section = 'Segments'
-                    current_items = []
-                    total_revenue = 0
-                
-                if not current_section:
-                    continue
-                if 'SEE ALSO' in line or 'Summary' in line:
-                    break
-                
-                if 'Total Revenue:' in line:
-                    match = re.search(r'([\d.]+)([BMK]?)\s*USD', line, re.I)
-                    if match:
-                        val = float(match.group(1))
-                        mult = match.group(2).upper()
-                        total_revenue = val * 1000 if mult == 'B' else val if mult == 'M' else val / 1000 if mult == 'K' else val * 1000
-                    continue
-                
-                match = re.search(r'^(.+?):\s*([\d.]+)([BMK]?)\s*USD', line, re.I)
-                if match:
-                    name = match.group(1).strip()
-                    val = float(match.group(2))
-                    mult = match.group(3).upper()
-                    if mult == 'B':
-                        val *= 1000
-                    elif mult == 'K':
-                        val /= 1000
-                    current_items.append({'name': name, 'value': val})
-            
-            if current_section and current_items:
-                breakdown_data[current_section] = {'total': total_revenue, 'items': current_items}
-            
-            return breakdown_data
-        except Exception as e:
-            print(f"Revenue breakdown error: {e}")
-            return {}
-    
-    def scrape_revenue_breakdown(self, driver, base_url):
-        """Original method - redirects to fast version."""
-        return self.scrape_revenue_breakdown_fast(driver, base_url)
-    
-    def get_formula_definitions(self, sheet_name):
-        if 'Income Statement' in sheet_name:
-            return INCOME_STATEMENT_FORMULAS
-        elif 'Balance Sheet' in sheet_name:
-            return BALANCE_SHEET_FORMULAS
-        elif 'Cash Flow' in sheet_name:
-            return CASH_FLOW_FORMULAS
-        return {}
-    
-    def _get_formats(self, workbook, currency_symbol='$'):
-        """Get or create cached format objects for the workbook."""
-        # Cache key includes currency symbol to regenerate if currency changes
-        cache_key = (id(workbook), currency_symbol)
-        if not hasattr(self, '_format_cache_key') or self._format_cache_key != cache_key:
-            self._format_cache_key = cache_key
-            self._workbook = workbook
-            
-            # Build currency format string with the appropriate symbol
-            curr_fmt = f'{currency_symbol}#,##0'
-            
-            self._formats = {
-                'title': workbook.add_format({'bold': True, 'font_size': 14, 'font_color': '#2E75B6'}),
-                'subtitle': workbook.add_format({'font_size': 11, 'font_color': '#666666'}),
-                'header': workbook.add_format({'bold': True, 'bg_color': '#4472C4', 'font_color': 'white', 'border': 1}),
-                'group': workbook.add_format({'bold': True, 'bg_color': '#D9E2F3', 'border': 1}),
-                'level1': workbook.add_format({'indent': 1, 'border': 1}),
-                'currency': workbook.add_format({'num_format': curr_fmt, 'border': 1, 'align': 'right'}),
-                'currency_bold': workbook.add_format({'num_format': curr_fmt, 'bold': True, 'bg_color': '#D9E2F3', 'border': 1, 'align': 'right'}),
-                'eps': workbook.add_format({'num_format': '#,##0.00', 'border': 1, 'align': 'right'}),
-                'eps_bold': workbook.add_format({'num_format': '#,##0.00', 'bold': True, 'bg_color': '#D9E2F3', 'border': 1, 'align': 'right'}),
-                'ratio_header': workbook.add_format({'bold': True, 'font_size': 12, 'bg_color': '#2E75B6', 'font_color': 'white', 'border': 1}),
-                'ratio_label': workbook.add_format({'bold': False, 'bg_color': '#DEEBF7', 'border': 1, 'indent': 1}),
-                'ratio_pct': workbook.add_format({'num_format': '0.0%', 'bg_color': '#DEEBF7', 'border': 1, 'align': 'right'}),
-            }
-        return self._formats
-    
-    def format_excel_sheet_optimized(self, writer, df, sheet_name):
-        """Optimized Excel sheet formatter with cached format objects."""
-        workbook = writer.book
-        worksheet = workbook.add_worksheet(sheet_name)
-        writer.sheets[sheet_name] = worksheet
-        
-        # Get company info
-        company_info = getattr(self, 'company_info', {'name': self.selected_ticker, 'currency': 'USD'})
-        currency_code = company_info.get('currency', 'USD')
-        currency_symbol = get_currency_symbol(currency_code)
-        
-        # Get cached formats with proper currency symbol
-        fmts = self._get_formats(workbook, currency_symbol)
-        
-        # Build full company display name: "TICKER - Company Name"
-        ticker = self.selected_ticker.upper() if self.selected_ticker else ''
-        full_name = getattr(self, 'selected_company_name', ticker)
-        company_display = f"{ticker} - {full_name}" if full_name and full_name != ticker else ticker
-        
-        # Determine statement type from sheet name
-        if 'Income Statement' in sheet_name:
-            statement_type = 'Income Statement'
-        elif 'Balance Sheet' in sheet_name:
-            statement_type = 'Balance Sheet'
-        elif 'Cash Flow' in sheet_name:
-            statement_type = 'Cash Flow Statement'
-        else:
-            statement_type = sheet_name
-        
-        # Write company header section (rows 0-2)
-        worksheet.write(0, 0, statement_type, fmts['title'])
-        worksheet.write(1, 0, company_display, fmts['subtitle'])
-        worksheet.write(2, 0, f"Currency: {currency_code}", fmts['subtitle'])
-        
-        # Data starts at row 4 (leaving row 3 as spacer)
-        header_row = 4
-        
-        formula_defs = self.get_formula_definitions(sheet_name)
-        
-        # Build field to row map (adjusted for header offset)
-        field_to_row = {}
-        for idx, row in df.iterrows():
-            field_to_row[row.get('Field', '')] = idx + header_row + 2  # +2 for header row and 1-indexing
-        
-        date_cols = [c for c in df.columns if c not in ['Field', '_Type']]
-        output_cols = ['Field'] + date_cols
-        
-        # Write column headers
-        for col_num, col_name in enumerate(output_cols):
-            worksheet.write(header_row, col_num, col_name, fmts['header'])
-        
-        # Pre-compute row data to reduce DataFrame access overhead
-        rows_data = df.to_dict('records')
-        
-        # Write data
-        for row_num, row_dict in enumerate(rows_data):
-            excel_row = row_num + header_row + 1  # Adjusted for header offset
-            row_type = row_dict.get('_Type', '')
-            field_name = row_dict.get('Field', '')
-            is_group = row_type in ['group-total', 'important']
-            is_eps = 'EPS' in field_name
-            has_formula = field_name in formula_defs
-            
-            for col_num, col_name in enumerate(output_cols):
-                value = row_dict.get(col_name)
-                
-                if col_name == 'Field':
-                    fmt = fmts['group'] if is_group else (fmts['level1'] if row_type == 'level-1' else None)
-                    worksheet.write(excel_row, col_num, value, fmt)
-                else:
-                    if is_eps:
-                        fmt = fmts['eps_bold'] if is_group else fmts['eps']
-                    else:
-                        fmt = fmts['currency_bold'] if is_group else fmts['currency']
-                    
-                    if has_formula:
-                        # Write Excel formula
-                        formula_def = formula_defs[field_name]
-                        col_letter = get_column_letter(col_num)
-                        terms = []
-                        for src in formula_def['sources']:
-                            src_row = field_to_row.get(src)
-                            if src_row:
-                                terms.append(f"{col_letter}{src_row}")
-                        if terms:
-                            formula = "=SUM(" + ",".join(terms) + ")"
-                            worksheet.write_formula(excel_row, col_num, formula, fmt)
-                        else:
-                            worksheet.write(excel_row, col_num, value if pd.notna(value) else 0, fmt)
-                    else:
-                        worksheet.write(excel_row, col_num, value if pd.notna(value) else 0, fmt)
-        
-        # Add ratios for Income Statement (not TTM)
-        if 'Income Statement' in sheet_name and 'TTM' not in sheet_name:
-            self.add_ratios_optimized(worksheet, workbook, df, field_to_row, output_cols, header_row)
-        
-        worksheet.set_column('A:A', 35)
-        worksheet.set_column('B:ZZ', 15)
-        worksheet.freeze_panes(header_row + 1, 1)  # Freeze below data headers
-    
-    def format_excel_sheet(self, writer, df, sheet_name):
-        """Original method - redirects to optimized version."""
-        return self.format_excel_sheet_optimized(writer, df, sheet_name)
-    
-    def add_ratios_optimized(self, worksheet, workbook, df, field_to_row, output_cols, header_row=4):
-        """Optimized ratios section using cached formats."""
-        last_row = len(df) + header_row + 1
-        ratio_row = last_row + 2
-        
-        fmts = self._get_formats(workbook)
-        
-        # Header row
-        worksheet.write(ratio_row, 0, 'Ratios', fmts['ratio_header'])
-        for col in range(1, len(output_cols)):
-            worksheet.write(ratio_row, col, '', fmts['ratio_header'])
-        
-        ratios = [
-            ('Gross Profit Margin', 'Gross Profit', 'Revenue'),
-            ('Operating Profit Margin', 'Operating Income', 'Revenue'),
-            ('Net Profit Margin', 'Net Income (Common)', 'Revenue'),
-            ('R&D as % of Revenue', 'Research & Development', 'Revenue'),
-            ('SG&A as % of Revenue', 'Selling, General & Administrative', 'Revenue'),
-        ]
-        
-        current_row = ratio_row + 1
-        for ratio_name, num_field, denom_field in ratios:
-            worksheet.write(current_row, 0, ratio_name, fmts['ratio_label'])
-            num_row = field_to_row.get(num_field)
-            denom_row = field_to_row.get(denom_field)
-            
-            if num_row and denom_row:
-                for col in range(1, len(output_cols)):
-                    col_letter = get_column_letter(col)
-                    if 'R&D' in ratio_name or 'SG&A' in ratio_name:
-                        formula = f"=ABS({col_letter}{num_row})/{col_letter}{denom_row}"
-                    else:
-                        formula = f"={col_letter}{num_row}/{col_letter}{denom_row}"
-                    worksheet.write_formula(current_row, col, formula, fmts['ratio_pct'])
-            else:
-                for col in range(1, len(output_cols)):
-                    worksheet.write(current_row, col, 'N/A', fmts['ratio_label'])
-            current_row += 1
-        
-        # Revenue Y/Y Growth
-        worksheet.write(current_row, 0, 'Revenue Y/Y Growth', fmts['ratio_label'])
-        rev_row = field_to_row.get('Revenue')
-        if rev_row:
-            worksheet.write(current_row, 1, 'N/A', fmts['ratio_label'])
-            for col in range(2, len(output_cols)):
-                col_letter = get_column_letter(col)
-                prev_letter = get_column_letter(col - 1)
-                formula = f"=({col_letter}{rev_row}-{prev_letter}{rev_row})/{prev_letter}{rev_row}"
-                worksheet.write_formula(current_row, col, formula, fmts['ratio_pct'])
-    
-    def add_ratios(self, worksheet, workbook, df, field_to_row, output_cols, header_row=4):
-        """Original method - redirects to optimized version."""
-        return self.add_ratios_optimized(worksheet, workbook, df, field_to_row, output_cols, header_row)
-    
-    def format_revenue_breakdown_sheet(self, writer, breakdown_data):
-        """Format Revenue Breakdown sheet."""
-        workbook = writer.book
-        worksheet = workbook.add_worksheet('Revenue Breakdown')
-        writer.sheets['Revenue Breakdown'] = worksheet
-        
-        # Get company info
-        company_info = getattr(self, 'company_info', {'name': self.selected_ticker, 'currency': 'USD'})
-        currency_code = company_info.get('currency', 'USD')
-        currency_symbol = get_currency_symbol(currency_code)
-        
-        # Build full company display name: "TICKER - Company Name"
-        ticker = self.selected_ticker.upper() if self.selected_ticker else ''
-        full_name = getattr(self, 'selected_company_name', ticker)
-        company_display = f"{ticker} - {full_name}" if full_name and full_name != ticker else ticker
-        
-        # Header formats
-        company_title_fmt = workbook.add_format({'bold': True, 'font_size': 14, 'font_color': '#2E75B6'})
-        subtitle_fmt = workbook.add_format({'font_size': 11, 'font_color': '#666666'})
-        
-        # Write company header section (rows 0-2)
-        worksheet.write(0, 0, 'Revenue Breakdown', company_title_fmt)
-        worksheet.write(1, 0, company_display, subtitle_fmt)
-        worksheet.write(2, 0, f"Currency: {currency_code}", subtitle_fmt)
-        
-        # Data formats with proper currency symbol
-        curr_fmt_str = f'{currency_symbol}#,##0'
-        title_fmt = workbook.add_format({'bold': True, 'font_size': 14, 'bg_color': '#2E75B6', 'font_color': 'white', 'border': 1})
-        header_fmt = workbook.add_format({'bold': True, 'bg_color': '#4472C4', 'font_color': 'white', 'border': 1})
-        item_fmt = workbook.add_format({'border': 1, 'indent': 1})
-        currency_fmt = workbook.add_format({'num_format': curr_fmt_str, 'border': 1, 'align': 'right'})
-        pct_fmt = workbook.add_format({'num_format': '0.0%', 'border': 1, 'align': 'right'})
-        total_fmt = workbook.add_format({'bold': True, 'bg_color': '#D9E2F3', 'border': 1})
-        total_curr_fmt = workbook.add_format({'bold': True, 'num_format': curr_fmt_str, 'bg_color': '#D9E2F3', 'border': 1, 'align': 'right'})
-        total_pct_fmt = workbook.add_format({'bold': True, 'num_format': '0.0%', 'bg_color': '#D9E2F3', 'border': 1, 'align': 'right'})
-        
-        row = 4  # Start after header section
-        for section_name, section_data in breakdown_data.items():
-            worksheet.write(row, 0, f'Breakdown by {section_name}', title_fmt)
-            worksheet.write(row, 1, '', title_fmt)
-            worksheet.write(row, 2, '', title_fmt)
-            row += 1
-            
-            worksheet.write(row, 0, 'Segment', header_fmt)
-            worksheet.write(row, 1, 'Revenue (M)', header_fmt)
-            worksheet.write(row, 2, '% of Total', header_fmt)
-            row += 1
-            
-            total = section_data.get('total', 0)
-            if total == 0:
-                total = sum(item.get('value', 0) for item in section_data.get('items', []))
-            
-            for item in section_data.get('items', []):
-                val = item.get('value', 0)
-                pct = val / total if total > 0 else 0
-                worksheet.write(row, 0, item.get('name', ''), item_fmt)
-                worksheet.write(row, 1, val, currency_fmt)
-                worksheet.write(row, 2, pct, pct_fmt)
-                row += 1
-            
-            worksheet.write(row, 0, 'Total', total_fmt)
-            worksheet.write(row, 1, total, total_curr_fmt)
-            worksheet.write(row, 2, 1.0, total_pct_fmt)
-            row += 2
-        
-        worksheet.set_column('A:A', 40)
-        worksheet.set_column('B:B', 15)
-        worksheet.set_column('C:C', 12)
-        worksheet.freeze_panes(5, 0)  # Freeze below first data header
-    
     def open_folder(self):
         os.system(f'open "{os.path.dirname(__file__)}"')
 
@@ -0,0 +1,1583 @@
+"""
+FINDATA core: exchange/currency mappings, name normalization, statement
+parsing and the Excel writer.
+
+This module has no GUI dependencies so the headless web server can import
+it cheaply. Selenium and pandas are imported inside the methods that use
+them, i.e. only when a download actually runs.
+"""
+import os
+import re
+import json
+import time
+import functools
+from datetime import datetime as dt
+from collections import defaultdict
+
+
+# Exchange mapping for AlphaSpread URLs
+EXCHANGE_MAPPING = {
+    'NYSE': 'nyse',
+    'NASDAQ': 'nasdaq',
+    'OTC': 'otc',
+    'US OTC': 'otc',
+    'FRA': 'xetra',  # Frankfurt uses xetra on AlphaSpread
+    'Frankfurt Stock Exchange': 'xetra',
+    'TYO': 'tse',  # Tokyo Stock Exchange
+    'Tokyo Stock Exchange': 'tse',
+    'HKEX': 'hkex',
+    'Hong Kong Stock Exchange': 'hkex',
+    'BOM': 'bse',  # Bombay Stock Exchange
+    'Bombay Stock Exchange': 'bse',
+    'LSE': 'lse',  # London Stock Exchange
+    'London Stock Exchange': 'lse',
+    'TSX': 'tsx',  # Toronto Stock Exchange
+    'ASX': 'asx',  # Australian Stock Exchange
+}
+
+# Exchange code to full name mapping (sorted by number of listings)
+EXCHANGE_DISPLAY_NAMES = {
+    'OTC': 'OTC - US OTC Markets',
+    'US OTC': 'OTC - US OTC Markets',
+    'FRA': 'FRA - Frankfurt Stock Exchange',
+    'Frankfurt Stock Exchange': 'FRA - Frankfurt Stock Exchange',
+    'BOM': 'BOM - Bombay Stock Exchange',
+    'Bombay Stock Exchange': 'BOM - Bombay Stock Exchange',
+    'TYO': 'TYO - Tokyo Stock Exchange',
+    'Tokyo Stock Exchange': 'TYO - Tokyo Stock Exchange',
+    'LON': 'LON - London Stock Exchange',
+    'LSE': 'LON - London Stock Exchange',
+    'London Stock Exchange': 'LON - London Stock Exchange',
+    'NASDAQ': 'NASDAQ - Nasdaq Stock Market',
+    'SHE': 'SHE - Shenzhen Stock Exchange',
+    'NSE': 'NSE - National Stock Exchange of India',
+    'HKG': 'HKG - Hong Kong Stock Exchange',
+    'HKEX': 'HKG - Hong Kong Stock Exchange',
+    'Hong Kong Stock Exchange': 'HKG - Hong Kong Stock Exchange',
+    'SHA': 'SHA - Shanghai Stock Exchange',
+    'NYSE': 'NYSE - New York Stock Exchange',
+    'ASX': 'ASX - Australian Securities Exchange',
+    'KOSDAQ': 'KOSDAQ - KOSDAQ',
+    'TSXV': 'TSXV - TSX Venture Exchange',
+    'TPEX': 'TPEX - Taipei Exchange',
+    'BIT': 'BIT - Borsa Italiana',
+    'BKK': 'BKK - Stock Exchange of Thailand',
+    'TPE': 'TPE - Taiwan Stock Exchange',
+    'KLSE': 'KLSE - Bursa Malaysia',
+    'ETR': 'ETR - Deutsche Börse Xetra',
+    'BVMF': 'BVMF - Brazil Stock Exchange',
+    'KRX': 'KRX - Korea Stock Exchange',
+    'IDX': 'IDX - Indonesia Stock Exchange',
+    'VIE': 'VIE - Vienna Stock Exchange',
+    'STO': 'STO - Nasdaq Stockholm',
+    'EPA': 'EPA - Euronext Paris',
+    'WSE': 'WSE - Warsaw Stock Exchange',
+    'TSX': 'TSX - Toronto Stock Exchange',
+    'BMV': 'BMV - Mexican Stock Exchange',
+    'CSE': 'CSE - Canadian Securities Exchange',
+    'AIM': 'AIM - London Stock Exchange AIM',
+    'IST': 'IST - Istanbul Stock Exchange',
+    'TLV': 'TLV - Tel Aviv Stock Exchange',
+    'PSX': 'PSX - Pakistan Stock Exchange',
+    'SGX': 'SGX - Singapore Exchange',
+    'HOSE': 'HOSE - Ho Chi Minh Stock Exchange',
+    'TADAWUL': 'TADAWUL - Saudi Stock Exchange',
+    'DSE': 'DSE - Dhaka Stock Exchange',
+    'COSE': 'COSE - Colombo Stock Exchange',
+    'OSL': 'OSL - Oslo Børs',
+    'HNX': 'HNX - Hanoi Stock Exchange',
+    'PSE': 'PSE - Philippine Stock Exchange',
+    'JSE': 'JSE - Johannesburg Stock Exchange',
+    'SWX': 'SWX - SIX Swiss Exchange',
+    'BME': 'BME - Madrid Stock Exchange',
+    'AMEX': 'AMEX - NYSE American',
+    'EGX': 'EGX - Egyptian Stock Exchange',
+    'SNSE': 'SNSE - Santiago Stock Exchange',
+    'BVL': 'BVL - Lima Stock Exchange',
+    'BCBA': 'BCBA - Buenos Aires Stock Exchange',
+    'HEL': 'HEL - Nasdaq Helsinki',
+    'BVB': 'BVB - Bucharest Stock Exchange',
+    'MOEX': 'MOEX - Moscow Stock Exchange',
+    'SGXC': 'SGXC - Singapore Exchange Catalist',
+    'CPH': 'CPH - Copenhagen Stock Exchange',
+    'ATH': 'ATH - Athens Stock Exchange',
+    'ASE': 'ASE - Amman Stock Exchange',
+    'NGX': 'NGX - Nigerian Stock Exchange',
+    'KWSE': 'KWSE - Kuwait Stock Exchange',
+    'EBR': 'EBR - Euronext Brussels',
+    'MUN': 'MUN - Munich Stock Exchange',
+    'NEO': 'NEO - Cboe Canada',
+    'NZE': 'NZE - New Zealand Stock Exchange',
+    'AMS': 'AMS - Euronext Amsterdam',
+    'XKON': 'XKON - Korea New Exchange',
+    'BUL': 'BUL - Bulgarian Stock Exchange',
+    'BST': 'BST - Stuttgart Stock Exchange',
+    'NGM': 'NGM - Nordic Growth Market',
+    'MSM': 'MSM - Muscat Securities Market',
+    'JMSE': 'JMSE - Jamaica Stock Exchange',
+    'ADX': 'ADX - Abu Dhabi Securities Exchange',
+    'LUX': 'LUX - Luxembourg Stock Exchange',
+    'MUSE': 'MUSE - Mauritius Stock Exchange',
+    'BVC': 'BVC - Colombia Stock Exchange',
+    'HAM': 'HAM - Hamburg Stock Exchange',
+    'CBSE': 'CBSE - Casablanca Stock Exchange',
+    'BVMT': 'BVMT - Tunis Stock Exchange',
+    'AQU': 'AQU - Aquis Exchange',
+    'BUD': 'BUD - Budapest Stock Exchange',
+    'DFM': 'DFM - Dubai Financial Market',
+    'PRA': 'PRA - Prague Stock Exchange',
+    'NASE': 'NASE - Nairobi Stock Exchange',
+    'XNGO': 'XNGO - Nagoya Stock Exchange',
+    'ZSE': 'ZSE - Zagreb Stock Exchange',
+    'QSE': 'QSE - Qatar Stock Exchange',
+    'BRVM': 'BRVM - Ivory Coast Stock Exchange',
+    'ELI': 'ELI - Euronext Lisbon',
+    'CYS': 'CYS - Cyprus Stock Exchange',
+    'DUSE': 'DUSE - Dusseldorf Stock Exchange',
+    'PEX': 'PEX - Palestine Stock Exchange',
+    'XSAT': 'XSAT - Spotlight Stock Market',
+    'ZMSE': 'ZMSE - Zimbabwe Stock Exchange',
+    'BAX': 'BAX - Bahrain Stock Exchange',
+    'NMSE': 'NMSE - Namibian Stock Exchange',
+    'ICE': 'ICE - Nasdaq Iceland',
+    'MSE': 'MSE - Malta Stock Exchange',
+    'TAL': 'TAL - Nasdaq Tallinn',
+    'GHSE': 'GHSE - Ghana Stock Exchange',
+    'DAR': 'DAR - Tanzania Stock Exchange',
+    'VSE': 'VSE - Nasdaq Vilnius',
+    'FKSE': 'FKSE - Fukuoka Stock Exchange',
+    'CCSE': 'CCSE - Caracas Stock Exchange',
+    'ISE': 'ISE - Euronext Dublin',
+    'BELEX': 'BELEX - Belgrade Stock Exchange',
+    'KASE': 'KASE - Kazakhstan Stock Exchange',
+    'LUSE': 'LUSE - Lusaka Stock Exchange',
+    'BSM': 'BSM - Botswana Stock Exchange',
+    'SPSE': 'SPSE - Sapporo Stock Exchange',
+    'UGSE': 'UGSE - Uganda Securities Exchange',
+    'LJSE': 'LJSE - Ljubljana Stock Exchange',
+    'MAL': 'MAL - Malawi Stock Exchange',
+    'RSE': 'RSE - Nasdaq Riga',
+    'BDB': 'BDB - Beirut Stock Exchange',
+    'CHIX': 'CHIX - CBOE Europe',
+    'BSSE': 'BSSE - Bratislava Stock Exchange',
+    'UKR': 'UKR - PFTS Stock Exchange',
+}
+
+# Sorted exchange order (by number of listings, descending)
+EXCHANGE_SORT_ORDER = [
+    'OTC', 'US OTC', 'FRA', 'Frankfurt Stock Exchange', 'BOM', 'Bombay Stock Exchange',
+    'TYO', 'Tokyo Stock Exchange', 'LON', 'LSE', 'London Stock Exchange', 'NASDAQ',
+    'SHE', 'NSE', 'HKG', 'HKEX', 'Hong Kong Stock Exchange', 'SHA', 'NYSE', 'ASX',
+    'KOSDAQ', 'TSXV', 'TPEX', 'BIT', 'BKK', 'TPE', 'KLSE', 'ETR', 'BVMF', 'KRX',
+    'IDX', 'VIE', 'STO', 'EPA', 'WSE', 'TSX', 'BMV', 'CSE', 'AIM', 'IST', 'TLV',
+    'PSX', 'SGX', 'HOSE', 'TADAWUL', 'DSE', 'COSE', 'OSL', 'HNX', 'PSE', 'JSE',
+    'SWX', 'BME', 'AMEX', 'EGX', 'SNSE', 'BVL', 'BCBA', 'HEL', 'BVB', 'MOEX',
+    'SGXC', 'CPH', 'ATH', 'ASE', 'NGX', 'KWSE', 'EBR', 'MUN', 'NEO', 'NZE', 'AMS',
+    'XKON', 'BUL', 'BST', 'NGM', 'MSM', 'JMSE', 'ADX', 'LUX', 'MUSE', 'BVC', 'HAM',
+    'CBSE', 'BVMT', 'AQU', 'BUD', 'DFM', 'PRA', 'NASE', 'XNGO', 'ZSE', 'QSE',
+    'BRVM', 'ELI', 'CYS', 'DUSE', 'PEX', 'XSAT', 'ZMSE', 'BAX', 'NMSE', 'ICE',
+    'MSE', 'TAL', 'GHSE', 'DAR', 'VSE', 'FKSE', 'CCSE', 'ISE', 'BELEX', 'KASE',
+    'LUSE', 'BSM', 'SPSE', 'UGSE', 'LJSE', 'MAL', 'RSE', 'BDB', 'CHIX', 'BSSE', 'UKR'
+]
+
+# Position of each exchange in EXCHANGE_SORT_ORDER (first occurrence wins, as with list.index)
+EXCHANGE_SORT_RANK = {}
+for _rank, _exchange in enumerate(EXCHANGE_SORT_ORDER):
+    EXCHANGE_SORT_RANK.setdefault(_exchange, _rank)
+del _rank, _exchange
+
+
+def sorted_exchange_choices(exchanges):
+    """
+    (code, display name) pairs for the exchange dropdowns, most listings first.
+    Exchanges missing from EXCHANGE_SORT_ORDER go last, in their given order.
+    """
+    unranked = len(EXCHANGE_SORT_ORDER)
+    ordered = sorted(exchanges, key=lambda ex: EXCHANGE_SORT_RANK.get(ex, unranked))
+    return [(ex, EXCHANGE_DISPLAY_NAMES.get(ex, ex)) for ex in ordered]
+
+# Currency code to symbol mapping
+CURRENCY_SYMBOLS = {
+    'USD': '$',
+    'EUR': '€',
+    'GBP': '£',
+    'JPY': '¥',
+    'CNY': '¥',
+    'CNH': '¥',
+    'RMB': '¥',
+    'HKD': 'HK$',
+    'CHF': 'CHF ',
+    'CAD': 'C$',
+    'AUD': 'A$',
+    'INR': '₹',
+    'KRW': '₩',
+    'SGD': 'S$',
+    'TWD': 'NT$',
+    'BRL': 'R$',
+    'MXN': 'MX$',
+    'SEK': 'kr ',
+    'NOK': 'kr ',
+    'DKK': 'kr ',
+    'PLN': 'zł ',
+    'THB': '฿',
+    'IDR': 'Rp ',
+    'MYR': 'RM ',
+    'PHP': '₱',
+    'ZAR': 'R ',
+    'RUB': '₽',
+    'TRY': '₺',
+    'ILS': '₪',
+    'AED': 'AED ',
+    'SAR': 'SAR ',
+}
+
+
+def get_currency_symbol(currency_code):
+    """Get currency symbol from currency code."""
+    if not currency_code:
+        return '$'
+    code = currency_code.upper().strip()
+    return CURRENCY_SYMBOLS.get(code, f'{code} ')
+
+
+def normalize_ticker_for_alphaspread(ticker, exchange):
+    """
+    Normalize ticker for AlphaSpread URL.
+    - Strip leading zeros for Hong Kong tickers (0700 -> 700)
+    - Handle other exchange-specific quirks
+    """
+    ticker = str(ticker).strip()
+    
+    # Hong Kong Exchange: strip leading zeros
+    if exchange and exchange.lower() in ['hkex', 'hong kong']:
+        ticker = ticker.lstrip('0') or '0'  # Keep at least one digit
+    
+    return ticker.lower()
+
+
+# Alternative listings are probed in parallel tabs; keep the fan-out small to stay polite to the site
+PROBE_CONCURRENCY = 3
+PROBE_TIMEOUT = 3.0
+PROBE_POLL_INTERVAL = 0.1
+
+# Anti-bot interstitials ("Just a moment..."): they keep the URL, so they must not read as a miss
+CHALLENGE_TITLE_PATTERN = r'just a moment|attention required|access denied|captcha'
+# Statuses the site uses to refuse clients rather than to report on the listing
+BLOCKED_HTTP_STATUSES = (401, 403, 429)
+
+# Classifies a probe tab: 'found', 'pending', 'loaded' (no table yet) or the reason it is a miss.
+# A challenge page stays pending (the browser may get through it) until the probe times out.
+PROBE_STATE_SCRIPT = """
+if (document.querySelector('.income-statement.statement')) return 'found';
+if (location.href === 'about:blank' || document.readyState === 'loading') return 'pending';
+if (/%s/i.test(document.title)) return 'pending';
+var nav = performance.getEntriesByType('navigation')[0];
+if (nav && nav.responseStatus >= 400) return 'HTTP ' + nav.responseStatus;
+if (location.pathname.indexOf('/financials') < 0) return 'redirected to ' + location.pathname;
+if (/\\b404\\b|not found/i.test(document.title)) return 'not-found page';
+return document.readyState === 'complete' ? 'loaded' : 'pending';
+""" % CHALLENGE_TITLE_PATTERN
+
+
+def is_definite_miss(state):
+    """
+    True if a probe state proves the listing has no data: an HTTP 4xx
+    (other than the anti-bot ones), a redirect away from the financials
+    page or a not-found page. Anything else (a page still without its
+    table, timeouts, errors, 5xx) may be the site having a bad moment and
+    is never remembered as missing.
+    """
+    if not isinstance(state, str):
+        return False
+    if state.startswith(('redirected to ', 'not-found page')):
+        return True
+    match = re.match(r'HTTP (\d+)$', state)
+    return bool(match) and 400 <= int(match.group(1)) < 500 and int(match.group(1)) not in BLOCKED_HTTP_STATUSES
+
+
+def find_valid_ticker(driver, alternatives, on_probe=None, on_miss=None, timer=None,
+                      concurrency=PROBE_CONCURRENCY, timeout=PROBE_TIMEOUT):
+    """
+    Find the first (ticker, exchange) in `alternatives` that has an income statement page.
+
+    Up to `concurrency` candidates load at once, each in its own tab of the
+    same browser. A hit is only accepted once every higher-priority
+    candidate has missed, so the result is the same as trying them one by
+    one; probes behind an accepted or pending hit are cancelled (their tabs
+    closed). A probe ends early only when it is found or is_definite_miss()
+    (an HTTP 4xx, a redirect away from the financials page, a not-found
+    page); anything else, including a loaded page whose table has not
+    rendered yet, is polled until `timeout`.
+
+    `on_probe(idx, count, ticker, exchange)` is called as each probe starts
+    and `on_miss(idx, ticker, exchange, outcome)` when one finishes without
+    data (outcome 'missing' if is_definite_miss(), otherwise 'timeout':
+    undecided). Per-probe durations go to
+    `timer` as find_valid_ticker.found / .missing / .timeout. Returns None
+    if no candidate matches. The driver is left on its original tab.
+    """
+    original_window = driver.current_window_handle
+    queue = list(enumerate(alternatives))
+    active = {}  # idx -> (window handle, started, deadline)
+    undecided = {}  # idx -> last state that was neither found nor a definite miss
+    results = {}  # idx -> found
+    next_idx = 0
+    try:
+        while next_idx < len(alternatives):
+            # Accept or skip finished candidates strictly in priority order
+            while next_idx in results:
+                if results[next_idx]:
+                    return alternatives[next_idx]
+                next_idx += 1
+            if next_idx >= len(alternatives):
+                break
+
+            # Never start probes ranked below a hit that is only waiting on higher-priority ones
+            best_hit = min((idx for idx, found in results.items() if found), default=len(alternatives))
+            while queue and len(active) < concurrency and queue[0][0] < best_hit:
+                idx, (alt_ticker, alt_exchange) = queue.pop(0)
+                if on_probe:
+                    on_probe(idx, len(alternatives), alt_ticker, alt_exchange)
+                url = f"https://www.alphaspread.com/security/{alt_exchange}/{alt_ticker}/financials/income-statement"
+                before = set(driver.window_handles)
+                driver.execute_script("window.open(arguments[0], '_blank');", url)
+                handle = next(iter(set(driver.window_handles) - before))
+                started = time.monotonic()
+                active[idx] = (handle, started, started + timeout)
+
+            for idx, (handle, started, deadline) in list(active.items()):
+                now = time.monotonic()
+                try:
+                    driver.switch_to.window(handle)
+                    state = driver.execute_script(PROBE_STATE_SCRIPT)
+                except Exception as e:
+                    state = f"error: {e.__class__.__name__}"
+                if state == 'loaded':
+                    state = 'no statement table'
+                if state != 'found' and not is_definite_miss(state):
+                    # The table may still render (or the error pass): wait for the deadline
+                    if state != 'pending':
+                        undecided[idx] = state
+                    if now < deadline:
+                        continue
+                    state = undecided.get(idx, 'timeout')
+
+                found = state == 'found'
+                results[idx] = found
+                del active[idx]
+                elapsed = time.monotonic() - started
+                # Errors (e.g. a crashed tab) or a table that is merely late prove nothing about the listing
+                outcome = 'found' if found else ('missing' if is_definite_miss(state) else 'timeout')
+                if timer:
+                    timer.record(f'find_valid_ticker.{outcome}', elapsed)
+                alt_ticker, alt_exchange = alternatives[idx]
+                print(f"Probe {alt_ticker}@{alt_exchange}: {state} after {elapsed:.2f}s")
+                if not found and on_miss:
+                    on_miss(idx, alt_ticker, alt_exchange, outcome)
+                try:
+                    driver.close()
+                except Exception:
+                    pass
+
+            if next_idx not in results:
+                time.sleep(PROBE_POLL_INTERVAL)
+        return None
+    finally:
+        for handle, _, _ in active.values():
+            try:
+                driver.switch_to.window(handle)
+                driver.close()
+            except Exception:
+                pass
+        driver.switch_to.window(original_window)
+
+
+def open_statement_tabs(driver, base_url, statements, tab_handles=None, timeout=3):
+    """
+    Load each statement page of base_url in its own tab and wait for its table.
+
+    Tabs in `tab_handles` are reused (navigated again), otherwise the first
+    statement goes in the current tab and the rest in new ones. Returns
+    (tab_handles, loaded) where `loaded` is the set of statement keys whose
+    table appeared within the timeout.
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    reuse = tab_handles is not None
+    tab_handles = list(tab_handles or [])
+    for idx, (key, name) in enumerate(statements):
+        if reuse:
+            driver.switch_to.window(tab_handles[idx])
+            driver.get(f"{base_url}/{key}")
+        elif idx == 0:
+            driver.get(f"{base_url}/{key}")
+            tab_handles.append(driver.current_window_handle)
+        else:
+            driver.execute_script("window.open('');")
+            driver.switch_to.window(driver.window_handles[-1])
+            driver.get(f"{base_url}/{key}")
+            tab_handles.append(driver.current_window_handle)
+        time.sleep(0.2)  # Reduced delay
+
+    # Wait for pages with dynamic check
+    loaded = set()
+    for idx, (key, name) in enumerate(statements):
+        driver.switch_to.window(tab_handles[idx])
+        try:
+            WebDriverWait(driver, timeout).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, f'.{key}.statement'))
+            )
+            loaded.add(key)
+        except Exception:
+            pass  # Continue even if timeout
+    return tab_handles, loaded
+
+
+# Common company suffixes stripped when normalizing names
+COMPANY_NAME_SUFFIXES = [
+    'inc.', 'inc', 'corp.', 'corp', 'corporation', 'company', 'co.',
+    'ltd.', 'ltd', 'limited', 'plc', 'llc', 's.a.', 'sa', 'ag', 'se',
+    'n.v.', 'nv', 'holdings', 'holding', 'group', 'the', '&'
+]
+
+# Suffixes only match as whole words (so 'sa' inside 'Samsung' survives); '&' always goes
+_SUFFIX_WORDS = sorted((s for s in COMPANY_NAME_SUFFIXES if s != '&'), key=len, reverse=True)
+COMPANY_SUFFIX_RE = re.compile(
+    r'&|(?<![a-z0-9])(?:' + '|'.join(re.escape(s) for s in _SUFFIX_WORDS) + r')(?![a-z0-9])'
+)
+NON_ALNUM_RE = re.compile(r'[^a-z0-9\s]')
+
+
+def _normalize_company_name(name):
+    name = str(name).lower().strip()
+    # Remove common suffixes, then special characters and extra spaces
+    name = COMPANY_SUFFIX_RE.sub(' ', name)
+    name = NON_ALNUM_RE.sub('', name)
+    return ' '.join(name.split())
+
+
+@functools.lru_cache(maxsize=65536)
+def normalize_company_name(name):
+    """Normalize company name for matching (memoized)."""
+    if not name:
+        return ''
+    return _normalize_company_name(name)
+
+
+def normalize_company_names(names):
+    """
+    Normalize many company names in one pass.
+    Accepts a pandas Series (returns an aligned Series) or any iterable (returns a list).
+    Each distinct name is normalized once.
+    """
+    import pandas as pd
+    
+    values = names.tolist() if isinstance(names, pd.Series) else list(names)
+    cache = {}
+    normalized = []
+    for name in values:
+        try:
+            result = cache[name]
+        except KeyError:
+            result = cache[name] = _normalize_company_name(name) if name else ''
+        except TypeError:
+            result = _normalize_company_name(name) if name else ''
+        normalized.append(result)
+    if isinstance(names, pd.Series):
+        return pd.Series(normalized, index=names.index, dtype=object)
+    return normalized
+
+
+class PerformanceTimer:
+    """Track timing for different operations."""
+    def __init__(self):
+        self.timings = defaultdict(list)
+        self.start_times = {}
+    
+    def start(self, operation):
+        self.start_times[operation] = time.perf_counter()
+    
+    def stop(self, operation):
+        if operation in self.start_times:
+            elapsed = time.perf_counter() - self.start_times[operation]
+            self.timings[operation].append(elapsed)
+            del self.start_times[operation]
+            return elapsed
+        return 0
+    
+    def record(self, operation, elapsed):
+        """Add a duration measured elsewhere (e.g. one of several overlapping probes)."""
+        self.timings[operation].append(elapsed)
+    
+    def get_summary(self):
+        summary = []
+        total = 0
+        for op, times in self.timings.items():
+            op_total = sum(times)
+            total += op_total
+            summary.append(f"  {op}: {op_total:.2f}s ({len(times)} calls)")
+        summary.insert(0, f"Total time: {total:.2f}s")
+        return "\n".join(summary)
+
+
+# Formula definitions for calculated fields
+INCOME_STATEMENT_FORMULAS = {
+    'Gross Profit': {'sources': ['Revenue', 'Cost of Revenue'], 'signs': ['+', '+']},
+    'Operating Income': {'sources': ['Gross Profit', 'Operating Expenses'], 'signs': ['+', '+']},
+    'Pre-Tax Income': {'sources': ['Operating Income', 'Interest Income Expense', 'Non-Reccuring Items', 'Total Other Income'], 'signs': ['+', '+', '+', '+']},
+    'Income from Continuing Operations': {'sources': ['Pre-Tax Income', 'Tax Provision'], 'signs': ['+', '+']},
+    'Net Income (Common)': {'sources': ['Income from Continuing Operations', 'Income to Minority Interest', 'Equity Earnings Affiliates'], 'signs': ['+', '+', '+']},
+}
+
+BALANCE_SHEET_FORMULAS = {
+    'Total Current Assets': {'sources': ['Cash & Cash Equivalents', 'Short-Term Investments', 'Total Receivables', 'Inventory', 'Other Current Assets'], 'signs': ['+', '+', '+', '+', '+']},
+    'Total Assets': {'sources': ['Total Current Assets', 'PP&E Net', 'Intangible Assets', 'Goodwill', 'Long-Term Investments', 'Other Long-Term Assets'], 'signs': ['+', '+', '+', '+', '+', '+']},
+    'Total Current Liabilities': {'sources': ['Accounts Payable', 'Accrued Liabilities', 'Short-Term Debt', 'Current Portion of Long-Term Debt', 'Other Current Liabilities'], 'signs': ['+', '+', '+', '+', '+']},
+    'Total Liabilities': {'sources': ['Total Current Liabilities', 'Long-Term Debt', 'Deferred Income Tax', 'Minority Interest', 'Other Liabilities'], 'signs': ['+', '+', '+', '+', '+']},
+    'Total Equity': {'sources': ['Common Stock', 'Retained Earnings', 'Additional Paid In Capital', 'Unrealized Security Profit/Loss', 'Treasury Stock', 'Other Equity'], 'signs': ['+', '+', '+', '+', '+', '+']},
+    'Total Liabilities & Equity': {'sources': ['Total Liabilities', 'Total Equity'], 'signs': ['+', '+']},
+}
+
+CASH_FLOW_FORMULAS = {
+    'Cash from Operating Activities': {'sources': ['Net Income', 'Depreciation & Amortization', 'Change in Deffered Taxes', 'Other Non-Cash Items', 'Change in Working Capital'], 'signs': ['+', '+', '+', '+', '+']},
+    'Cash from Investing Activities': {'sources': ['Capital Expenditures', 'Other Items'], 'signs': ['+', '+']},
+    'Cash from Financing Activities': {'sources': ['Net Issuance of Common Stock', 'Net Issuance of Debt', 'Cash Paid for Dividends', 'Other'], 'signs': ['+', '+', '+', '+']},
+    'Net Change in Cash': {'sources': ['Cash from Operating Activities', 'Cash from Investing Activities', 'Cash from Financing Activities', 'Effect of Foreign Exchange Rates'], 'signs': ['+', '+', '+', '+']},
+    'Free Cash Flow': {'sources': ['Cash from Operating Activities', 'Capital Expenditures'], 'signs': ['+', '+']},
+}
+
+
+def get_column_letter(col_num):
+    """Convert column number to Excel letter (0=A, 1=B, etc.)"""
+    result = ""
+    while col_num >= 0:
+        result = chr(col_num % 26 + ord('A')) + result
+        col_num = col_num // 26 - 1
+    return result
+
+
+# Sheet order in the exported workbook (Balance Sheet TTM not available)
+SHEET_ORDER = [
+    'Income Statement (Annual)',
+    'Balance Sheet (Annual)',
+    'Cash Flow Statement (Annual)',
+    'Income Statement (Quarterly)',
+    'Balance Sheet (Quarterly)',
+    'Cash Flow Statement (Quarterly)',
+    'Income Statement (TTM)',
+    'Cash Flow Statement (TTM)',
+]
+
+# Per-tab deadline for a Livewire period switch, and the fixed wait used when
+# the page gives no completion signal (no Livewire on window)
+LIVEWIRE_TIMEOUT = 5.0
+LIVEWIRE_FALLBACK_WAIT = 2.0
+LIVEWIRE_POLL_INTERVAL = 0.05
+
+# How periods are switched: 'livewire' sets the component's selectedPeriod directly
+# (DOM clicking remains the fallback), 'dom' always clicks the period dropdown
+PERIOD_SWITCH_MODE = os.environ.get('FINDATA_PERIOD_SWITCH') or 'livewire'
+
+# Sets selectedPeriod on the statement component; the response is stashed on window
+# by a message.processed hook (registered once per page) for PERIOD_AWAIT_SCRIPT
+PERIOD_SET_SCRIPT = """
+var el = document.querySelector(arguments[0]);
+if (!el || !window.Livewire) return false;
+var id = el.getAttribute('wire:id');
+var component = window.Livewire.find(id);
+if (!component) return false;
+if (!window.__findataPeriodHook) {
+    window.__findataPeriodHook = true;
+    window.Livewire.hook('message.processed', function (message, processed) {
+        var pending = window.__findataPeriod;
+        if (!pending || pending.id !== processed.id || pending.result) return;
+        pending.result = JSON.stringify({
+            dates: processed.get('dates'),
+            fieldsData: processed.get('fieldsData'),
+            selectedPeriod: processed.get('selectedPeriod')
+        });
+        if (pending.done) pending.done(pending.result);
+    });
+}
+window.__findataPeriod = {id: id, result: null, done: null};
+component.set('selectedPeriod', arguments[1]);
+return true;
+"""
+
+# Async: resolves with the JSON stashed by PERIOD_SET_SCRIPT's hook, or null after arguments[0] ms
+PERIOD_AWAIT_SCRIPT = """
+var callback = arguments[arguments.length - 1];
+var pending = window.__findataPeriod;
+if (!pending) return callback(null);
+if (pending.result) return callback(pending.result);
+var finished = false;
+var finish = function (result) { if (!finished) { finished = true; callback(result); } };
+pending.done = finish;
+setTimeout(function () { finish(null); }, arguments[0]);
+"""
+
+# Starts one tab's whole extraction in the page: company header and currency (if
+# arguments[2]), the current payload, then each period in arguments[1] in turn through
+# the component (arguments[3] ms per switch). The JSON blob lands on window.__findataBatch;
+# returns what is known right away (wire:id, header, currency, current payload, switches queued).
+BATCH_START_SCRIPT = """
+var selector = arguments[0], periods = arguments[1], includeHeader = arguments[2], timeoutMs = arguments[3];
+var batch = window.__findataBatch = {done: false, result: null, callback: null};
+var result = {header: null, currency: null, payloads: [], error: null};
+var finish = function () {
+    batch.done = true;
+    batch.result = JSON.stringify(result);
+    if (batch.callback) batch.callback(batch.result);
+};
+var payload = function (source) {
+    return {dates: source.get('dates'), fieldsData: source.get('fieldsData'), selectedPeriod: source.get('selectedPeriod')};
+};
+if (includeHeader) {
+    var header = document.querySelector('.security-header h1, .company-name, h1.title');
+    result.header = header ? header.innerText.trim() : null;
+    var currency = document.evaluate("//*[contains(text(), 'Currency:')]", document, null,
+                                     XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    result.currency = currency ? currency.innerText : null;
+}
+var el = document.querySelector(selector);
+if (!el) { finish(); return null; }
+var id = el.getAttribute('wire:id');
+var started = function (switches) {
+    return {id: id, header: result.header, currency: result.currency, initial: result.payloads[0] || null, switches: switches};
+};
+var component = window.Livewire && id ? window.Livewire.find(id) : null;
+if (component) {
+    result.payloads.push(payload(component));
+} else {
+    try {
+        var data = JSON.parse(el.getAttribute('wire:initial-data')).serverMemo.data;
+        result.payloads.push({dates: data.dates, fieldsData: data.fieldsData, selectedPeriod: data.selectedPeriod});
+    } catch (e) {}
+    finish();
+    return started(0);
+}
+if (!window.__findataBatchHook) {
+    window.__findataBatchHook = true;
+    window.Livewire.hook('message.processed', function (message, processed) {
+        var waiter = window.__findataBatchWaiter;
+        if (waiter && waiter.id === processed.id) {
+            window.__findataBatchWaiter = null;
+            waiter.resolve(processed);
+        }
+    });
+}
+var current = String(result.payloads[0].selectedPeriod).toLowerCase();
+var queue = periods.filter(function (period) { return period.toLowerCase() !== current; });
+var next = function () {
+    if (!queue.length) return finish();
+    var period = queue.shift();
+    var timer = setTimeout(function () {
+        window.__findataBatchWaiter = null;
+        result.error = 'no response switching to ' + period;
+        finish();
+    }, timeoutMs);
+    window.__findataBatchWaiter = {id: id, resolve: function (processed) {
+        clearTimeout(timer);
+        result.payloads.push(payload(processed));
+        next();
+    }};
+    component.set('selectedPeriod', period);
+};
+var switches = queue.length;
+next();
+return started(switches);
+"""
+
+# Async: the tab's BATCH_START_SCRIPT blob once it is complete, or null after arguments[0] ms
+BATCH_AWAIT_SCRIPT = """
+var callback = arguments[arguments.length - 1];
+var batch = window.__findataBatch;
+if (!batch) return callback(null);
+if (batch.done) return callback(batch.result);
+var finished = false;
+batch.callback = function (result) { if (!finished) { finished = true; callback(result); } };
+setTimeout(function () { batch.callback(null); }, arguments[0]);
+"""
+
+# Where statement data is read from: 'page' takes it from the Livewire components in
+# the page, 'network' from the Livewire XHR responses in Chrome's performance log
+# (the driver pool enables that log); both fall back to reading the page
+EXTRACTION_BACKEND = os.environ.get('FINDATA_EXTRACTION') or 'page'
+LIVEWIRE_MESSAGE_PATH = '/livewire/message/'
+
+# Counts processed Livewire messages per component (hook registered once per page)
+# and returns the baseline to compare against after a period click
+LIVEWIRE_WATCH_SCRIPT = """
+var el = document.querySelector(arguments[0]);
+if (!el || !window.Livewire) return null;
+var id = el.getAttribute('wire:id');
+if (!window.__findataProcessed) {
+    window.__findataProcessed = {};
+    window.Livewire.hook('message.processed', function (message, component) {
+        window.__findataProcessed[component.id] = (window.__findataProcessed[component.id] || 0) + 1;
+    });
+}
+var component = window.Livewire.find(id);
+return {
+    id: id,
+    processed: window.__findataProcessed[id] || 0,
+    selected: component ? component.get('selectedPeriod') : null,
+    dates: JSON.stringify(component ? component.get('dates') : null)
+};
+"""
+
+# True once the component's dates changed, or a server response was processed and the
+# period changed (opening the dropdown alone may also round-trip)
+LIVEWIRE_UPDATED_SCRIPT = """
+var watch = arguments[0];
+var component = window.Livewire && window.Livewire.find(watch.id);
+if (!component) return false;
+if (JSON.stringify(component.get('dates')) !== watch.dates) return true;
+var processed = (window.__findataProcessed || {})[watch.id] || 0;
+return processed > watch.processed && component.get('selectedPeriod') !== watch.selected;
+"""
+
+
+class FinancialDataExporter:
+    """
+    Page extraction, statement parsing and Excel export for one download.
+    SimpleFinanceGUI inherits these methods; the web server uses it directly.
+    """
+    def __init__(self, ticker=None, company_name=None, output_file=None):
+        self.selected_ticker = ticker
+        self.selected_company_name = company_name or ticker
+        self.output_file = output_file
+        self.company_info = {'name': company_name, 'currency': 'USD'}
+        self.period_switch = PERIOD_SWITCH_MODE
+        self.extraction = EXTRACTION_BACKEND
+        self._workbook = None
+        self._formats = {}
+    
+    def save_workbook(self, all_data, breakdown_data=None, output_file=None):
+        """Write all statement sheets (in SHEET_ORDER) and the revenue breakdown to Excel."""
+        import pandas as pd
+        
+        # Pre-create format objects once for reuse
+        self._workbook = None
+        self._formats = {}
+        
+        with pd.ExcelWriter(output_file or self.output_file, engine='xlsxwriter') as writer:
+            # Write sheets in the specified order
+            for sheet_name in SHEET_ORDER:
+                if sheet_name in all_data:
+                    self.format_excel_sheet_optimized(writer, all_data[sheet_name], sheet_name[:31])
+            
+            # Write any remaining sheets that weren't in the order list
+            for sheet_name, df in all_data.items():
+                if sheet_name not in SHEET_ORDER:
+                    self.format_excel_sheet_optimized(writer, df, sheet_name[:31])
+            
+            if breakdown_data:
+                self.format_revenue_breakdown_sheet(writer, breakdown_data)
+    
+    def extract_company_info(self, driver):
+        """Extract company name and currency from the page."""
+        from selenium.webdriver.common.by import By
+        
+        header_text = currency_text = None
+        
+        try:
+            # Try to get company name from the page header
+            header = driver.find_element(By.CSS_SELECTOR, '.security-header h1, .company-name, h1.title')
+            if header:
+                header_text = header.text
+        except:
+            pass
+        
+        try:
+            # Try to get currency from the page
+            currency_elem = driver.find_element(By.XPATH, "//*[contains(text(), 'Currency:')]") 
+            if currency_elem:
+                currency_text = currency_elem.text
+        except:
+            pass
+        
+        return self.parse_company_info(header_text, currency_text)
+    
+    def parse_company_info(self, header_text, currency_text):
+        """(company name, currency code) from the header and 'Currency: ...' texts (either may be None)."""
+        company_name = self.selected_ticker.upper()
+        currency = 'USD'
+        
+        if header_text:
+            company_name = header_text.strip()
+        
+        if currency_text:
+            if 'USD' in currency_text:
+                currency = 'USD'
+            elif 'EUR' in currency_text:
+                currency = 'EUR'
+            elif 'GBP' in currency_text:
+                currency = 'GBP'
+            else:
+                # Extract currency code
+                match = re.search(r'Currency:\s*([A-Z]{3})', currency_text)
+                if match:
+                    currency = match.group(1)
+        
+        return company_name, currency
+    
+    def extract_data(self, driver, statement_type):
+        from selenium.webdriver.common.by import By
+        
+        try:
+            elem = driver.find_element(By.CSS_SELECTOR, f'.{statement_type}.statement')
+            wire = elem.get_attribute('wire:initial-data')
+            if wire:
+                data = json.loads(wire).get('serverMemo', {}).get('data', {})
+                return data.get('dates', []), data.get('fieldsData', {}), data.get('selectedPeriod', 'Unknown')
+        except:
+            pass
+        return None, None, None
+    
+    def extract_data_livewire(self, driver, statement_type):
+        from selenium.webdriver.common.by import By
+        
+        try:
+            elem = driver.find_element(By.CSS_SELECTOR, f'.{statement_type}.statement')
+            wire_id = elem.get_attribute('wire:id')
+            if wire_id:
+                script = f"""
+                    var component = window.Livewire.find('{wire_id}');
+                    if (component) {{
+                        return JSON.stringify({{
+                            dates: component.get('dates'),
+                            fieldsData: component.get('fieldsData'),
+                            selectedPeriod: component.get('selectedPeriod')
+                        }});
+                    }}
+                    return null;
+                """
+                result = driver.execute_script(script)
+                if result:
+                    data = json.loads(result)
+                    return data.get('dates', []), data.get('fieldsData', {}), data.get('selectedPeriod', 'Unknown')
+        except:
+            pass
+        return None, None, None
+    
+    def click_period_fast(self, driver, period, statement_type):
+        """Optimized version of click_period with minimal waits."""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        
+        try:
+            dropdown = driver.find_element(By.CSS_SELECTOR, f'.{statement_type}.statement .vperiod.dropdown')
+            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", dropdown)
+            driver.execute_script("arguments[0].click();", dropdown)
+            
+            # Use WebDriverWait instead of fixed sleep
+            try:
+                WebDriverWait(driver, 2).until(
+                    EC.visibility_of_element_located((By.CSS_SELECTOR, f'.{statement_type}.statement .vperiod.dropdown .menu'))
+                )
+            except:
+                time.sleep(0.5)  # Fallback
+            
+            menu = driver.find_element(By.CSS_SELECTOR, f'.{statement_type}.statement .vperiod.dropdown .menu')
+            items = menu.find_elements(By.CSS_SELECTOR, '.item')
+            
+            # Try exact match first, then partial match
+            for item in items:
+                item_text = item.text.strip().lower()
+                if period.lower() == item_text or period.lower() in item_text:
+                    driver.execute_script("arguments[0].click();", item)
+                    return True
+            
+            print(f"Available periods for {statement_type}: {[i.text for i in items]}")
+        except Exception as e:
+            print(f"Error clicking period {period} for {statement_type}: {e}")
+        return False
+    
+    def click_period(self, driver, period, statement_type):
+        """Original click_period kept for backward compatibility."""
+        return self.click_period_fast(driver, period, statement_type)
+    
+    def watch_livewire(self, driver, statement_type):
+        """Baseline for livewire_updated(), taken before a period click (None if the page has no Livewire)."""
+        try:
+            return driver.execute_script(LIVEWIRE_WATCH_SCRIPT, f'.{statement_type}.statement')
+        except Exception:
+            return None
+    
+    def livewire_updated(self, driver, watch):
+        """True once the watched component has received the server's response."""
+        try:
+            return bool(driver.execute_script(LIVEWIRE_UPDATED_SCRIPT, watch))
+        except Exception:
+            return False
+    
+    def start_period_switch(self, driver, period, statement_type):
+        """Ask the statement's Livewire component for `period` without touching the DOM (False if it can't)."""
+        try:
+            return bool(driver.execute_script(PERIOD_SET_SCRIPT, f'.{statement_type}.statement', period))
+        except Exception:
+            return False
+    
+    def await_period_switch(self, driver, period, timeout=LIVEWIRE_TIMEOUT):
+        """(dates, fieldsData, selectedPeriod) once the switch started on this tab completes, or None."""
+        try:
+            result = driver.execute_async_script(PERIOD_AWAIT_SCRIPT, int(timeout * 1000))
+        except Exception:
+            return None
+        if not result:
+            return None
+        data = json.loads(result)
+        dates, fields, selected = data.get('dates'), data.get('fieldsData'), data.get('selectedPeriod')
+        # The component may not know this period (or name it differently): let the dropdown handle it
+        if not (dates and fields) or str(selected).lower() != period.lower():
+            return None
+        return dates, fields, selected
+    
+    def add_statement(self, all_data, name, dates, fields, selected):
+        """Parse one statement into all_data under "<name> (<period>)" unless already present."""
+        if dates and fields:
+            df = self.parse_data(dates, fields, selected)
+            if df is not None:
+                actual_key = f"{name} ({selected})"
+                if actual_key not in all_data:
+                    all_data[actual_key] = df
+    
+    def collect_statement(self, driver, statement_type, name, all_data):
+        """Read the statement on the current tab into all_data under "<name> (<period>)"."""
+        dates, fields, selected = self.extract_data_livewire(driver, statement_type)
+        if not (dates and fields):
+            # Fallback to extract_data
+            dates, fields, selected = self.extract_data(driver, statement_type)
+        self.add_statement(all_data, name, dates, fields, selected)
+    
+    def fetch_period_wave(self, driver, period, statements, tab_handles, periods_config, all_data,
+                          timeout=LIVEWIRE_TIMEOUT):
+        """
+        Switch every tab that still lacks `period` to it and collect the results.
+        
+        In 'livewire' mode each component is told to switch first (one
+        script per tab, so the server round trips overlap) and its response
+        is then awaited and returned by one async script per tab. Tabs where
+        that fails fall back to clicking the dropdown: all of them are
+        clicked, then each is read as soon as its component reports the
+        update, or when its own deadline passes.
+        """
+        wanted = [(tab_handles[idx], key, name) for idx, (key, name) in enumerate(statements)
+                  if period in periods_config[key] and f"{name} ({period})" not in all_data]
+        
+        to_click = wanted
+        if self.period_switch == 'livewire':
+            started = []
+            for handle, key, name in wanted:
+                driver.switch_to.window(handle)
+                if self.start_period_switch(driver, period, key):
+                    started.append((handle, key, name))
+            to_click = [tab for tab in wanted if tab not in started]
+            for handle, key, name in started:
+                driver.switch_to.window(handle)
+                result = self.await_period_switch(driver, period, timeout)
+                if result:
+                    self.add_statement(all_data, name, *result)
+                else:
+                    print(f"Livewire switch to {period} failed for {key}, clicking the dropdown")
+                    to_click.append((handle, key, name))
+        
+        pending = []
+        for handle, key, name in to_click:
+            driver.switch_to.window(handle)
+            watch = self.watch_livewire(driver, key)
+            clicked = self.click_period_fast(driver, period, key)
+            started = time.monotonic()
+            pending.append((handle, key, name, watch if clicked else None, clicked, started))
+        
+        while pending:
+            now = time.monotonic()
+            for entry in list(pending):
+                handle, key, name, watch, clicked, started = entry
+                driver.switch_to.window(handle)
+                if not clicked:
+                    ready = True
+                elif watch is None:
+                    ready = now - started >= LIVEWIRE_FALLBACK_WAIT
+                elif self.livewire_updated(driver, watch):
+                    ready = True
+                elif now - started >= timeout:
+                    print(f"No Livewire update for {key} ({period}) after {timeout:.0f}s, reading current data")
+                    ready = True
+                else:
+                    ready = False
+                if ready:
+                    self.collect_statement(driver, key, name, all_data)
+                    pending.remove(entry)
+            if pending:
+                time.sleep(LIVEWIRE_POLL_INTERVAL)
+    
+    def drain_performance_log(self, driver):
+        """Discard buffered performance log entries; False if the driver has no performance log."""
+        try:
+            driver.get_log('performance')
+            return True
+        except Exception:
+            return False
+    
+    def window_targets(self, driver, handles):
+        """
+        {DevTools target id: window handle} for the given handles. ChromeDriver
+        happens to use target ids as handles, but that is not guaranteed, so
+        each tab is asked for its own target. Leaves the last tab selected.
+        """
+        targets = {}
+        for handle in handles:
+            try:
+                driver.switch_to.window(handle)
+                info = driver.execute_cdp_cmd('Target.getTargetInfo', {})
+                targets[info['targetInfo']['targetId']] = handle
+            except Exception:
+                continue
+        return targets
+    
+    def capture_livewire_responses(self, driver, components, timeout=LIVEWIRE_TIMEOUT):
+        """
+        Statement data from the Livewire message responses in Chrome's performance log.
+        
+        `components` maps window handles to BATCH_START_SCRIPT info (wire:id,
+        current payload, number of period switches queued). Requests are tied
+        to a tab by the component id in their fingerprint, and requests from
+        other components are ignored; only a request without a fingerprint id
+        falls back to the tab that sent it (the log entry's DevTools target,
+        see window_targets), and is skipped if that is not one of ours.
+        Bodies are read with Network.getResponseBody on that tab, and each
+        response's serverMemo.data is merged over the component's previous
+        state, since Livewire may only send back what changed.
+        Gives up when no response arrives for `timeout` seconds (the caller
+        then reads the page for whatever is missing).
+        Returns {handle: [data after each response, ...]}.
+        """
+        expected = {handle: info['switches'] for handle, info in components.items() if info['switches']}
+        state = {handle: dict(info.get('initial') or {}) for handle, info in components.items()}
+        by_id = {info['id']: handle for handle, info in components.items()}
+        captured = {handle: [] for handle in components}
+        requests = {}  # requestId -> handle
+        targets = None  # DevTools target id -> handle, looked up on the first request without an id
+        current = None
+        deadline = time.monotonic() + timeout
+        while any(len(captured[handle]) < count for handle, count in expected.items()):
+            for entry in driver.get_log('performance'):
+                # ChromeDriver wraps each DevTools event as {"webview": target id, "message": event}
+                outer = json.loads(entry['message'])
+                message = outer['message']
+                method, params = message.get('method'), message.get('params', {})
+                if method == 'Network.requestWillBeSent':
+                    request = params.get('request', {})
+                    if LIVEWIRE_MESSAGE_PATH not in request.get('url', ''):
+                        continue
+                    try:
+                        component_id = json.loads(request.get('postData') or '{}').get('fingerprint', {}).get('id')
+                    except ValueError:
+                        component_id = None
+                    if component_id is not None:
+                        if component_id not in by_id:
+                            # Another Livewire component on the page (search box, watchlist...)
+                            continue
+                        handle = by_id[component_id]
+                    else:
+                        if targets is None:
+                            targets = self.window_targets(driver, components)
+                            current = None
+                        handle = targets.get(outer.get('webview'))
+                        if handle is None:
+                            continue
+                    requests[params['requestId']] = handle
+                elif method == 'Network.loadingFinished' and params.get('requestId') in requests:
+                    handle = requests.pop(params['requestId'])
+                    if handle != current:
+                        driver.switch_to.window(handle)
+                        current = handle
+                    try:
+                        body = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': params['requestId']})
+                        data = json.loads(body['body'])['serverMemo']['data']
+                    except Exception:
+                        continue
+                    state[handle].update({k: data[k] for k in ('dates', 'fieldsData', 'selectedPeriod') if k in data})
+                    captured[handle].append(dict(state[handle]))
+                    deadline = time.monotonic() + timeout
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(LIVEWIRE_POLL_INTERVAL)
+        return captured
+    
+    def fetch_statements(self, driver, statements, tab_handles, periods_config, timeout=LIVEWIRE_TIMEOUT):
+        """
+        Collect every statement in every configured period, plus the company header.
+        
+        One script per tab gathers the header and currency (first tab), the
+        current payload and each remaining period through the Livewire
+        component. All tabs are started before any is read so they work in
+        parallel. With the 'network' backend the periods are then taken from
+        the Livewire XHR responses themselves; otherwise (or for a tab whose
+        responses were not all captured) a second, async script returns the
+        tab's results as one JSON blob. Whatever a tab could not deliver is
+        fetched the old way (per-tab extraction and period waves).
+        Returns ((company name, currency), all_data).
+        """
+        all_data = {}
+        network = self.extraction == 'network' and self.drain_performance_log(driver)
+        started = {}
+        for idx, (key, name) in enumerate(statements):
+            driver.switch_to.window(tab_handles[idx])
+            try:
+                started[idx] = driver.execute_script(BATCH_START_SCRIPT, f'.{key}.statement', periods_config[key],
+                                                     idx == 0, int(timeout * 1000))
+            except Exception as e:
+                print(f"Could not start batched extraction for {key}: {e}")
+        
+        captured = {}
+        if network:
+            components = {tab_handles[idx]: info for idx, info in started.items() if info}
+            captured = self.capture_livewire_responses(driver, components, timeout)
+        
+        company = None
+        extracted = set()
+        for idx, info in started.items():
+            key, name = statements[idx]
+            responses = captured.get(tab_handles[idx], [])
+            if info and info.get('initial') and info['switches'] and len(responses) >= info['switches']:
+                result = {'header': info.get('header'), 'currency': info.get('currency'),
+                          'payloads': [info['initial']] + responses}
+            else:
+                driver.switch_to.window(tab_handles[idx])
+                try:
+                    blob = driver.execute_async_script(
+                        BATCH_AWAIT_SCRIPT, int(timeout * 1000 * (len(periods_config[key]) + 1)))
+                except Exception:
+                    blob = None
+                if not blob:
+                    continue
+                result = json.loads(blob)
+                if result.get('error'):
+                    print(f"Batched extraction for {key}: {result['error']}")
+            if idx == 0:
+                company = self.parse_company_info(result.get('header'), result.get('currency'))
+            for payload in result.get('payloads', []):
+                self.add_statement(all_data, name, payload.get('dates'), payload.get('fieldsData'),
+                                   payload.get('selectedPeriod', 'Unknown'))
+            if result.get('payloads'):
+                extracted.add(idx)
+        
+        # Fallback: anything the batch did not deliver
+        if company is None:
+            driver.switch_to.window(tab_handles[0])
+            company = self.extract_company_info(driver)
+        for idx, (key, name) in enumerate(statements):
+            if idx not in extracted:
+                driver.switch_to.window(tab_handles[idx])
+                self.collect_statement(driver, key, name, all_data)
+        all_periods = dict.fromkeys(period for periods in periods_config.values() for period in periods)
+        for period in all_periods:
+            self.fetch_period_wave(driver, period, statements, tab_handles, periods_config, all_data, timeout)
+        return company, all_data
+    
+    def parse_data(self, dates, fields_data, period_type):
+        import pandas as pd
+        
+        date_labels, date_keys = [], []
+        for d in dates:
+            date_str = d.get('date', d)[:10] if isinstance(d, dict) else str(d)[:10]
+            try:
+                parsed = dt.strptime(date_str, '%Y-%m-%d')
+                label = f"FY{parsed.year}" if period_type == 'Annual' else f"Q{(parsed.month-1)//3+1}/{parsed.year}"
+                date_labels.append(label)
+                date_keys.append(parsed)
+            except:
+                date_labels.append(date_str)
+                date_keys.append(None)
+        
+        rows = []
+        for group, items in fields_data.items():
+            for item in items:
+                row = {'Field': item.get('name', ''), '_Type': item.get('ingroupType', '')}
+                unit = item.get('unit', 'usd')
+                for i, val in enumerate(item.get('values', [])):
+                    if i < len(date_labels):
+                        v = val.get('value', 0)
+                        if v and unit != 'usd_per_share' and 'EPS' not in item.get('name', ''):
+                            v = v / 1_000_000
+                        row[date_labels[i]] = v or 0
+                rows.append(row)
+        
+        df = pd.DataFrame(rows)
+        fixed = ['Field', '_Type']
+        date_cols = [c for c in df.columns if c not in fixed]
+        col_map = {date_labels[i]: date_keys[i] for i in range(len(date_labels)) if date_keys[i]}
+        sorted_cols = sorted(date_cols, key=lambda x: col_map.get(x, dt.min))
+        return df[fixed + sorted_cols]
+    
+    def scrape_revenue_breakdown_fast(self, driver, base_url):
+        """Optimized Revenue Breakdown scraper with reduced waits."""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        
+        try:
+            driver.get(f"{base_url}/revenue-breakdown")
+            
+            # Use explicit wait instead of fixed sleep
+            try:
+                WebDriverWait(driver, 5).until(
+                    EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'Breakdown by')]"))
+                )
+            except:
+                time.sleep(2.5)  # Fallback - need enough time for page to load
+            
+            # Click Show More buttons - faster approach
+            for _ in range(3):  # Reduced iterations
+                try:
+                    buttons = driver.find_elements(By.XPATH, "//*[contains(text(), 'Show More')]")
+                    if not buttons:
+                        break
+                    for btn in buttons:
+                        try:
+                            if 'Show Less' not in btn.text:
+                                driver.execute_script("arguments[0].click();", btn)
+                        except:
+                            pass
+                    time.sleep(0.5)  # Allow content to expand
+                except:
+                    break
+            
+            page_text = driver.find_element(By.TAG_NAME, 'body').text
+            return self.parse_revenue_breakdown(page_text)
+        except Exception as e:
+            print(f"Revenue breakdown error: {e}")
+            return {}
+    
+    def parse_revenue_breakdown(self, page_text):
+        """Geography / Segments breakdown from the revenue breakdown page's text (one entry per line)."""
+        try:
+            breakdown_data = {}
+            lines = page_text.split('\n')
+            current_section = None
+            current_items = []
+            total_revenue = 0
+            
+            for line in lines:
+                line = line.strip()
+                
+                if 'Breakdown by Geography' in line:
+                    if current_section and current_items:
+                        breakdown_data[current_section] = {'total': total_revenue, 'items': current_items}
+                    current_section = 'Geography'
+                    current_items = []
+                    total_revenue = 0
+                elif 'Breakdown by Segments' in line:
+                    if current_section and current_items:
+                        breakdown_data[current_section] = {'total': total_revenue, 'items': current_items}
+                    current_section = 'Segments'
+                    current_items = []
+                    total_revenue = 0
+                
+                if not current_section:
+                    continue
+                if 'SEE ALSO' in line or 'Summary' in line:
+                    break
+                
+                if 'Total Revenue:' in line:
+                    match = re.search(r'([\d.]+)([BMK]?)\s*USD', line, re.I)
+                    if match:
+                        val = float(match.group(1))
+                        mult = match.group(2).upper()
+                        total_revenue = val * 1000 if mult == 'B' else val if mult == 'M' else val / 1000 if mult == 'K' else val * 1000
+                    continue
+                
+                match = re.search(r'^(.+?):\s*([\d.]+)([BMK]?)\s*USD', line, re.I)
+                if match:
+                    name = match.group(1).strip()
+                    val = float(match.group(2))
+                    mult = match.group(3).upper()
+                    if mult == 'B':
+                        val *= 1000
+                    elif mult == 'K':
+                        val /= 1000
+                    current_items.append({'name': name, 'value': val})
+            
+            if current_section and current_items:
+                breakdown_data[current_section] = {'total': total_revenue, 'items': current_items}
+            
+            return breakdown_data
+        except Exception as e:
+            print(f"Revenue breakdown error: {e}")
+            return {}
+    
+    def scrape_revenue_breakdown(self, driver, base_url):
+        """Original method - redirects to fast version."""
+        return self.scrape_revenue_breakdown_fast(driver, base_url)
+    
+    def get_formula_definitions(self, sheet_name):
+        if 'Income Statement' in sheet_name:
+            return INCOME_STATEMENT_FORMULAS
+        elif 'Balance Sheet' in sheet_name:
+            return BALANCE_SHEET_FORMULAS
+        elif 'Cash Flow' in sheet_name:
+            return CASH_FLOW_FORMULAS
+        return {}
+    
+    def _get_formats(self, workbook, currency_symbol='$'):
+        """Get or create cached format objects for the workbook."""
+        # Cache key includes currency symbol to regenerate if currency changes
+        cache_key = (id(workbook), currency_symbol)
+        if not hasattr(self, '_format_cache_key') or self._format_cache_key != cache_key:
+            self._format_cache_key = cache_key
+            self._workbook = workbook
+            
+            # Build currency format string with the appropriate symbol
+            curr_fmt = f'{currency_symbol}#,##0'
+            
+            self._formats = {
+                'title': workbook.add_format({'bold': True, 'font_size': 14, 'font_color': '#2E75B6'}),
+                'subtitle': workbook.add_format({'font_size': 11, 'font_color': '#666666'}),
+                'header': workbook.add_format({'bold': True, 'bg_color': '#4472C4', 'font_color': 'white', 'border': 1}),
+                'group': workbook.add_format({'bold': True, 'bg_color': '#D9E2F3', 'border': 1}),
+                'level1': workbook.add_format({'indent': 1, 'border': 1}),
+                'currency': workbook.add_format({'num_format': curr_fmt, 'border': 1, 'align': 'right'}),
+                'currency_bold': workbook.add_format({'num_format': curr_fmt, 'bold': True, 'bg_color': '#D9E2F3', 'border': 1, 'align': 'right'}),
+                'eps': workbook.add_format({'num_format': '#,##0.00', 'border': 1, 'align': 'right'}),
+                'eps_bold': workbook.add_format({'num_format': '#,##0.00', 'bold': True, 'bg_color': '#D9E2F3', 'border': 1, 'align': 'right'}),
+                'ratio_header': workbook.add_format({'bold': True, 'font_size': 12, 'bg_color': '#2E75B6', 'font_color': 'white', 'border': 1}),
+                'ratio_label': workbook.add_format({'bold': False, 'bg_color': '#DEEBF7', 'border': 1, 'indent': 1}),
+                'ratio_pct': workbook.add_format({'num_format': '0.0%', 'bg_color': '#DEEBF7', 'border': 1, 'align': 'right'}),
+            }
+        return self._formats
+    
+    def format_excel_sheet_optimized(self, writer, df, sheet_name):
+        """Optimized Excel sheet formatter with cached format objects."""
+        import pandas as pd
+        
+        workbook = writer.book
+        worksheet = workbook.add_worksheet(sheet_name)
+        writer.sheets[sheet_name] = worksheet
+        
+        # Get company info
+        company_info = getattr(self, 'company_info', {'name': self.selected_ticker, 'currency': 'USD'})
+        currency_code = company_info.get('currency', 'USD')
+        currency_symbol = get_currency_symbol(currency_code)
+        
+        # Get cached formats with proper currency symbol
+        fmts = self._get_formats(workbook, currency_symbol)
+        
+        # Build full company display name: "TICKER - Company Name"
+        ticker = self.selected_ticker.upper() if self.selected_ticker else ''
+        full_name = getattr(self, 'selected_company_name', ticker)
+        company_display = f"{ticker} - {full_name}" if full_name and full_name != ticker else ticker
+        
+        # Determine statement type from sheet name
+        if 'Income Statement' in sheet_name:
+            statement_type = 'Income Statement'
+        elif 'Balance Sheet' in sheet_name:
+            statement_type = 'Balance Sheet'
+        elif 'Cash Flow' in sheet_name:
+            statement_type = 'Cash Flow Statement'
+        else:
+            statement_type = sheet_name
+        
+        # Write company header section (rows 0-2)
+        worksheet.write(0, 0, statement_type, fmts['title'])
+        worksheet.write(1, 0, company_display, fmts['subtitle'])
+        worksheet.write(2, 0, f"Currency: {currency_code}", fmts['subtitle'])
+        
+        # Data starts at row 4 (leaving row 3 as spacer)
+        header_row = 4
+        
+        formula_defs = self.get_formula_definitions(sheet_name)
+        
+        # Build field to row map (adjusted for header offset)
+        field_to_row = {}
+        for idx, row in df.iterrows():
+            field_to_row[row.get('Field', '')] = idx + header_row + 2  # +2 for header row and 1-indexing
+        
+        date_cols = [c for c in df.columns if c not in ['Field', '_Type']]
+        output_cols = ['Field'] + date_cols
+        
+        # Write column headers
+        for col_num, col_name in enumerate(output_cols):
+            worksheet.write(header_row, col_num, col_name, fmts['header'])
+        
+        # Pre-compute row data to reduce DataFrame access overhead
+        rows_data = df.to_dict('records')
+        
+        # Write data
+        for row_num, row_dict in enumerate(rows_data):
+            excel_row = row_num + header_row + 1  # Adjusted for header offset
+            row_type = row_dict.get('_Type', '')
+            field_name = row_dict.get('Field', '')
+            is_group = row_type in ['group-total', 'important']
+            is_eps = 'EPS' in field_name
+            has_formula = field_name in formula_defs
+            
+            for col_num, col_name in enumerate(output_cols):
+                value = row_dict.get(col_name)
+                
+                if col_name == 'Field':
+                    fmt = fmts['group'] if is_group else (fmts['level1'] if row_type == 'level-1' else None)
+                    worksheet.write(excel_row, col_num, value, fmt)
+                else:
+                    if is_eps:
+                        fmt = fmts['eps_bold'] if is_group else fmts['eps']
+                    else:
+                        fmt = fmts['currency_bold'] if is_group else fmts['currency']
+                    
+                    if has_formula:
+                        # Write Excel formula
+                        formula_def = formula_defs[field_name]
+                        col_letter = get_column_letter(col_num)
+                        terms = []
+                        for src in formula_def['sources']:
+                            src_row = field_to_row.get(src)
+                            if src_row:
+                                terms.append(f"{col_letter}{src_row}")
+                        if terms:
+                            formula = "=SUM(" + ",".join(terms) + ")"
+                            worksheet.write_formula(excel_row, col_num, formula, fmt)
+                        else:
+                            worksheet.write(excel_row, col_num, value if pd.notna(value) else 0, fmt)
+                    else:
+                        worksheet.write(excel_row, col_num, value if pd.notna(value) else 0, fmt)
+        
+        # Add ratios for Income Statement (not TTM)
+        if 'Income Statement' in sheet_name and 'TTM' not in sheet_name:
+            self.add_ratios_optimized(worksheet, workbook, df, field_to_row, output_cols, header_row)
+        
+        worksheet.set_column('A:A', 35)
+        worksheet.set_column('B:ZZ', 15)
+        worksheet.freeze_panes(header_row + 1, 1)  # Freeze below data headers
+    
+    def format_excel_sheet(self, writer, df, sheet_name):
+        """Original method - redirects to optimized version."""
+        return self.format_excel_sheet_optimized(writer, df, sheet_name)
+    
+    def add_ratios_optimized(self, worksheet, workbook, df, field_to_row, output_cols, header_row=4):
+        """Optimized ratios section using cached formats."""
+        last_row = len(df) + header_row + 1
+        ratio_row = last_row + 2
+        
+        fmts = self._get_formats(workbook)
+        
+        # Header row
+        worksheet.write(ratio_row, 0, 'Ratios', fmts['ratio_header'])
+        for col in range(1, len(output_cols)):
+            worksheet.write(ratio_row, col, '', fmts['ratio_header'])
+        
+        ratios = [
+            ('Gross Profit Margin', 'Gross Profit', 'Revenue'),
+            ('Operating Profit Margin', 'Operating Income', 'Revenue'),
+            ('Net Profit Margin', 'Net Income (Common)', 'Revenue'),
+            ('R&D as % of Revenue', 'Research & Development', 'Revenue'),
+            ('SG&A as % of Revenue', 'Selling, General & Administrative', 'Revenue'),
+        ]
+        
+        current_row = ratio_row + 1
+        for ratio_name, num_field, denom_field in ratios:
+            worksheet.write(current_row, 0, ratio_name, fmts['ratio_label'])
+            num_row = field_to_row.get(num_field)
+            denom_row = field_to_row.get(denom_field)
+            
+            if num_row and denom_row:
+                for col in range(1, len(output_cols)):
+                    col_letter = get_column_letter(col)
+                    if 'R&D' in ratio_name or 'SG&A' in ratio_name:
+                        formula = f"=ABS({col_letter}{num_row})/{col_letter}{denom_row}"
+                    else:
+                        formula = f"={col_letter}{num_row}/{col_letter}{denom_row}"
+                    worksheet.write_formula(current_row, col, formula, fmts['ratio_pct'])
+            else:
+                for col in range(1, len(output_cols)):
+                    worksheet.write(current_row, col, 'N/A', fmts['ratio_label'])
+            current_row += 1
+        
+        # Revenue Y/Y Growth
+        worksheet.write(current_row, 0, 'Revenue Y/Y Growth', fmts['ratio_label'])
+        rev_row = field_to_row.get('Revenue')
+        if rev_row:
+            worksheet.write(current_row, 1, 'N/A', fmts['ratio_label'])
+            for col in range(2, len(output_cols)):
+                col_letter = get_column_letter(col)
+                prev_letter = get_column_letter(col - 1)
+                formula = f"=({col_letter}{rev_row}-{prev_letter}{rev_row})/{prev_letter}{rev_row}"
+                worksheet.write_formula(current_row, col, formula, fmts['ratio_pct'])
+    
+    def add_ratios(self, worksheet, workbook, df, field_to_row, output_cols, header_row=4):
+        """Original method - redirects to optimized version."""
+        return self.add_ratios_optimized(worksheet, workbook, df, field_to_row, output_cols, header_row)
+    
+    def format_revenue_breakdown_sheet(self, writer, breakdown_data):
+        """Format Revenue Breakdown sheet."""
+        workbook = writer.book
+        worksheet = workbook.add_worksheet('Revenue Breakdown')
+        writer.sheets['Revenue Breakdown'] = worksheet
+        
+        # Get company info
+        company_info = getattr(self, 'company_info', {'name': self.selected_ticker, 'currency': 'USD'})
+        currency_code = company_info.get('currency', 'USD')
+        currency_symbol = get_currency_symbol(currency_code)
+        
+        # Build full company display name: "TICKER - Company Name"
+        ticker = self.selected_ticker.upper() if self.selected_ticker else ''
+        full_name = getattr(self, 'selected_company_name', ticker)
+        company_display = f"{ticker} - {full_name}" if full_name and full_name != ticker else ticker
+        
+        # Header formats
+        company_title_fmt = workbook.add_format({'bold': True, 'font_size': 14, 'font_color': '#2E75B6'})
+        subtitle_fmt = workbook.add_format({'font_size': 11, 'font_color': '#666666'})
+        
+        # Write company header section (rows 0-2)
+        worksheet.write(0, 0, 'Revenue Breakdown', company_title_fmt)
+        worksheet.write(1, 0, company_display, subtitle_fmt)
+        worksheet.write(2, 0, f"Currency: {currency_code}", subtitle_fmt)
+        
+        # Data formats with proper currency symbol
+        curr_fmt_str = f'{currency_symbol}#,##0'
+        title_fmt = workbook.add_format({'bold': True, 'font_size': 14, 'bg_color': '#2E75B6', 'font_color': 'white', 'border': 1})
+        header_fmt = workbook.add_format({'bold': True, 'bg_color': '#4472C4', 'font_color': 'white', 'border': 1})
+        item_fmt = workbook.add_format({'border': 1, 'indent': 1})
+        currency_fmt = workbook.add_format({'num_format': curr_fmt_str, 'border': 1, 'align': 'right'})
+        pct_fmt = workbook.add_format({'num_format': '0.0%', 'border': 1, 'align': 'right'})
+        total_fmt = workbook.add_format({'bold': True, 'bg_color': '#D9E2F3', 'border': 1})
+        total_curr_fmt = workbook.add_format({'bold': True, 'num_format': curr_fmt_str, 'bg_color': '#D9E2F3', 'border': 1, 'align': 'right'})
+        total_pct_fmt = workbook.add_format({'bold': True, 'num_format': '0.0%', 'bg_color': '#D9E2F3', 'border': 1, 'align': 'right'})
+        
+        row = 4  # Start after header section
+        for section_name, section_data in breakdown_data.items():
+            worksheet.write(row, 0, f'Breakdown by {section_name}', title_fmt)
+            worksheet.write(row, 1, '', title_fmt)
+            worksheet.write(row, 2, '', title_fmt)
+            row += 1
+            
+            worksheet.write(row, 0, 'Segment', header_fmt)
+            worksheet.write(row, 1, 'Revenue (M)', header_fmt)
+            worksheet.write(row, 2, '% of Total', header_fmt)
+            row += 1
+            
+            total = section_data.get('total', 0)
+            if total == 0:
+                total = sum(item.get('value', 0) for item in section_data.get('items', []))
+            
+            for item in section_data.get('items', []):
+                val = item.get('value', 0)
+                pct = val / total if total > 0 else 0
+                worksheet.write(row, 0, item.get('name', ''), item_fmt)
+                worksheet.write(row, 1, val, currency_fmt)
+                worksheet.write(row, 2, pct, pct_fmt)
+                row += 1
+            
+            worksheet.write(row, 0, 'Total', total_fmt)
+            worksheet.write(row, 1, total, total_curr_fmt)
+            worksheet.write(row, 2, 1.0, total_pct_fmt)
+            row += 2
+        
+        worksheet.set_column('A:A', 40)
+        worksheet.set_column('B:B', 15)
+        worksheet.set_column('C:C', 12)
+        worksheet.freeze_panes(5, 0)  # Freeze below first data header
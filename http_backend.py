@@ -0,0 +1,575 @@
+"""
+Browserless statement fetching over plain HTTP.
+
+The statement pages are rendered on the server: each `.{statement}.statement`
+element carries its Livewire component's state (dates, fieldsData and
+selectedPeriod of the default period) in `wire:initial-data`, which is all
+extract_data() reads. This backend downloads the pages through a pooled
+HTTP client and pulls that attribute out with a streaming HTML parser. Once
+the parser has it, the rest of the page is not downloaded. The other
+periods come from replaying the Livewire message the component sends when
+its period changes. No Chrome is started.
+
+With FINDATA_FETCH=http both apps try it first and fall back to the
+browser when the site does not serve a download this way: no listing found
+over HTTP, a page without the component, a rejected Livewire message or an
+anti-bot answer. An anti-bot answer also turns the backend off for
+BLOCK_COOLDOWN seconds. The default, 'browser', always uses Chrome: the
+backend has only been exercised against the stand-in site in
+benchmarks/bench_http_backend.py, not against recorded pages of the real
+one. urllib3 (installed with selenium) is imported on first use.
+"""
+import os
+import re
+import json
+import time
+import codecs
+import secrets
+import threading
+from html.parser import HTMLParser
+from http.cookies import SimpleCookie, CookieError
+from urllib.parse import urljoin, urlsplit
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from findata_core import (
+    PROBE_CONCURRENCY, PROBE_TIMEOUT, LIVEWIRE_TIMEOUT, LIVEWIRE_MESSAGE_PATH, CHALLENGE_TITLE_PATTERN,
+    BLOCKED_HTTP_STATUSES, is_definite_miss
+)
+from driver_pool import USER_AGENT
+from ticker_cache import ticker_cache, resolve_listing
+
+
+FETCH_BACKEND = os.environ.get('FINDATA_FETCH') or 'browser'
+SITE_URL = 'https://www.alphaspread.com'
+
+# Connections kept open to the site (three statement pages and their messages run at once)
+HTTP_POOL_SIZE = 4
+HTTP_TIMEOUT = 10.0
+READ_CHUNK = 16 * 1024
+MAX_REDIRECTS = 3
+
+# Answers that mean the site is refusing scripted clients rather than reporting on the listing
+BLOCKED_STATUSES = set(BLOCKED_HTTP_STATUSES) | {503}
+CHALLENGE_TITLE_RE = re.compile(CHALLENGE_TITLE_PATTERN, re.I)
+NOT_FOUND_TITLE_RE = re.compile(r'\b404\b|not found', re.I)
+BLOCK_COOLDOWN = int(os.environ.get('FINDATA_HTTP_BLOCK_COOLDOWN') or 15 * 60)
+
+LIVEWIRE_TOKEN_RE = re.compile(r"livewire_token\s*=\s*['\"]([^'\"]+)")
+
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+# Text in these is never shown, so WebElement.text leaves it out
+HIDDEN_TAGS = {'head', 'script', 'style', 'template', 'noscript', 'svg'}
+# Elements that start a new line of text
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt', 'footer', 'form',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'section',
+    'table', 'tr', 'ul',
+}
+
+
+class PageParser(HTMLParser):
+    """
+    Streaming parse of a statement page.
+
+    Picks up the statement element's attributes (wire:id, wire:initial-data),
+    the CSRF token and the page title. With `include_header` it also takes
+    the company header and 'Currency: ...' texts, the same elements
+    extract_company_info() reads. `done` turns True once everything wanted
+    has been seen.
+    """
+
+    def __init__(self, statement_type, include_header=False):
+        super().__init__(convert_charrefs=True)
+        self.statement_type = statement_type
+        self.include_header = include_header
+        self.component = None
+        self.csrf_token = None
+        self.title = ''
+        self.header = None
+        self.currency = None
+        self._stack = []  # (tag, classes) of open elements
+        self._capture = None  # (field, depth, parts) of the text being collected
+        self._raw = None  # 'title' or 'script' while inside one
+
+    @property
+    def done(self):
+        if self.component is None:
+            return False
+        return not self.include_header or (self.header is not None and self.currency is not None)
+
+    def _is_header(self, tag, classes):
+        # '.security-header h1, .company-name, h1.title'
+        if 'company-name' in classes:
+            return True
+        return tag == 'h1' and ('title' in classes or any('security-header' in c for _, c in self._stack))
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get('class') or '').split()
+        if tag == 'meta' and attrs.get('name') == 'csrf-token':
+            self.csrf_token = self.csrf_token or attrs.get('content')
+        if self.component is None and self.statement_type in classes and 'statement' in classes:
+            self.component = attrs
+        if (self.include_header and self.header is None and self._capture is None
+                and self._is_header(tag, classes)):
+            self._capture = ('header', len(self._stack), [])
+        if tag in ('title', 'script'):
+            self._raw = tag
+        if tag not in VOID_TAGS:
+            self._stack.append((tag, classes))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag == self._raw:
+            self._raw = None
+        if not any(open_tag == tag for open_tag, _ in self._stack):
+            return  # Stray end tag
+        while self._stack and self._stack.pop()[0] != tag:
+            pass
+        if self._capture and len(self._stack) <= self._capture[1]:
+            field, _, parts = self._capture
+            self._capture = None
+            text = ''.join(parts)
+            if field == 'header':
+                self.header = ' '.join(text.split())
+            else:
+                self.currency = text.strip()
+
+    def handle_data(self, data):
+        if self._raw == 'title':
+            self.title += data
+        elif self._raw == 'script':
+            if self.csrf_token is None:
+                match = LIVEWIRE_TOKEN_RE.search(data)
+                if match:
+                    self.csrf_token = match.group(1)
+            return
+        if self._capture:
+            self._capture[2].append(data)
+        elif self.include_header and self.currency is None and 'Currency:' in data:
+            # '//*[contains(text(), 'Currency:')]': the element holding this text
+            self._capture = ('currency', len(self._stack) - 1, [data])
+
+
+class TextParser(HTMLParser):
+    """A page's visible text, one line per block element (roughly what WebElement.text gives)."""
+
+    done = False
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._parts = []
+        self._hidden = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in HIDDEN_TAGS:
+            self._hidden += 1
+        elif tag in BLOCK_TAGS:
+            self._parts.append('\n')
+        elif tag in ('td', 'th'):
+            self._parts.append('\t')
+
+    def handle_endtag(self, tag):
+        if tag in HIDDEN_TAGS:
+            self._hidden = max(0, self._hidden - 1)
+        elif tag in BLOCK_TAGS:
+            self._parts.append('\n')
+
+    def handle_data(self, data):
+        if not self._hidden:
+            self._parts.append(data)
+
+    @property
+    def text(self):
+        lines = (' '.join(line.split()) for line in ''.join(self._parts).split('\n'))
+        return '\n'.join(line for line in lines if line)
+
+
+class HttpClient:
+    """
+    Pooled connections to the site, shared by every download.
+
+    Connections live in one urllib3 PoolManager. Cookies live in
+    per-download HttpSession objects, because a page's CSRF token is only
+    valid with the session cookie it was issued with. The site answering
+    like an anti-bot wall sets `blocked_until`; available() is False until
+    then.
+    """
+
+    def __init__(self, site_url=SITE_URL, pool_size=HTTP_POOL_SIZE, timeout=HTTP_TIMEOUT,
+                 block_cooldown=BLOCK_COOLDOWN):
+        self.site_url = site_url.rstrip('/')
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.block_cooldown = block_cooldown
+        self.blocked_until = 0.0
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def pool(self):
+        with self._lock:
+            if self._pool is None:
+                import urllib3
+                self._pool = urllib3.PoolManager(maxsize=self.pool_size, retries=False)
+            return self._pool
+
+    def listing_url(self, exchange, slug):
+        return f"{self.site_url}/security/{exchange}/{slug}/financials"
+
+    def available(self):
+        return time.time() >= self.blocked_until
+
+    def mark_blocked(self, reason):
+        self.blocked_until = time.time() + self.block_cooldown
+        print(f"Site refused plain HTTP ({reason}), using the browser for the next "
+              f"{self.block_cooldown // 60} min")
+
+    def session(self):
+        return HttpSession(self)
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.clear()
+
+
+class HttpSession:
+    """One download's cookies over the shared client's connections."""
+
+    def __init__(self, client):
+        self.client = client
+        self.cookies = {}
+
+    def _headers(self, extra=None):
+        headers = {'User-Agent': USER_AGENT, 'Accept-Language': 'en-US,en;q=0.9'}
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f"{name}={value}" for name, value in self.cookies.items())
+        headers.update(extra or {})
+        return headers
+
+    def _store_cookies(self, response):
+        for header in response.headers.getlist('Set-Cookie'):
+            cookie = SimpleCookie()
+            try:
+                cookie.load(header)
+            except CookieError:
+                continue
+            for name, morsel in cookie.items():
+                self.cookies[name] = morsel.coded_value
+
+    def _timeout(self, timeout):
+        import urllib3
+        timeout = timeout or self.client.timeout
+        return urllib3.Timeout(connect=timeout, read=timeout)
+
+    def open(self, url, timeout=None):
+        """Streamed GET, following redirects; (response, final url). The caller releases the response."""
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self.client.pool().request(
+                'GET', url, headers=self._headers({'Accept': 'text/html,application/xhtml+xml'}),
+                preload_content=False, redirect=False, timeout=self._timeout(timeout))
+            self._store_cookies(response)
+            location = response.headers.get('Location')
+            if response.status not in (301, 302, 303, 307, 308) or not location:
+                break
+            response.drain_conn()
+            response.release_conn()
+            url = urljoin(url, location)
+        return response, url
+
+    def post_json(self, url, payload, headers=None, timeout=None):
+        """POST a JSON body; the response is read in full."""
+        response = self.client.pool().request(
+            'POST', url, body=json.dumps(payload).encode('utf-8'),
+            headers=self._headers(dict({'Content-Type': 'application/json'}, **(headers or {}))),
+            redirect=False, timeout=self._timeout(timeout))
+        self._store_cookies(response)
+        return response
+
+
+def read_page(session, url, parser, timeout=None):
+    """
+    Stream a page through `parser` until `parser.done` or the end of the body.
+
+    Returns (status, final url, bytes read). Stopping early closes the
+    connection instead of reading the rest of the page into the pool.
+    """
+    response, final_url = session.open(url, timeout)
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    read = 0
+    try:
+        for chunk in response.stream(READ_CHUNK):
+            read += len(chunk)
+            parser.feed(decoder.decode(chunk))
+            if parser.done:
+                response.close()
+                break
+        else:
+            parser.feed(decoder.decode(b'', final=True))
+    finally:
+        response.release_conn()
+    return response.status, final_url, read
+
+
+def is_blocked(status, title):
+    return status in BLOCKED_STATUSES or bool(CHALLENGE_TITLE_RE.search(title or ''))
+
+
+def probe_listing(client, slug, exchange, timeout=PROBE_TIMEOUT):
+    """
+    What the listing's income statement page says over HTTP.
+
+    Returns 'found' or the reason it is a miss, like PROBE_STATE_SCRIPT.
+    """
+    parser = PageParser('income-statement')
+    try:
+        status, final_url, _ = read_page(client.session(), f"{client.listing_url(exchange, slug)}/income-statement",
+                                         parser, timeout)
+    except Exception as e:
+        return f"error: {e.__class__.__name__}"
+    if parser.component is not None:
+        return 'found'
+    if is_blocked(status, parser.title):
+        client.mark_blocked(f"HTTP {status} for {slug}@{exchange}")
+        return f"blocked (HTTP {status})"
+    if status >= 400:
+        return f"HTTP {status}"
+    path = urlsplit(final_url).path
+    if '/financials' not in path:
+        return f"redirected to {path}"
+    if NOT_FOUND_TITLE_RE.search(parser.title):
+        return 'not-found page'
+    return 'no statement table'
+
+
+def find_valid_ticker_http(client, alternatives, on_probe=None, on_miss=None, timer=None,
+                           concurrency=PROBE_CONCURRENCY, timeout=PROBE_TIMEOUT):
+    """
+    find_valid_ticker() over HTTP.
+
+    Finds the first (ticker, exchange) in `alternatives` whose income
+    statement page carries the statement component, with the same
+    contract: priority order, `concurrency` requests at a time, the same
+    callbacks and the same timer keys, and the same is_definite_miss() rule
+    for 'missing'. A page served without the component is undecided,
+    because without a browser a missing table looks like one rendered by
+    script. Gives up once the site blocks the client.
+    """
+    if not alternatives:
+        return None
+
+    def run(slug, exchange):
+        started = time.monotonic()
+        return probe_listing(client, slug, exchange, timeout), time.monotonic() - started
+
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    queue = list(enumerate(alternatives))
+    running = {}  # future -> idx
+    results = {}  # idx -> found
+    next_idx = 0
+    try:
+        while True:
+            # Accept or skip finished candidates strictly in priority order
+            while next_idx in results:
+                if results[next_idx]:
+                    return alternatives[next_idx]
+                next_idx += 1
+            if next_idx >= len(alternatives) or not client.available():
+                return None
+
+            # Never start probes ranked below a hit that is only waiting on higher-priority ones
+            best_hit = min((idx for idx, found in results.items() if found), default=len(alternatives))
+            while queue and len(running) < concurrency and queue[0][0] < best_hit:
+                idx, (slug, exchange) = queue.pop(0)
+                if on_probe:
+                    on_probe(idx, len(alternatives), slug, exchange)
+                running[executor.submit(run, slug, exchange)] = idx
+            if not running:
+                return None
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                idx = running.pop(future)
+                state, elapsed = future.result()
+                found = state == 'found'
+                results[idx] = found
+                outcome = 'found' if found else ('missing' if is_definite_miss(state) else 'timeout')
+                if timer:
+                    timer.record(f'find_valid_ticker.{outcome}', elapsed)
+                slug, exchange = alternatives[idx]
+                print(f"Probe {slug}@{exchange} over HTTP: {state} after {elapsed:.2f}s")
+                if not found and on_miss:
+                    on_miss(idx, slug, exchange, outcome)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def statement_payload(data):
+    return {'dates': data.get('dates'), 'fieldsData': data.get('fieldsData'),
+            'selectedPeriod': data.get('selectedPeriod', 'Unknown')}
+
+
+def merge_server_memo(memo, answer):
+    """The component's server memo after a response: data keys merged, everything else replaced (as Livewire does)."""
+    merged = dict(memo, **{key: value for key, value in answer.items() if key != 'data'})
+    merged['data'] = dict(memo.get('data') or {}, **(answer.get('data') or {}))
+    return merged
+
+
+def fetch_statement(client, base_url, statement_type, periods, include_header=False, timeout=LIVEWIRE_TIMEOUT):
+    """
+    One statement in every period, shaped like BATCH_AWAIT_SCRIPT's blob.
+
+    Returns {'header', 'currency', 'payloads', 'error'}. The page's
+    wire:initial-data gives the current period. Each other period is one
+    POST to the Livewire message endpoint with the component's fingerprint
+    and server memo: the request the component itself makes on
+    set('selectedPeriod', ...). The memo that comes back is merged in
+    before the next one.
+    """
+    result = {'header': None, 'currency': None, 'payloads': [], 'error': None}
+    session = client.session()
+    parser = PageParser(statement_type, include_header)
+    try:
+        status, page_url, _ = read_page(session, f"{base_url}/{statement_type}", parser, client.timeout)
+    except Exception as e:
+        result['error'] = f"page did not load: {e}"
+        return result
+    result['header'], result['currency'] = parser.header, parser.currency
+    if parser.component is None:
+        if is_blocked(status, parser.title):
+            client.mark_blocked(f"HTTP {status} for {statement_type}")
+        result['error'] = f"no component in the page (HTTP {status})"
+        return result
+
+    try:
+        initial = json.loads(parser.component.get('wire:initial-data') or '')
+        fingerprint, memo = initial['fingerprint'], initial['serverMemo']
+        message_url = f"{client.site_url}{LIVEWIRE_MESSAGE_PATH}{fingerprint['name']}"
+    except (ValueError, KeyError, TypeError) as e:
+        result['error'] = f"unreadable wire:initial-data ({e.__class__.__name__})"
+        return result
+    result['payloads'].append(statement_payload(memo.get('data') or {}))
+
+    headers = {'Accept': 'text/html, application/xhtml+xml', 'X-Livewire': 'true',
+               'Referer': page_url, 'Origin': client.site_url}
+    if parser.csrf_token:
+        headers['X-CSRF-TOKEN'] = parser.csrf_token
+    current = str(result['payloads'][0]['selectedPeriod']).lower()
+    for period in periods:
+        if period.lower() == current:
+            continue
+        update = {'type': 'syncInput', 'payload': {'id': secrets.token_hex(3), 'name': 'selectedPeriod', 'value': period}}
+        try:
+            response = session.post_json(message_url, {'fingerprint': fingerprint, 'serverMemo': memo, 'updates': [update]},
+                                         headers, timeout)
+        except Exception as e:
+            result['error'] = f"no response switching to {period}: {e}"
+            break
+        if response.status != 200:
+            if is_blocked(response.status, ''):
+                client.mark_blocked(f"HTTP {response.status} for a Livewire message")
+            result['error'] = f"Livewire message for {period} rejected (HTTP {response.status})"
+            break
+        try:
+            memo = merge_server_memo(memo, json.loads(response.data)['serverMemo'])
+        except (ValueError, KeyError, TypeError):
+            result['error'] = f"unreadable Livewire response for {period}"
+            break
+        payload = statement_payload(memo['data'])
+        # The component may not know this period (or name it differently): let the browser handle it
+        if str(payload['selectedPeriod']).lower() != period.lower():
+            result['error'] = f"component did not switch to {period}"
+            break
+        result['payloads'].append(payload)
+    return result
+
+
+def fetch_statements_http(exporter, client, base_url, statements, periods_config, timeout=LIVEWIRE_TIMEOUT):
+    """
+    exporter.fetch_statements() without a browser.
+
+    Each statement is fetched in its own session, all at once. Returns
+    ((company name, currency), all_data, results), where results maps each
+    statement key to its fetch_statement() blob, errors included.
+    """
+    with ThreadPoolExecutor(max_workers=len(statements)) as executor:
+        futures = {key: executor.submit(fetch_statement, client, base_url, key, periods_config[key], idx == 0, timeout)
+                   for idx, (key, name) in enumerate(statements)}
+        results = {key: future.result() for key, future in futures.items()}
+
+    all_data = {}
+    for key, name in statements:
+        for payload in results[key]['payloads']:
+            exporter.add_statement(all_data, name, payload['dates'], payload['fieldsData'], payload['selectedPeriod'])
+    first = results[statements[0][0]]
+    return exporter.parse_company_info(first['header'], first['currency']), all_data, results
+
+
+def fetch_revenue_breakdown_http(exporter, client, base_url):
+    """
+    Revenue breakdown read from the page's HTML, or None when it has none to read.
+
+    None means the page did not load or the breakdown is rendered by
+    script, and the caller falls back to the browser. Items the browser
+    only shows after 'Show More' are in the HTML already.
+    """
+    parser = TextParser()
+    try:
+        status, _, _ = read_page(client.session(), f"{base_url}/revenue-breakdown", parser, client.timeout)
+    except Exception as e:
+        print(f"Revenue breakdown over HTTP failed: {e}")
+        return None
+    text = parser.text
+    if status != 200 or 'Breakdown by' not in text:
+        return None
+    return exporter.parse_revenue_breakdown(text)
+
+
+def download_over_http(exporter, ticker, company_name, alternatives, statements, periods_config,
+                       on_probe=None, timer=None, client=None, cache=None):
+    """
+    Resolve the listing and fetch every statement without a browser.
+
+    Returns (slug, exchange, base_url, (company name, currency), all_data),
+    or None when the site does not serve the download this way. On None
+    the caller runs the browser flow. A listing found here is already in
+    the ticker cache by then, so the browser does not search again. Misses
+    seen here are not remembered: a redirect or not-found page served to a
+    script client must not hide the listing from the browser. As in
+    the browser flow, a cached listing whose page has lost its statement
+    is invalidated and searched for again.
+    """
+    client = client or http_client
+    cache = cache or ticker_cache
+    if not client.available():
+        return None
+
+    base_url = results = None
+    for use_cache in (True, False):
+        resolved = resolve_listing(client, ticker, company_name, alternatives, on_probe=on_probe, use_cache=use_cache,
+                                   cache=cache, timer=timer, probe=find_valid_ticker_http, record_missing=False)
+        if not resolved:
+            return None
+        slug, exchange, from_cache = resolved
+        base_url = client.listing_url(exchange, slug)
+        company, all_data, results = fetch_statements_http(exporter, client, base_url, statements, periods_config)
+        if results[statements[0][0]]['payloads'] or not from_cache or not client.available():
+            break
+        # The cached listing stopped serving data: forget it and search again
+        print(f"Cached listing {slug} on {exchange} no longer has statements over HTTP, searching again")
+        cache.invalidate(ticker, company_name)
+
+    failed = {key: result['error'] for key, result in results.items() if result['error']}
+    if failed:
+        print(f"HTTP fetch incomplete, using the browser: {failed}")
+        return None
+    return slug, exchange, base_url, company, all_data
+
+
+# Shared by the web server and the Tk app
+http_client = HttpClient()
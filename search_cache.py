@@ -0,0 +1,127 @@
+"""
+Bounded LRU cache of serialized /api/search responses, and per-client
+typeahead contexts.
+
+Entries belong to one universe version: when the loader publishes a new
+universe the cache is emptied under its lock, and results computed against
+an older universe are never stored or served afterwards. Contexts carry
+the version too and are ignored once it changes.
+"""
+import threading
+from collections import OrderedDict
+
+
+class SearchCache:
+    """LRU map of (query, exchange) -> serialized JSON body, with hit/miss counters."""
+
+    def __init__(self, maxsize=2048):
+        self.maxsize = maxsize
+        self.version = None
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def _reset(self, version):
+        self.entries.clear()
+        self.version = version
+        self.invalidations += 1
+
+    def invalidate(self, version):
+        """Drop every entry and only accept results for `version` from now on."""
+        with self._lock:
+            if self.version is None or version > self.version:
+                self._reset(version)
+
+    def get(self, version, key):
+        """Cached body for key under universe `version`, or None (counted as a miss)."""
+        with self._lock:
+            if self.version is None or version > self.version:
+                self._reset(version)
+            body = self.entries.get(key) if version == self.version else None
+            if body is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, version, key, body):
+        """Store a body computed against universe `version` (ignored if a newer one is live)."""
+        with self._lock:
+            if self.version is None or version > self.version:
+                self._reset(version)
+            elif version < self.version:
+                return
+            self.entries[key] = body
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def bypass(self):
+        """Count a request that is deliberately not cached."""
+        with self._lock:
+            self.bypassed += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'version': self.version,
+                'size': len(self.entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'bypassed': self.bypassed,
+                'invalidations': self.invalidations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+class SearchContext:
+    """
+    One client's previous query and a superset of its matching rows.
+
+    Any query that extends the previous one (same exchange and universe)
+    can only match rows in that set. State is replaced as one tuple so
+    concurrent requests from the same client never see a torn update.
+    """
+
+    def __init__(self):
+        self.state = None
+
+    def candidates_for(self, version, exchange, query):
+        """Previous candidates if they cover query, else None."""
+        state = self.state
+        if state is None:
+            return None
+        prev_version, prev_exchange, prev_query, candidates = state
+        if prev_version != version or prev_exchange != exchange or not query.startswith(prev_query):
+            return None
+        return candidates
+
+    def update(self, version, exchange, query, candidates):
+        self.state = (version, exchange, query, candidates) if candidates is not None else None
+
+
+class SearchSessions:
+    """Bounded LRU of session id -> SearchContext."""
+
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self.contexts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        """Context for a session, created on first use."""
+        with self._lock:
+            context = self.contexts.get(session_id)
+            if context is None:
+                context = self.contexts[session_id] = SearchContext()
+                while len(self.contexts) > self.maxsize:
+                    self.contexts.popitem(last=False)
+            else:
+                self.contexts.move_to_end(session_id)
+            return context
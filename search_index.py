@@ -0,0 +1,492 @@
+"""
+Precomputed search structures for the ticker typeahead.
+
+Built once per loaded company list (web universe or Tk display list) so a
+keystroke no longer re-uppercases and masks every row of the DataFrame.
+Symbols are kept upper-cased and sorted, globally and per exchange, so
+exact and prefix matches are two binary searches plus a slice. Names are
+covered by an n-gram inverted index (bigrams and trigrams): the postings of
+the query's n-grams are intersected to a candidate set, which is then
+verified with a plain substring test. The typo-tolerant mode ranks names by
+trigram Jaccard similarity, scoring full and suffix-stripped names
+(normalize_company_name) so "Microsoft Corporation" is compared as
+"microsoft" too.
+"""
+import difflib
+import json
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from findata_core import normalize_company_name, sorted_exchange_choices
+
+
+# Names are indexed by every substring of these lengths; queries use the longest that fits
+NGRAM_SIZES = (2, 3)
+
+# Candidates are verified in row order in chunks of this size, stopping once the limit is filled
+VERIFY_CHUNK = 1024
+
+# Larger candidate sets are not kept for incremental narrowing (index lookups are as fast,
+# and per-client sets must stay small)
+MAX_CONTEXT_ROWS = 8192
+
+# Fuzzy mode: time budget per query, minimum trigram Jaccard score, longest query considered,
+# and how many distinct names with the best trigram scores are re-ranked with difflib
+FUZZY_BUDGET_MS = 3.0
+FUZZY_MIN_SCORE = 0.1
+FUZZY_MAX_QUERY = 32
+FUZZY_RERANK_POOL = 20
+
+
+def prefix_successor(prefix):
+    """Smallest string greater than every string starting with prefix."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class SymbolPartition:
+    """
+    Upper-case symbols of a set of rows sorted by (symbol, row position).
+
+    Rows sharing a symbol stay in DataFrame order, and because the query
+    itself sorts before its extensions, exact matches are always the head
+    of the prefix range.
+    """
+
+    def __init__(self, sorted_symbols, rows, exchange_id=None):
+        self.sorted_symbols = sorted_symbols
+        self.rows = rows
+        self.exchange_id = exchange_id
+        self.max_length = sorted_symbols.dtype.itemsize // np.dtype('U1').itemsize
+        # The same rows in DataFrame order, for scans that must respect it and for sampling
+        self.positions = np.sort(rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def ranges(self, query):
+        """(lo, mid, hi): rows[lo:mid] match query exactly, rows[mid:hi] extend it."""
+        if len(query) > self.max_length:
+            # No symbol is that long; also keeps numpy from widening the array to compare
+            return 0, 0, 0
+        lo = int(np.searchsorted(self.sorted_symbols, query, side='left'))
+        mid = int(np.searchsorted(self.sorted_symbols, query, side='right'))
+        hi = int(np.searchsorted(self.sorted_symbols, prefix_successor(query), side='left'))
+        return lo, mid, hi
+
+
+def name_ngrams(name, sizes=NGRAM_SIZES):
+    """Distinct n-grams of an upper-cased name."""
+    return {name[i:i + n] for n in sizes for i in range(len(name) - n + 1)}
+
+
+def query_ngrams(query):
+    """N-grams whose postings must all contain a name matching query (empty if too short)."""
+    size = min(len(query), NGRAM_SIZES[-1])
+    if size < NGRAM_SIZES[0]:
+        return set()
+    return name_ngrams(query, (size,))
+
+
+def fuzzy_trigrams(name):
+    """Distinct trigrams of a lower-case name padded with one space, so word edges count."""
+    if not name:
+        return set()
+    return name_ngrams(f' {name} ', (3,))
+
+
+def fuzzy_forms(name):
+    """(full, normalized) forms of a name or query that fuzzy_search compares."""
+    return ' '.join(str(name).lower().split()), normalize_company_name(name)
+
+
+class TrigramPostings:
+    """Padded trigrams of a list of name forms as CSR postings of name codes."""
+
+    def __init__(self, names):
+        self.names = np.asarray(names, dtype=object)
+        self.gram_ids = {}
+        grams = []
+        self.gram_counts = np.zeros(len(self.names), dtype=np.int32)
+        for code, name in enumerate(self.names):
+            name_grams = fuzzy_trigrams(name)
+            grams.extend(self.gram_ids.setdefault(gram, len(self.gram_ids)) for gram in name_grams)
+            self.gram_counts[code] = len(name_grams)
+        grams = np.asarray(grams, dtype=np.int32)
+        codes = np.repeat(np.arange(len(self.names), dtype=np.int32), self.gram_counts)
+        order = np.argsort(grams, kind='stable')
+        self.posting_codes = codes[order]
+        self.posting_offsets = np.concatenate(([0], np.cumsum(np.bincount(grams, minlength=len(self.gram_ids)))))
+
+    def postings(self, gram):
+        """Sorted name codes whose form contains a trigram."""
+        gram_id = self.gram_ids[gram]
+        return self.posting_codes[self.posting_offsets[gram_id]:self.posting_offsets[gram_id + 1]]
+
+    def jaccard(self, query, deadline):
+        """Trigram Jaccard similarity of query to every name; postings rarest first until deadline."""
+        query_grams = fuzzy_trigrams(query)
+        shared = np.zeros(len(self.names), dtype=np.int16)
+        postings = sorted((self.postings(gram) for gram in query_grams if gram in self.gram_ids), key=len)
+        for codes in postings:
+            shared[codes] += 1
+            if time.perf_counter() > deadline:
+                break
+        return shared / np.maximum(len(query_grams) + self.gram_counts - shared, 1)
+
+    def ratios(self, query, codes):
+        """difflib similarity of query to the given names."""
+        # difflib indexes its second sequence, so the query is indexed once for every name
+        matcher = difflib.SequenceMatcher(None, autojunk=False)
+        matcher.set_seq2(query)
+        ratios = np.empty(len(codes))
+        for i, name in enumerate(self.names[codes]):
+            matcher.set_seq1(name)
+            ratios[i] = matcher.ratio()
+        return ratios
+
+
+class FuzzyNames:
+    """
+    Trigram postings over every distinct name (SearchIndex.name_codes) in two
+    forms: in full, and with corporate suffixes stripped. A query is scored
+    against both and keeps the better, so "MICROSOFT" is not penalized for
+    "Corporation" while a typo in a typed suffix still finds the full name.
+    """
+
+    def __init__(self, unique_names):
+        full, normalized = zip(*map(fuzzy_forms, unique_names)) if len(unique_names) else ((), ())
+        self.forms = (TrigramPostings(full), TrigramPostings(normalized))
+
+    def __len__(self):
+        return len(self.forms[0].names)
+
+    def scores(self, query, deadline):
+        """Best trigram Jaccard similarity of query to each name over both forms."""
+        return np.maximum.reduce([postings.jaccard(form, deadline)
+                                  for postings, form in zip(self.forms, fuzzy_forms(query))])
+
+    def ratios(self, query, codes):
+        """Best difflib similarity of query to the given names over both forms."""
+        return np.maximum.reduce([postings.ratios(form, codes)
+                                  for postings, form in zip(self.forms, fuzzy_forms(query))])
+
+
+def first_rows(rows, limit):
+    """The `limit` smallest row positions of rows, ascending (O(k), not O(k log k))."""
+    if limit is not None and len(rows) > limit:
+        rows = np.partition(rows, limit - 1)[:limit]
+    return np.sort(rows)
+
+
+class SearchIndex:
+    """
+    Ticker / company-name search over a DataFrame with Symbol, Name and
+    Exchange columns.
+
+    `search()` returns row positions in the order the UIs have always shown:
+    exact symbol matches, then other symbols starting with the query, then
+    names containing the query, each group in DataFrame order.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        symbols = df['Symbol'].fillna('').astype(str).str.upper().to_numpy(dtype=str)
+        self.symbols = symbols
+
+        # Exchange of every row as a small integer code (-1 when missing)
+        codes, exchanges = pd.factorize(df['Exchange'].astype(object), sort=False)
+        self.exchange_rows = codes
+        self.exchange_ids = {exchange: code for code, exchange in enumerate(exchanges.tolist())}
+        # Dropdown choices for this list, computed once: [(code, display name), ...]
+        self.exchange_choices = sorted_exchange_choices(self.exchange_ids)
+
+        # Global partition: stable sort keeps rows with equal symbols in DataFrame order
+        order = np.argsort(symbols, kind='stable').astype(np.int32)
+        self.all = SymbolPartition(symbols[order], order)
+
+        # Per-exchange partitions: regroup the global order by exchange, again stably,
+        # so each exchange's slice is still sorted by (symbol, row)
+        by_exchange = order[np.argsort(codes[order], kind='stable')]
+        counts = np.bincount(codes[codes >= 0], minlength=len(exchanges))
+        offsets = np.concatenate(([0], np.cumsum(counts))) + np.count_nonzero(codes < 0)
+        by_exchange_symbols = symbols[by_exchange]
+        self.partitions = {}
+        for exchange, code in self.exchange_ids.items():
+            start, end = offsets[code], offsets[code + 1]
+            self.partitions[exchange] = SymbolPartition(by_exchange_symbols[start:end], by_exchange[start:end], code)
+
+        self.build_name_index(df['Name'])
+        # Trigram postings for fuzzy_search(), built here (on the loader thread) with everything else
+        self.fuzzy_names = FuzzyNames(self.unique_names)
+
+    def build_name_index(self, names):
+        """N-gram postings over upper-cased names: sorted row positions per n-gram."""
+        name_codes, unique_names = pd.factorize(names.fillna('').astype(str).str.upper(), sort=False)
+        self.name_codes = name_codes.astype(np.int32)
+        self.unique_names = unique_names.to_numpy(dtype=object)
+
+        # N-grams of each distinct name (cross-listings share a name), as CSR arrays
+        gram_ids = {}
+        name_grams = []
+        name_gram_counts = np.zeros(len(unique_names), dtype=np.int64)
+        for code, name in enumerate(self.unique_names):
+            grams = [gram_ids.setdefault(gram, len(gram_ids)) for gram in name_ngrams(name)]
+            name_grams.extend(grams)
+            name_gram_counts[code] = len(grams)
+        name_grams = np.asarray(name_grams, dtype=np.int32)
+        name_gram_offsets = np.concatenate(([0], np.cumsum(name_gram_counts)))
+
+        # Expand to (n-gram, row) pairs; rows come out ascending, and the stable
+        # sort by n-gram keeps every posting list sorted by row. Pair k reads
+        # name_grams[k + (offset of its row's name - first pair of its row)], built
+        # in place so only a few arrays of one entry per pair are alive at once
+        row_counts = name_gram_counts[self.name_codes]
+        row_starts = np.concatenate(([0], np.cumsum(row_counts)))[:-1]
+        gather = np.arange(row_counts.sum())
+        gather += np.repeat(name_gram_offsets[:-1][self.name_codes] - row_starts, row_counts)
+        grams = name_grams[gather]
+        del gather
+
+        order = np.argsort(grams, kind='stable')
+        self.posting_rows = np.repeat(np.arange(len(self.name_codes), dtype=np.int32), row_counts)[order]
+        self.posting_offsets = np.concatenate(([0], np.cumsum(np.bincount(grams, minlength=len(gram_ids)))))
+        self.gram_ids = gram_ids
+
+    def __len__(self):
+        return len(self.df)
+
+    def partition(self, exchange=None):
+        """Symbol partition for an exchange code (None / 'ALL' for every row)."""
+        if not exchange or exchange == 'ALL':
+            return self.all
+        return self.partitions.get(exchange)
+
+    def sample(self, exchange=None, count=10, rng=random):
+        """`count` random row positions from an exchange (or all rows) without building a DataFrame."""
+        partition = self.partition(exchange)
+        if partition is None:
+            return np.empty(0, dtype=np.int32)
+        rows = partition.positions
+        if len(rows) <= count:
+            return rows
+        return rows[rng.sample(range(len(rows)), count)]
+
+    def postings(self, gram):
+        """Sorted row positions whose name contains an n-gram."""
+        gram_id = self.gram_ids[gram]
+        return self.posting_rows[self.posting_offsets[gram_id]:self.posting_offsets[gram_id + 1]]
+
+    def name_candidates(self, query, partition):
+        """Rows that may contain query in their name, ascending."""
+        grams = query_ngrams(query)
+        if not grams:
+            # Too short for the index: every row is a candidate, verification stops early
+            return partition.positions
+
+        if any(gram not in self.gram_ids for gram in grams):
+            return np.empty(0, dtype=np.int32)
+        # Intersect the shortest posting lists first
+        postings = sorted((self.postings(gram) for gram in grams), key=len)
+        candidates = postings[0]
+        for rows in postings[1:]:
+            if not len(candidates):
+                break
+            candidates = np.intersect1d(candidates, rows, assume_unique=True)
+
+        if partition.exchange_id is not None:
+            candidates = candidates[self.exchange_rows[candidates] == partition.exchange_id]
+        return candidates
+
+    def verify_names(self, rows, query):
+        """Rows whose name contains query and whose symbol does not start with it."""
+        codes, inverse = np.unique(self.name_codes[rows], return_inverse=True)
+        contains = np.fromiter((query in name for name in self.unique_names[codes]), dtype=bool, count=len(codes))
+        keep = contains[inverse] & ~np.char.startswith(self.symbols[rows], query)
+        return rows[keep]
+
+    def name_matches(self, query, partition, limit=None):
+        """Rows (in DataFrame order) whose name contains query, excluding symbol-prefix matches."""
+        candidates = self.name_candidates(query, partition)
+        found = []
+        count = 0
+        for start in range(0, len(candidates), VERIFY_CHUNK):
+            rows = self.verify_names(candidates[start:start + VERIFY_CHUNK], query)
+            found.append(rows)
+            count += len(rows)
+            if limit is not None and count >= limit:
+                break
+        if not found:
+            return np.empty(0, dtype=np.int32)
+        results = np.concatenate(found)
+        return results[:limit] if limit is not None else results
+
+    def candidates(self, query, exchange=None):
+        """
+        Superset of the rows matching query (symbol prefix or name n-grams),
+        ascending. None when the query is too short to narrow anything.
+        """
+        partition = self.partition(exchange)
+        if partition is None or not query_ngrams(query):
+            return None
+        lo, _, hi = partition.ranges(query)
+        return np.union1d(partition.rows[lo:hi], self.name_candidates(query, partition))
+
+    def narrow(self, query, candidates, limit=50):
+        """
+        Rank query within the candidates of a query it extends.
+        Returns (ranked rows as search() would, every matching candidate ascending).
+        """
+        symbols = self.symbols[candidates]
+        exact = symbols == query
+        prefix = np.char.startswith(symbols, query)
+        others = candidates[~prefix]
+        codes, inverse = np.unique(self.name_codes[others], return_inverse=True)
+        contains = np.fromiter((query in name for name in self.unique_names[codes]), dtype=bool, count=len(codes))
+        name_rows = others[contains[inverse]]
+
+        ranked = np.concatenate((candidates[exact], candidates[prefix & ~exact], name_rows))
+        matched = prefix.copy()
+        matched[~prefix] = contains[inverse]
+        return (ranked[:limit] if limit is not None else ranked), candidates[matched]
+
+    def search_incremental(self, query, exchange, context, version=0, limit=50):
+        """
+        search() that reuses a client's previous candidates when query extends
+        its previous query, so each keystroke costs O(previous matches).
+        """
+        candidates = context.candidates_for(version, exchange, query)
+        if candidates is not None:
+            rows, matched = self.narrow(query, candidates, limit)
+        else:
+            rows = self.search(query, exchange, limit)
+            matched = self.candidates(query, exchange)
+        if matched is not None and len(matched) > MAX_CONTEXT_ROWS:
+            matched = None
+        context.update(version, exchange, query, matched)
+        return rows
+
+    def fuzzy_search(self, query, exchange=None, limit=50, budget_ms=FUZZY_BUDGET_MS):
+        """
+        Typo-tolerant search: exact symbol matches, then names ranked by trigram
+        Jaccard similarity to query (see FuzzyNames). The best-scoring names are
+        re-ranked by adding difflib similarity; ties keep DataFrame order.
+
+        Postings are added rarest first and scoring stops once budget_ms is
+        spent, so a query made of very common trigrams stays bounded.
+        """
+        partition = self.partition(exchange)
+        if partition is None or not query:
+            return np.empty(0, dtype=np.int32)
+        query = query[:FUZZY_MAX_QUERY]
+        if len(query) < 3:
+            return self.search(query, exchange, limit)
+
+        fuzzy = self.fuzzy_names
+        code_scores = fuzzy.scores(query, time.perf_counter() + budget_ms / 1000)
+
+        lo, mid, _ = partition.ranges(query)
+        exact = partition.rows[lo:mid]
+        matched = code_scores[self.name_codes] >= FUZZY_MIN_SCORE
+        matched[exact] = False
+        rows = np.flatnonzero(matched)
+        if partition.exchange_id is not None:
+            rows = rows[self.exchange_rows[rows] == partition.exchange_id]
+
+        # The distinct names with the best trigram scores are re-ranked by adding
+        # difflib similarity, which rewards the right letters in roughly the right
+        # order; every other name follows them, still by trigram score
+        wanted = max(limit - len(exact), 0) if limit is not None else len(rows)
+        if not wanted or not len(rows):
+            return exact[:limit]
+        present = np.zeros(len(fuzzy), dtype=bool)
+        present[self.name_codes[rows]] = True
+        codes = np.flatnonzero(present)
+        if len(codes) > FUZZY_RERANK_POOL:
+            codes = codes[np.argpartition(-code_scores[codes], FUZZY_RERANK_POOL - 1)[:FUZZY_RERANK_POOL]]
+        ranking = code_scores - 2
+        ranking[codes] = code_scores[codes] + fuzzy.ratios(query, codes)
+        row_ranking = ranking[self.name_codes[rows]]
+
+        # Top-k without sorting every hit, then order the k by (-ranking, row)
+        if len(rows) > wanted:
+            top = np.argpartition(-row_ranking, wanted - 1)[:wanted]
+            rows, row_ranking = rows[top], row_ranking[top]
+        ranked = rows[np.lexsort((rows, -row_ranking))]
+        results = np.concatenate((exact, ranked))
+        return results[:limit] if limit is not None else results
+
+    def search(self, query, exchange=None, limit=50):
+        """Row positions matching an upper-cased, stripped query, best matches first."""
+        partition = self.partition(exchange)
+        if partition is None or not query:
+            return np.empty(0, dtype=np.int32)
+
+        lo, mid, hi = partition.ranges(query)
+        exact = partition.rows[lo:mid]
+        starts = first_rows(partition.rows[mid:hi], limit)
+        results = np.concatenate((exact, starts))
+        if limit is not None and len(results) >= limit:
+            return results[:limit]
+
+        needed = limit - len(results) if limit is not None else None
+        return np.concatenate((results, self.name_matches(query, partition, needed)))
+
+
+class ResultSerializer:
+    """
+    JSON encoding of search results straight from column arrays.
+
+    Each row's {"exchange", "name", "symbol"} object is serialized once, on
+    first use, and reused for every later response containing that row.
+    Output matches jsonify (sorted keys, compact separators, ASCII escapes).
+    """
+
+    NAME_LENGTH = 60
+
+    def __init__(self, df):
+        self.symbols = df['Symbol'].astype(object).to_numpy()
+        self.full_names = df['Name'].fillna('').astype(str).to_numpy(dtype=object)
+        self.names = df['Name'].fillna('').astype(str).str.slice(0, self.NAME_LENGTH).to_numpy(dtype=object)
+        self.exchanges = df['Exchange'].astype(object).to_numpy()
+        self.fragments = [None] * len(df)
+
+    def fragment(self, row):
+        fragment = self.fragments[row]
+        if fragment is None:
+            fragment = self.fragments[row] = json.dumps(
+                {'exchange': self.exchanges[row], 'name': self.names[row], 'symbol': self.symbols[row]},
+                separators=(',', ':')
+            )
+        return fragment
+
+    def rows(self, rows):
+        """[{"exchange": ..., "name": ..., "symbol": ...}, ...]"""
+        return '[' + ','.join([self.fragment(row) for row in rows.tolist()]) + ']'
+
+    def columns(self, rows):
+        """{"exchange": [...], "name": [...], "symbol": [...]} - compact format=columns body."""
+        return json.dumps({
+            'exchange': self.exchanges[rows].tolist(),
+            'name': self.names[rows].tolist(),
+            'symbol': self.symbols[rows].tolist(),
+        }, separators=(',', ':'))
+
+    def bundle(self):
+        """
+        Whole-universe JSON for client-side search, rows in DataFrame order:
+        {"exchanges": [code, ...], "exchange": [index into exchanges per row], "symbol": [...], "name": [...]}.
+        Names are sent in full so browser substring matches agree with the server.
+        """
+        codes, exchanges = pd.factorize(self.exchanges, sort=False)
+        return json.dumps({
+            'exchanges': exchanges.tolist(),
+            'exchange': codes.tolist(),
+            'symbol': self.symbols.tolist(),
+            'name': self.full_names.tolist(),
+        }, separators=(',', ':'))
+
+    def encode(self, rows, response_format='rows'):
+        return self.columns(rows) if response_format == 'columns' else self.rows(rows)
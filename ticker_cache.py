@@ -0,0 +1,146 @@
+"""
+Persistent cache of resolved AlphaSpread listings.
+
+Maps (ticker, company) to the slug and exchange that had financial data,
+so a repeat download skips the alternative-listing search entirely.
+Listings the site definitely reported as missing (HTTP 4xx, redirect,
+not-found page) are remembered too, for NEGATIVE_TTL seconds, and left out
+of later searches. A cached listing that stops loading is invalidated by
+the caller and searched for again.
+
+Stored as JSON next to the universe cache (FINDATA_CACHE_DIR).
+"""
+import os
+import json
+import time
+import threading
+
+from findata_core import normalize_company_name, find_valid_ticker
+from universe import cache_path, _write_atomic
+
+
+TICKER_CACHE_FILENAME = 'tickers.json'
+# Listings without data are retried after this long (they may gain coverage)
+NEGATIVE_TTL = int(os.environ.get('FINDATA_NEGATIVE_TTL') or 7 * 24 * 3600)
+# Alternatives probed per download (after dropping listings known to be missing)
+MAX_ALTERNATIVES = 10
+
+
+def company_key(ticker, company_name):
+    return f"{str(ticker).upper()}|{normalize_company_name(company_name)}"
+
+
+def listing_key(slug, exchange):
+    return f"{exchange}/{slug}"
+
+
+class TickerCache:
+    """Resolved listings per company plus expiring negative entries per listing."""
+
+    def __init__(self, cache_dir=None, negative_ttl=NEGATIVE_TTL):
+        self.cache_dir = cache_dir
+        self.negative_ttl = negative_ttl
+        self._data = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """Entries from disk (read once, under the lock)."""
+        if self._data is None:
+            try:
+                with open(cache_path(TICKER_CACHE_FILENAME, self.cache_dir), 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+            self._data = {'resolved': data.get('resolved', {}), 'missing': data.get('missing', {})}
+        return self._data
+
+    def _save(self):
+        try:
+            _write_atomic(cache_path(TICKER_CACHE_FILENAME, self.cache_dir),
+                          json.dumps(self._data, indent=2, sort_keys=True).encode('utf-8'))
+        except OSError as e:
+            print(f"Could not write ticker cache: {e}")
+
+    def lookup(self, ticker, company_name):
+        """Cached (slug, exchange) for a company, or None."""
+        with self._lock:
+            entry = self._load()['resolved'].get(company_key(ticker, company_name))
+        return (entry['slug'], entry['exchange']) if entry else None
+
+    def store(self, ticker, company_name, slug, exchange):
+        with self._lock:
+            data = self._load()
+            data['resolved'][company_key(ticker, company_name)] = {
+                'slug': slug, 'exchange': exchange, 'resolved_at': time.time()}
+            data['missing'].pop(listing_key(slug, exchange), None)
+            self._save()
+
+    def invalidate(self, ticker, company_name):
+        """Forget a company's listing (it stopped serving data)."""
+        with self._lock:
+            if self._load()['resolved'].pop(company_key(ticker, company_name), None) is not None:
+                self._save()
+
+    def record_missing(self, listings):
+        """Remember (slug, exchange) listings that had no data."""
+        if not listings:
+            return
+        expires = time.time() + self.negative_ttl
+        with self._lock:
+            missing = self._load()['missing']
+            for slug, exchange in listings:
+                missing[listing_key(slug, exchange)] = expires
+            self._save()
+
+    def without_missing(self, alternatives):
+        """Alternatives minus listings with a live negative entry (expired entries are dropped)."""
+        now = time.time()
+        with self._lock:
+            missing = self._load()['missing']
+            expired = [key for key, expires in missing.items() if expires <= now]
+            for key in expired:
+                del missing[key]
+            if expired:
+                self._save()
+            return [alt for alt in alternatives if listing_key(*alt) not in missing]
+
+
+def resolve_listing(driver, ticker, company_name, alternatives, on_probe=None, use_cache=True, cache=None,
+                    timer=None, probe=find_valid_ticker, record_missing=True):
+    """
+    (slug, exchange, from_cache) for a company, or None if no listing has data.
+
+    A cached answer is returned without touching the browser. Otherwise the
+    alternatives not known to be missing are probed with `probe`
+    (find_valid_ticker on the browser `driver`, or the HTTP backend's
+    equivalent on its client) and the outcome is remembered. Only listings
+    the site positively reported as missing are recorded; undecided probes
+    (timeouts, challenge pages, a table that never showed) are not, since
+    a slow or guarded site would otherwise blacklist every listing.
+    Callers whose probes see the site differently from the browser (the
+    HTTP backend) pass record_missing=False.
+    """
+    cache = cache or ticker_cache
+    if use_cache:
+        cached = cache.lookup(ticker, company_name)
+        if cached:
+            return cached + (True,)
+
+    candidates = cache.without_missing(alternatives)[:MAX_ALTERNATIVES]
+    missing = []
+
+    def on_miss(idx, slug, exchange, outcome):
+        if outcome == 'missing':
+            missing.append((slug, exchange))
+
+    found = probe(driver, candidates, on_probe=on_probe, on_miss=on_miss, timer=timer)
+    if record_missing:
+        cache.record_missing(missing)
+    if found is None:
+        return None
+    cache.store(ticker, company_name, *found)
+    return found + (False,)
+
+
+# Shared by the web server and the Tk app
+ticker_cache = TickerCache()
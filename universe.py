@@ -0,0 +1,535 @@
+"""
+Exchange universe loading with a persistent on-disk cache.
+
+The all-exchanges CSV is kept in a local cache directory together with a
+parsed pickle snapshot, so startup is served from disk. The network copy is
+revalidated with ETag / Last-Modified headers in the background and the
+cache is only rewritten when the server reports a change.
+"""
+import os
+import io
+import json
+import gzip
+import hashlib
+import time
+import threading
+import urllib.request
+import urllib.error
+from collections.abc import Mapping
+
+# pandas / numpy are imported inside the functions that need them so that
+# importing this module (and the web server) stays cheap
+from findata_core import EXCHANGE_MAPPING, normalize_company_names
+
+
+UNIVERSE_URL = "https://raw.githubusercontent.com/gosho-st/exchanges/refs/heads/main/all_exchanges_stocks_20251204_201504.csv"
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36'
+
+# Cache location (override with FINDATA_CACHE_DIR)
+CACHE_DIR = os.environ.get('FINDATA_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.findata', 'cache')
+CSV_FILENAME = 'universe.csv'
+SNAPSHOT_FILENAME = 'universe.pkl'
+META_FILENAME = 'universe.json'
+
+# Bump when the parsed snapshot layout changes so stale pickles are rebuilt
+SNAPSHOT_VERSION = 2
+
+
+def cache_path(filename, cache_dir=None):
+    """Return the full path of a file inside the cache directory."""
+    return os.path.join(cache_dir or CACHE_DIR, filename)
+
+
+def _write_atomic(path, data):
+    """Write bytes to path via a temp file so readers never see partial files."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def read_cache_meta(cache_dir=None):
+    """Read the cache metadata (etag, last_modified, fetched_at)."""
+    try:
+        with open(cache_path(META_FILENAME, cache_dir), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def parse_universe_csv(csv_bytes):
+    """Parse the raw all-exchanges CSV into the normalized universe DataFrame."""
+    import pandas as pd
+
+    df = pd.read_csv(io.BytesIO(csv_bytes))
+
+    # Columns: symbol, name, Exchange, Exchange Name
+    df = df.rename(columns={
+        'symbol': 'Symbol',
+        'name': 'Name',
+        'Exchange': 'ExchangeCode',
+        'Exchange Name': 'ExchangeName'
+    })
+
+    df['Symbol'] = df['Symbol'].astype(str).str.strip()
+
+    # Cross-listings repeat the same company name: keep one string object per distinct name
+    shared = {}
+    df['Name'] = pd.Series(
+        [shared.setdefault(name, name) for name in df['Name'].fillna('').tolist()],
+        index=df.index, dtype=object
+    )
+
+    # Exchange columns have a few hundred distinct values across 50k+ rows
+    for column in ('ExchangeCode', 'ExchangeName'):
+        if column in df:
+            df[column] = df[column].astype('category')
+    return df
+
+
+def fetch_universe_csv(url=UNIVERSE_URL, timeout=30, etag=None, last_modified=None):
+    """
+    Download the universe CSV, conditionally if validators are given.
+    Returns (csv_bytes, headers); csv_bytes is None when the server answers 304.
+    """
+    headers = {'User-Agent': USER_AGENT}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+
+    req = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            return response.read(), response.headers
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None, e.headers
+        raise
+
+
+def load_cached_universe(cache_dir=None):
+    """
+    Load the universe from the on-disk cache.
+    Prefers the pickle snapshot and falls back to re-parsing the cached CSV.
+    Returns None if nothing usable is cached.
+    """
+    import pandas as pd
+
+    meta = read_cache_meta(cache_dir)
+    snapshot_path = cache_path(SNAPSHOT_FILENAME, cache_dir)
+    csv_path = cache_path(CSV_FILENAME, cache_dir)
+
+    if meta.get('snapshot_version') == SNAPSHOT_VERSION and os.path.exists(snapshot_path):
+        try:
+            return stamp_universe(pd.read_pickle(snapshot_path), meta.get('fetched_at'))
+        except Exception as e:
+            print(f"Universe snapshot unreadable, re-parsing CSV: {e}")
+
+    if not os.path.exists(csv_path):
+        return None
+
+    try:
+        with open(csv_path, 'rb') as f:
+            df = parse_universe_csv(f.read())
+    except Exception as e:
+        print(f"Cached universe CSV unreadable: {e}")
+        return None
+
+    # Rebuild the snapshot for the next start
+    try:
+        _write_snapshot(df, meta, cache_dir)
+    except Exception as e:
+        print(f"Could not write universe snapshot: {e}")
+    return stamp_universe(df, meta.get('fetched_at'))
+
+
+def stamp_universe(df, fetched_at):
+    """Record on df when its CSV was downloaded, for universe_fetched_at()."""
+    df.attrs = dict(df.attrs, fetched_at=fetched_at or 0.0)
+    return df
+
+
+def universe_fetched_at(df):
+    """
+    When the CSV behind a universe DataFrame was downloaded (0 if unknown).
+    The initial load and a background refresh finish in either order; a
+    universe older than the one already shown must not replace it.
+    """
+    return df.attrs.get('fetched_at') or 0.0
+
+
+def _write_snapshot(df, meta, cache_dir=None):
+    """Persist the parsed DataFrame snapshot and record its version in the metadata."""
+    buffer = io.BytesIO()
+    df.to_pickle(buffer, compression=None)
+    _write_atomic(cache_path(SNAPSHOT_FILENAME, cache_dir), buffer.getvalue())
+    meta = dict(meta, snapshot_version=SNAPSHOT_VERSION)
+    _write_atomic(cache_path(META_FILENAME, cache_dir), json.dumps(meta, indent=2).encode('utf-8'))
+
+
+def refresh_universe(url=UNIVERSE_URL, timeout=30, cache_dir=None, force=False):
+    """
+    Revalidate the cached CSV against the network copy.
+    Returns the freshly parsed DataFrame if the CSV changed, otherwise None.
+    Raises on network errors so callers can decide how to fall back.
+    """
+    meta = {} if force else read_cache_meta(cache_dir)
+    has_csv = os.path.exists(cache_path(CSV_FILENAME, cache_dir))
+
+    csv_bytes, headers = fetch_universe_csv(
+        url, timeout=timeout,
+        etag=meta.get('etag') if has_csv else None,
+        last_modified=meta.get('last_modified') if has_csv else None
+    )
+
+    if csv_bytes is None:
+        # 304 Not Modified - just record when we last checked
+        meta['checked_at'] = time.time()
+        _write_atomic(cache_path(META_FILENAME, cache_dir), json.dumps(meta, indent=2).encode('utf-8'))
+        return None
+
+    # Parse before touching the cache so a bad download never replaces a good one
+    df = parse_universe_csv(csv_bytes)
+
+    _write_atomic(cache_path(CSV_FILENAME, cache_dir), csv_bytes)
+    new_meta = {
+        'url': url,
+        'etag': headers.get('ETag'),
+        'last_modified': headers.get('Last-Modified'),
+        'fetched_at': time.time(),
+        'checked_at': time.time(),
+        'rows': len(df),
+    }
+    _write_snapshot(df, new_meta, cache_dir)
+    return stamp_universe(df, new_meta['fetched_at'])
+
+
+def load_universe(on_refresh=None, background_refresh=True, url=UNIVERSE_URL, timeout=30, cache_dir=None):
+    """
+    Load the universe DataFrame, serving from the on-disk cache when possible.
+
+    With a warm cache the cached copy is returned immediately and the network
+    copy is revalidated on a daemon thread; if it changed, on_refresh(df) is
+    called with the new DataFrame. With a cold cache the CSV is downloaded
+    synchronously. Returns None only when there is neither a cache nor network.
+    """
+    df = load_cached_universe(cache_dir)
+
+    if df is not None:
+        print(f"Loaded {len(df)} listings from cache ({cache_dir or CACHE_DIR})")
+        if background_refresh:
+            start_background_refresh(on_refresh, url=url, timeout=timeout, cache_dir=cache_dir)
+        return df
+
+    try:
+        return refresh_universe(url=url, timeout=timeout, cache_dir=cache_dir, force=True)
+    except Exception as e:
+        print(f"Failed to download universe and no cache available: {e}")
+        return None
+
+
+def start_background_refresh(on_refresh=None, url=UNIVERSE_URL, timeout=30, cache_dir=None):
+    """Revalidate the cached universe on a daemon thread."""
+    def worker():
+        try:
+            df = refresh_universe(url=url, timeout=timeout, cache_dir=cache_dir)
+        except Exception as e:
+            print(f"Universe refresh failed, keeping cached copy: {e}")
+            return
+        if df is None:
+            return
+        print(f"Universe updated: {len(df)} listings")
+        if on_refresh:
+            try:
+                on_refresh(df)
+            except Exception as e:
+                print(f"Error applying refreshed universe: {e}")
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    return thread
+
+
+def add_exchange_columns(df):
+    """Add the display exchange code and the AlphaSpread URL exchange columns (categorical)."""
+    codes = df['ExchangeCode'].astype(object).fillna('').astype(str)
+    df['Exchange'] = codes.astype('category')  # Original code for display
+    # Mapped exchange for AlphaSpread URLs, lowercased code otherwise, 'nyse' when blank
+    fallback = codes.str.lower().where(codes != '', 'nyse')
+    df['AlphaSpreadExchange'] = codes.map(EXCHANGE_MAPPING).fillna(fallback).astype('category')
+    return df
+
+
+class CompanyTickers(Mapping):
+    """Read-only view: normalized company name -> list of listing dicts (built on access)."""
+
+    def __init__(self, index):
+        self._index = index
+
+    def __getitem__(self, normalized_name):
+        return [self._index.listing(row) for row in self._index.group_rows(normalized_name)]
+
+    def __contains__(self, normalized_name):
+        return normalized_name in self._index.group_ids
+
+    def __iter__(self):
+        return iter(self._index.group_ids)
+
+    def __len__(self):
+        return len(self._index.group_ids)
+
+
+class TickerToCompany(Mapping):
+    """Read-only view: upper-case symbol -> company dict (last listing wins, built on access)."""
+
+    def __init__(self, index):
+        self._index = index
+
+    def __getitem__(self, symbol):
+        return self._index.company(self._index.symbol_rows[symbol])
+
+    def __contains__(self, symbol):
+        return symbol in self._index.symbol_rows
+
+    def __iter__(self):
+        return iter(self._index.symbol_rows)
+
+    def __len__(self):
+        return len(self._index.symbol_rows)
+
+
+class UniverseIndex:
+    """
+    Compact snapshot of a loaded universe, published as one object.
+
+    Listings live once, in the DataFrame columns. Lookups hold integer row
+    references: listings are grouped by normalized name as one row-order
+    array plus offsets, and symbols map to their row. `company_tickers` and
+    `ticker_to_company` are Mapping views with the same API as the old
+    dicts, building the per-listing dicts only on access. `search` is the
+    SearchIndex answering /api/search and `serializer` encodes its results;
+    both are built on first access (the Tk app indexes its own display
+    list instead), or up front with searchable=True for the web server.
+    """
+
+    def __init__(self, df, version=0, searchable=False):
+        import numpy as np
+        import pandas as pd
+
+        self.df = df
+        self.version = version
+
+        self.symbols = df['Symbol'].to_numpy()
+        self.names = df['Name'].to_numpy()
+        exchanges = df['AlphaSpreadExchange'].cat
+        self.exchange_codes = exchanges.codes.to_numpy()
+        self.exchange_categories = exchanges.categories.tolist()
+
+        # Group rows by normalized name: rows of group g are group_order[offsets[g]:offsets[g + 1]]
+        codes, uniques = pd.factorize(normalize_company_names(df['Name']), sort=False)
+        self.name_codes = codes.astype(np.int32)
+        self.normalized_names = uniques
+        self.group_order = np.argsort(codes, kind='stable').astype(np.int32)
+        self.group_offsets = np.zeros(len(uniques) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=len(uniques)), out=self.group_offsets[1:])
+        self.group_ids = {name: group for group, name in enumerate(uniques.tolist()) if name}
+
+        # Upper-case symbol -> row (later rows overwrite earlier ones)
+        self.symbol_rows = dict(zip(df['Symbol'].str.upper().tolist(), range(len(df))))
+
+        self.company_tickers = CompanyTickers(self)
+        self.ticker_to_company = TickerToCompany(self)
+
+        self._search = None
+        self._serializer = None
+        if searchable:
+            from search_index import SearchIndex, ResultSerializer
+            self._search = SearchIndex(df)
+            self._serializer = ResultSerializer(df)
+        self._exchanges = None
+        self._bundle = None
+
+    @classmethod
+    def from_dataframe(cls, df, version=0, searchable=False):
+        """Build the index (exchange columns and ticker maps) for a universe DataFrame."""
+        add_exchange_columns(df)
+        return cls(df, version=version, searchable=searchable)
+
+    @classmethod
+    def searchable_from_dataframe(cls, df):
+        """from_dataframe() with the typeahead structures built up front (web server)."""
+        return cls.from_dataframe(df, searchable=True)
+
+    @property
+    def search(self):
+        """Sorted symbol arrays (global and per exchange) and name n-grams for the typeahead."""
+        if self._search is None:
+            from search_index import SearchIndex
+            self._search = SearchIndex(self.df)
+        return self._search
+
+    @property
+    def serializer(self):
+        """JSON encoder for search results."""
+        if self._serializer is None:
+            from search_index import ResultSerializer
+            self._serializer = ResultSerializer(self.df)
+        return self._serializer
+
+    @property
+    def exchanges_json(self):
+        """/api/exchanges body, fixed for the lifetime of this universe."""
+        return self.exchanges_response()[0]
+
+    @property
+    def exchanges_etag(self):
+        """Strong ETag of exchanges_json."""
+        return self.exchanges_response()[1]
+
+    def exchanges_response(self):
+        """(/api/exchanges body, its ETag), built on first use."""
+        if self._exchanges is None:
+            body = json.dumps(
+                [{'code': 'ALL', 'name': 'All Exchanges'}] +
+                [{'code': code, 'name': name} for code, name in self.search.exchange_choices],
+                separators=(',', ':')
+            )
+            self._exchanges = (body, hashlib.sha1(body.encode('utf-8')).hexdigest())
+        return self._exchanges
+
+    def __len__(self):
+        return len(self.df)
+
+    def bundle(self):
+        """
+        (gzip bytes, version) of the client-side search bundle. Built on first
+        request only, since the Tk app never needs it; the version is a content
+        hash, so unchanged refreshes keep the browser's cached copy valid.
+        """
+        if self._bundle is None:
+            body = self.serializer.bundle().encode('utf-8')
+            self._bundle = (gzip.compress(body, compresslevel=6), hashlib.sha1(body).hexdigest()[:16])
+        return self._bundle
+
+    def group_rows(self, normalized_name):
+        """Row positions of all listings sharing a normalized name (KeyError if unknown)."""
+        group = self.group_ids[normalized_name]
+        return self.group_order[self.group_offsets[group]:self.group_offsets[group + 1]].tolist()
+
+    def exchange(self, row):
+        """AlphaSpread exchange of a row."""
+        return self.exchange_categories[self.exchange_codes[row]]
+
+    def listing(self, row):
+        """Listing dict for a row, as stored in company_tickers."""
+        return {
+            'symbol': self.symbols[row],
+            'exchange': self.exchange(row),
+            'original_name': self.names[row]
+        }
+
+    def company(self, row):
+        """Company dict for a row, as stored in ticker_to_company."""
+        return {
+            'name': self.names[row],
+            'normalized_name': self.normalized_names[self.name_codes[row]],
+            'exchange': self.exchange(row)
+        }
+
+
+class UniverseLoader:
+    """
+    Loads the universe on a background thread and publishes the built result.
+
+    `build(df)` turns the raw universe DataFrame into whatever the app serves
+    (a UniverseIndex by default). The result replaces `current` in a single
+    assignment, so readers always see either the old or the new universe,
+    never a mix. Background cache refreshes are published the same way, and
+    whichever of the two finishes last, the most recently downloaded
+    universe stays published.
+    """
+
+    def __init__(self, build=None, on_ready=None, **load_kwargs):
+        self.build = build or UniverseIndex.from_dataframe
+        self.on_ready = on_ready
+        self.load_kwargs = load_kwargs
+        self.current = None
+        self.version = 0
+        self.fetched_at = 0.0  # universe_fetched_at() of `current`
+        self.status = 'idle'
+        self.error = None
+        self.loaded_at = None
+        self.ready = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """Start loading on a daemon thread (no-op if already started)."""
+        with self._lock:
+            if self._thread is not None:
+                return self._thread
+            self.status = 'loading'
+            self._thread = threading.Thread(target=self.load, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def load(self):
+        """Load synchronously. Returns True when a universe was published."""
+        self.status = 'loading'
+        started = time.perf_counter()
+        try:
+            df = load_universe(on_refresh=self.publish, **self.load_kwargs)
+            if df is None:
+                raise Exception("no cached universe and the download failed")
+            self.publish(df)
+        except Exception as e:
+            print(f"Error loading companies: {e}")
+            self.error = str(e)
+            if self.current is None:
+                self.status = 'error'
+            return False
+        print(f"Universe ready in {time.perf_counter() - started:.2f}s")
+        return True
+
+    def publish(self, df):
+        """
+        Build and atomically swap in a new universe. Returns False (and keeps
+        the current one) if df was downloaded before the published universe.
+        """
+        fetched_at = universe_fetched_at(df)
+        with self._lock:
+            if self.current is not None and fetched_at < self.fetched_at:
+                print("Ignoring a universe older than the one already published")
+                return False
+            version = self.version + 1
+            built = self.build(df)
+            if isinstance(built, UniverseIndex):
+                built.version = version
+            self.current = built
+            self.version = version
+            self.fetched_at = fetched_at
+            self.status = 'ready'
+            self.error = None
+            self.loaded_at = time.time()
+        self.ready.set()
+        if self.on_ready:
+            self.on_ready(built)
+        return True
+
+    def wait(self, timeout=None):
+        """Block until a universe is published (or timeout). Returns True when ready."""
+        return self.ready.wait(timeout)
+
+    def state(self):
+        """Readiness state for status endpoints."""
+        current = self.current
+        return {
+            'status': self.status,
+            'ready': current is not None,
+            'version': self.version,
+            'listings': len(current) if current is not None else 0,
+            'loaded_at': self.loaded_at,
+            'error': self.error,
+        }
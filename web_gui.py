@@ -1,28 +1,24 @@
 from flask import Flask, render_template, jsonify, request
 from flask_cors import CORS
-import pandas as pd
 import threading
 import os
+import gzip
 import time
 from datetime import datetime as dt
 import random
-from collections import defaultdict
+import secrets
 import webbrowser
 
-# Import the scraping logic from the original file
-from financial_data_gui import (
-    EXCHANGE_MAPPING, EXCHANGE_DISPLAY_NAMES, EXCHANGE_SORT_ORDER,
+# Import the scraping logic from the GUI-free core (selenium/pandas load lazily on first download)
+from findata_core import (
     CURRENCY_SYMBOLS, get_currency_symbol, normalize_company_name,
-    normalize_ticker_for_alphaspread
+    normalize_ticker_for_alphaspread, open_statement_tabs, FinancialDataExporter
 )
-
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from universe import UniverseIndex, UniverseLoader
+from search_cache import SearchCache, SearchSessions
+from driver_pool import driver_pool
+from ticker_cache import ticker_cache, resolve_listing
+from http_backend import FETCH_BACKEND, http_client, download_over_http, fetch_revenue_breakdown_http
 
 # Get the directory where this script is located (for proper path resolution)
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -42,76 +38,42 @@ scraper_state = {
     'error': None
 }
 
-companies_df = None
-company_tickers = defaultdict(list)
-ticker_to_company = {}
+# Serialized /api/search responses for the current universe version
+search_cache = SearchCache(maxsize=2048)
+
+# Per-browser typeahead contexts (keyed by the search_session cookie set on page load)
+SEARCH_SESSION_COOKIE = 'search_session'
+search_sessions = SearchSessions(maxsize=512)
+
+# Universe is loaded in the background; handlers read universe_loader.current.
+# Publishing a new universe (startup or background refresh) empties the search cache.
+universe_loader = UniverseLoader(
+    build=UniverseIndex.searchable_from_dataframe,
+    on_ready=lambda universe: search_cache.invalidate(universe.version)
+)
 
 
 def load_companies():
-    """Load company data from GitHub CSV."""
-    global companies_df, company_tickers, ticker_to_company
-    
-    import urllib.request
-    import io
-    
-    url = "https://raw.githubusercontent.com/gosho-st/exchanges/refs/heads/main/all_exchanges_stocks_20251204_201504.csv"
-    
-    try:
-        req = urllib.request.Request(
-            url, 
-            headers={'User-Agent': 'Mozilla/5.0'}
-        )
-        with urllib.request.urlopen(req, timeout=30) as response:
-            csv_data = response.read().decode('utf-8')
-        
-        df = pd.read_csv(io.StringIO(csv_data))
-        df = df.rename(columns={
-            'symbol': 'Symbol',
-            'name': 'Name',
-            'Exchange': 'ExchangeCode',
-            'Exchange Name': 'ExchangeName'
-        })
-        
-        df['Symbol'] = df['Symbol'].astype(str).str.strip()
-        df['Name'] = df['Name'].fillna('')
-        df['Exchange'] = df['ExchangeCode'].fillna('')
-        df['AlphaSpreadExchange'] = df['ExchangeCode'].map(
-            lambda x: EXCHANGE_MAPPING.get(x, x.lower() if x else 'nyse')
-        )
-        
-        # Build ticker mappings
-        for _, row in df.iterrows():
-            symbol = row['Symbol']
-            name = row['Name']
-            exchange = row['AlphaSpreadExchange']
-            normalized_name = normalize_company_name(name)
-            
-            ticker_info = {
-                'symbol': symbol,
-                'exchange': exchange,
-                'original_name': name
-            }
-            
-            if normalized_name:
-                company_tickers[normalized_name].append(ticker_info)
-            
-            ticker_to_company[symbol.upper()] = {
-                'name': name,
-                'normalized_name': normalized_name,
-                'exchange': exchange
-            }
-        
-        companies_df = df
-        print(f"Loaded {len(df)} companies")
-        return True
-    except Exception as e:
-        print(f"Error loading companies: {e}")
-        return False
+    """Load company data synchronously (cache first, GitHub refresh in the background)."""
+    return universe_loader.load()
+
+
+def universe_not_ready():
+    """503 response used while the company universe is still loading."""
+    state = universe_loader.state()
+    message = 'Company list is still loading' if state['status'] != 'error' else f"Company list unavailable: {state['error']}"
+    response = jsonify(dict(state, message=message))
+    response.status_code = 503
+    response.headers['Retry-After'] = '1'
+    return response
 
 
 @app.route('/')
 def index():
-    return render_template('index.html')
+    response = app.make_response(render_template('index.html'))
+    if SEARCH_SESSION_COOKIE not in request.cookies:
+        response.set_cookie(SEARCH_SESSION_COOKIE, secrets.token_hex(8), httponly=True, samesite='Lax')
+    return response
 
 
 @app.route('/support')
@@ -119,72 +81,101 @@ def support():
     return render_template('support.html')
 
 
+@app.route('/api/universe')
+def get_universe_state():
+    """Get universe readiness (loading / ready / error) and the client-side search bundle URL."""
+    state = universe_loader.state()
+    universe = universe_loader.current
+    if universe is not None:
+        state['bundle_url'] = f"/api/universe/bundle?v={universe.bundle()[1]}"
+    return jsonify(state)
+
+
+@app.route('/api/universe/bundle')
+def get_universe_bundle():
+    """Gzipped symbol/name/exchange columns for in-browser search (immutable per version)."""
+    universe = universe_loader.current
+    if universe is None:
+        return universe_not_ready()
+    
+    body, version = universe.bundle()
+    if 'gzip' in request.headers.get('Accept-Encoding', ''):
+        response = app.response_class(body, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = app.response_class(gzip.decompress(body), mimetype='application/json')
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.set_etag(version)
+    if request.args.get('v') == version:
+        # Versioned URL: the content behind it never changes
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+
 @app.route('/api/exchanges')
 def get_exchanges():
-    """Get list of exchanges sorted by listing count."""
-    if companies_df is None:
-        return jsonify([])
-    
-    raw_exchanges = companies_df['Exchange'].dropna().unique().tolist()
-    
-    def sort_key(ex):
-        try:
-            return EXCHANGE_SORT_ORDER.index(ex)
-        except ValueError:
-            return len(EXCHANGE_SORT_ORDER)
+    """Get list of exchanges sorted by listing count (precomputed per universe, ETag-validated)."""
+    universe = universe_loader.current
+    if universe is None:
+        return universe_not_ready()
     
-    sorted_exchanges = sorted(raw_exchanges, key=sort_key)
-    
-    result = [{'code': 'ALL', 'name': 'All Exchanges'}]
-    for ex in sorted_exchanges:
-        display = EXCHANGE_DISPLAY_NAMES.get(ex, ex)
-        result.append({'code': ex, 'name': display})
-    
-    return jsonify(result)
+    response = app.response_class(universe.exchanges_json, mimetype='application/json')
+    response.set_etag(universe.exchanges_etag)
+    # Browsers may keep it but must revalidate: a reload costs a 304
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+
+def search_response(universe, rows, response_format='rows', headers=None):
+    """JSON response for universe rows (list of objects, or columns when format='columns')."""
+    return app.response_class(universe.serializer.encode(rows, response_format), mimetype='application/json', headers=headers)
 
 
 @app.route('/api/search')
 def search_companies():
     """Search for companies by ticker or name."""
     query = request.args.get('q', '').upper().strip()
-    exchange = request.args.get('exchange', 'ALL')
-    
-    if companies_df is None:
-        return jsonify([])
-    
-    # Filter by exchange
-    if exchange and exchange != 'ALL':
-        filtered = companies_df[companies_df['Exchange'] == exchange]
+    exchange = request.args.get('exchange', 'ALL') or 'ALL'
+    fuzzy = request.args.get('fuzzy', '0').lower() in ('1', 'true', 'yes')
+    response_format = 'columns' if request.args.get('format') == 'columns' else 'rows'
+    
+    universe = universe_loader.current
+    if universe is None:
+        return universe_not_ready()
+    
+    if not query:
+        # Random 10 samples drawn from the exchange's row partition: meant to differ
+        # on every request, so never cached
+        search_cache.bypass()
+        return search_response(universe, universe.search.sample(exchange, 10), response_format)
+    
+    key = (query, exchange, fuzzy, response_format)
+    body = search_cache.get(universe.version, key)
+    if body is not None:
+        return app.response_class(body, mimetype='application/json', headers={'X-Search-Cache': 'hit'})
+    
+    # Exact ticker, then ticker prefix, then name matches. When this browser's previous
+    # query is a prefix of this one, only its matches are re-checked.
+    # fuzzy=1 ranks names by trigram similarity instead, so typos still find the company.
+    session_id = request.cookies.get(SEARCH_SESSION_COOKIE)
+    if fuzzy:
+        rows = universe.search.fuzzy_search(query, exchange, limit=50)
+    elif session_id:
+        context = search_sessions.get(session_id)
+        rows = universe.search.search_incremental(query, exchange, context, universe.version, limit=50)
     else:
-        filtered = companies_df
-    
-    if query:
-        # Search by ticker and name
-        exact = filtered[filtered['Symbol'].str.upper() == query]
-        starts = filtered[
-            (filtered['Symbol'].str.upper().str.startswith(query, na=False)) & 
-            (filtered['Symbol'].str.upper() != query)
-        ]
-        name_match = filtered[
-            filtered['Name'].str.upper().str.contains(query, na=False) & 
-            ~filtered['Symbol'].str.upper().str.startswith(query, na=False)
-        ]
-        results = pd.concat([exact, starts, name_match]).head(50)
-    else:
-        # Random 10 samples
-        if len(filtered) > 10:
-            results = filtered.sample(n=10)
-        else:
-            results = filtered
-    
-    return jsonify([
-        {
-            'symbol': row['Symbol'],
-            'name': row['Name'][:60],
-            'exchange': row['Exchange']
-        }
-        for _, row in results.iterrows()
-    ])
+        rows = universe.search.search(query, exchange, limit=50)
+    response = search_response(universe, rows, response_format, headers={'X-Search-Cache': 'miss'})
+    search_cache.put(universe.version, key, response.get_data())
+    return response
+
+
+@app.route('/api/search/cache')
+def get_search_cache_stats():
+    """Get /api/search cache hit/miss counters."""
+    return jsonify(search_cache.stats())
 
 
 @app.route('/api/status')
@@ -243,80 +234,11 @@ def run_scraper(ticker, company_name):
         safe_name = "".join(c for c in company_name if c.isalnum() or c in (' ', '-', '_')).strip()[:30]
         output_file = os.path.join(downloads_folder, f"{ticker}_{safe_name}_{timestamp}.xlsx")
         
-        update_status('Setting up browser...', 5)
-        
-        # Set up Chrome options
-        options = Options()
-        options.add_argument('--headless=new')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--window-size=1920,1080')
-        options.add_argument('--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--disable-extensions')
-        options.add_argument('--disable-infobars')
-        options.add_argument('--disable-logging')
-        options.add_argument('--log-level=3')
-        options.add_argument('--blink-settings=imagesEnabled=false')
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        options.page_load_strategy = 'eager'
-        prefs = {
-            'profile.managed_default_content_settings.images': 2,
-            'profile.managed_default_content_settings.stylesheets': 2,
-            'profile.default_content_setting_values.notifications': 2,
-            'disk-cache-size': 4096
-        }
-        options.add_experimental_option('prefs', prefs)
-        
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-        
         # Get alternative tickers to try
         alternatives = get_alternative_tickers_standalone(ticker, company_name)
         
-        update_status(f"Searching across {len(alternatives)} exchange listings...", 10)
-        
-        # Try each alternative until we find one that works
-        found_ticker = None
-        found_exchange = None
-        
-        for idx, (alt_ticker, alt_exchange) in enumerate(alternatives[:10]):
-            base_url = f"https://www.alphaspread.com/security/{alt_exchange}/{alt_ticker}/financials"
-            update_status(f"Trying {alt_ticker.upper()} on {alt_exchange.upper()}... ({idx+1}/{min(len(alternatives), 10)})", 10 + idx * 2)
-            
-            try:
-                driver.get(f"{base_url}/income-statement")
-                WebDriverWait(driver, 3).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, '.income-statement.statement'))
-                )
-                found_ticker = alt_ticker
-                found_exchange = alt_exchange
-                print(f"Found data for {ticker} as {alt_ticker} on {alt_exchange}")
-                break
-            except:
-                continue
-        
-        if not found_ticker:
-            raise Exception(f"Could not find financial data for {ticker} ({company_name}) on any exchange.")
-        
-        base_url = f"https://www.alphaspread.com/security/{found_exchange}/{found_ticker}/financials"
-        update_status(f"Found on {found_exchange.upper()} - Fetching data...", 30)
-        
-        # Import the GUI class just for its methods (won't create window)
-        from financial_data_gui import SimpleFinanceGUI
-        
-        # Create a minimal instance without initializing Tkinter
-        gui = object.__new__(SimpleFinanceGUI)
-        gui.companies_df = companies_df
-        gui.company_tickers = company_tickers
-        gui.ticker_to_company = ticker_to_company
-        gui.output_file = output_file
-        gui.company_info = {'name': company_name, 'currency': 'USD'}
-        gui.selected_ticker = found_ticker
-        gui.selected_company_name = company_name
-        gui._workbook = None
-        gui._formats = {}
-        
-        all_data = {}
+        def on_probe(idx, count, alt_ticker, alt_exchange):
+            update_status(f"Trying {alt_ticker.upper()} on {alt_exchange.upper()}... ({idx+1}/{count})", 10 + idx * 2)
         
         # Define statements
         statements = [
@@ -325,123 +247,87 @@ def run_scraper(ticker, company_name):
             ('cash-flow-statement', 'Cash Flow Statement')
         ]
         
-        # Open tabs for parallel fetching
-        update_status("Opening parallel tabs...", 35)
-        tab_handles = []
-        
-        for idx, (key, name) in enumerate(statements):
-            if idx == 0:
-                driver.get(f"{base_url}/{key}")
-                tab_handles.append(driver.current_window_handle)
-            else:
-                driver.execute_script("window.open('');")
-                driver.switch_to.window(driver.window_handles[-1])
-                driver.get(f"{base_url}/{key}")
-                tab_handles.append(driver.current_window_handle)
-            time.sleep(0.2)
-        
-        # Wait for pages to load
-        for idx, (key, name) in enumerate(statements):
-            driver.switch_to.window(tab_handles[idx])
-            try:
-                WebDriverWait(driver, 3).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, f'.{key}.statement'))
-                )
-            except:
-                pass
-        
-        # Extract company info
-        driver.switch_to.window(tab_handles[0])
-        company_name_extracted, currency = gui.extract_company_info(driver)
-        gui.company_info = {'name': company_name_extracted or company_name, 'currency': currency or 'USD'}
-        
-        update_status("Fetching financial statements...", 40)
-        
-        # Extract default data from all tabs
-        for idx, (key, name) in enumerate(statements):
-            driver.switch_to.window(tab_handles[idx])
-            dates, fields, selected = gui.extract_data(driver, key)
-            if dates and fields:
-                df = gui.parse_data(dates, fields, selected)
-                if df is not None:
-                    all_data[f"{name} ({selected})"] = df
-        
-        # Fetch different periods
         periods_config = {
             'income-statement': ['Annual', 'Quarterly', 'TTM'],
             'balance-sheet': ['Annual', 'Quarterly'],
             'cash-flow-statement': ['Annual', 'Quarterly', 'TTM']
         }
         
-        all_periods = ['Annual', 'Quarterly', 'TTM']
+        exporter = FinancialDataExporter(ticker, company_name, output_file)
+        
+        # Plain HTTP first (pages and Livewire messages, no browser); None means use the browser
+        fetched = None
+        breakdown_data = None
+        if FETCH_BACKEND == 'http':
+            update_status(f"Searching across {len(alternatives)} exchange listings...", 10)
+            fetched = download_over_http(exporter, ticker, company_name, alternatives, statements, periods_config,
+                                         on_probe=on_probe)
         
-        for period_idx, period in enumerate(all_periods):
-            update_status(f"Fetching {period} data...", 45 + period_idx * 15)
+        if fetched:
+            found_ticker, found_exchange, base_url, (company_name_extracted, currency), all_data = fetched
+            exporter.selected_ticker = found_ticker
+            exporter.company_info = {'name': company_name_extracted or company_name, 'currency': currency or 'USD'}
+            print(f"Collected {len(all_data)} sheets over HTTP: {list(all_data.keys())}")
+            
+            update_status("Fetching Revenue Breakdown...", 85)
+            breakdown_data = fetch_revenue_breakdown_http(exporter, http_client, base_url)
+        else:
+            update_status('Setting up browser...', 5)
+            
+            # Warm browser from the shared pool (launched in the background at startup)
+            driver = driver_pool.checkout()
+            
+            update_status(f"Searching across {len(alternatives)} exchange listings...", 10)
+            
+            # Listing from a previous download, or probe several at once in separate tabs (best-ranked hit wins)
+            resolved = resolve_listing(driver, ticker, company_name, alternatives, on_probe=on_probe)
+            if not resolved:
+                raise Exception(f"Could not find financial data for {ticker} ({company_name}) on any exchange.")
+            found_ticker, found_exchange, from_cache = resolved
+            print(f"Found data for {ticker} as {found_ticker} on {found_exchange}{' (cached)' if from_cache else ''}")
+            
+            base_url = f"https://www.alphaspread.com/security/{found_exchange}/{found_ticker}/financials"
+            update_status(f"Found on {found_exchange.upper()} - Fetching data...", 30)
+            exporter.selected_ticker = found_ticker
+            
+            # Open tabs for parallel fetching
+            update_status("Opening parallel tabs...", 35)
+            tab_handles, loaded = open_statement_tabs(driver, base_url, statements)
+            
+            if from_cache and statements[0][0] not in loaded:
+                # The cached listing stopped serving data: forget it and search again
+                print(f"Cached listing {found_ticker} on {found_exchange} no longer loads, searching again")
+                ticker_cache.invalidate(ticker, company_name)
+                resolved = resolve_listing(driver, ticker, company_name, alternatives, on_probe=on_probe, use_cache=False)
+                if not resolved:
+                    raise Exception(f"Could not find financial data for {ticker} ({company_name}) on any exchange.")
+                found_ticker, found_exchange, _ = resolved
+                exporter.selected_ticker = found_ticker
+                base_url = f"https://www.alphaspread.com/security/{found_exchange}/{found_ticker}/financials"
+                tab_handles, loaded = open_statement_tabs(driver, base_url, statements, tab_handles)
             
-            # Click period buttons on all applicable tabs
-            for idx, (key, name) in enumerate(statements):
-                if period in periods_config[key]:
-                    sheet_key = f"{name} ({period})"
-                    if sheet_key not in all_data:
-                        driver.switch_to.window(tab_handles[idx])
-                        gui.click_period_fast(driver, period, key)
+            update_status("Fetching financial statements...", 40)
             
-            time.sleep(2.0)
+            # One script per tab gathers the header, currency and every period (old per-period waves as fallback)
+            (company_name_extracted, currency), all_data = exporter.fetch_statements(
+                driver, statements, tab_handles, periods_config)
+            exporter.company_info = {'name': company_name_extracted or company_name, 'currency': currency or 'USD'}
+            print(f"Collected {len(all_data)} sheets: {list(all_data.keys())}")
             
-            for idx, (key, name) in enumerate(statements):
-                if period in periods_config[key]:
-                    sheet_key = f"{name} ({period})"
-                    if sheet_key not in all_data:
-                        driver.switch_to.window(tab_handles[idx])
-                        dates, fields, selected = gui.extract_data_livewire(driver, key)
-                        if dates and fields:
-                            df = gui.parse_data(dates, fields, selected)
-                            if df is not None:
-                                actual_key = f"{name} ({selected})"
-                                if actual_key not in all_data:
-                                    all_data[actual_key] = df
-                        else:
-                            dates, fields, selected = gui.extract_data(driver, key)
-                            if dates and fields:
-                                df = gui.parse_data(dates, fields, selected)
-                                if df is not None:
-                                    actual_key = f"{name} ({selected})"
-                                    if actual_key not in all_data:
-                                        all_data[actual_key] = df
+            # Fetch Revenue Breakdown
+            update_status("Fetching Revenue Breakdown...", 85)
+            driver.switch_to.window(tab_handles[0])
+            breakdown_data = exporter.scrape_revenue_breakdown_fast(driver, base_url)
         
-        # Fetch Revenue Breakdown
-        update_status("Fetching Revenue Breakdown...", 85)
-        driver.switch_to.window(tab_handles[0])
-        breakdown_data = gui.scrape_revenue_breakdown_fast(driver, base_url)
+        if breakdown_data is None:
+            # Not readable from the HTML (rendered by script): the browser gets it
+            driver = driver_pool.checkout()
+            breakdown_data = exporter.scrape_revenue_breakdown_fast(driver, base_url)
         
         if all_data:
             update_status("Saving Excel file...", 90)
             
-            with pd.ExcelWriter(output_file, engine='xlsxwriter') as writer:
-                sheet_order = [
-                    'Income Statement (Annual)',
-                    'Balance Sheet (Annual)',
-                    'Cash Flow Statement (Annual)',
-                    'Income Statement (Quarterly)',
-                    'Balance Sheet (Quarterly)',
-                    'Cash Flow Statement (Quarterly)',
-                    'Income Statement (TTM)',
-                    'Cash Flow Statement (TTM)',
-                ]
-                
-                # Write sheets in the specified order
-                for sheet_name in sheet_order:
-                    if sheet_name in all_data:
-                        gui.format_excel_sheet_optimized(writer, all_data[sheet_name], sheet_name[:31])
-                
-                # Write any remaining sheets that weren't in the order list
-                for sheet_name, df in all_data.items():
-                    if sheet_name not in sheet_order:
-                        gui.format_excel_sheet_optimized(writer, df, sheet_name[:31])
-                
-                # Add Revenue Breakdown
-                if breakdown_data:
-                    gui.format_revenue_breakdown_sheet(writer, breakdown_data)
+            exporter.save_workbook(all_data, breakdown_data)
             
             scraper_state['status'] = 'Complete!'
             scraper_state['progress'] = 100
@@ -456,11 +342,8 @@ def run_scraper(ticker, company_name):
         traceback.print_exc()
     
     finally:
-        if driver:
-            try:
-                driver.quit()
-            except:
-                pass
+        # Hand the browser back (tabs closed, blank page) for the next download
+        driver_pool.checkin(driver)
         scraper_state['is_running'] = False
 
 
@@ -485,8 +368,9 @@ def get_alternative_tickers_standalone(ticker, company_name):
     
     # Try to find alternatives by company name
     normalized_name = normalize_company_name(company_name)
-    if normalized_name and company_tickers:
-        company_alts = company_tickers.get(normalized_name, [])
+    universe = universe_loader.current
+    if normalized_name and universe is not None:
+        company_alts = universe.company_tickers.get(normalized_name, [])
         
         # Sort by exchange priority
         exchange_priority = {'nyse': 1, 'nasdaq': 2, 'lse': 3, 'hkex': 4, 'tse': 5, 'xetra': 6, 'otc': 99}
@@ -530,8 +414,13 @@ def open_browser():
 
 
 if __name__ == '__main__':
-    print("Loading company data...")
-    load_companies()
+    # Load company data in the background so the server answers immediately
+    print("Loading company data in the background...")
+    universe_loader.start()
+    # Pre-launch Chrome so the first download skips browser startup (the HTTP backend
+    # launches it on its first fallback instead)
+    if FETCH_BACKEND == 'browser':
+        driver_pool.warm()
     
     print("\n" + "="*50)
     print("  FINDATA — Financial Fundamental Data")